@@ -1 +1,5 @@
 # Backend application package
+import time
+
+# Reference point for the startup report (services/startup.py)
+IMPORT_STARTED = time.perf_counter()
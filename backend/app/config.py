@@ -1,6 +1,8 @@
 """
 Application configuration and settings
 """
+import os
+import tempfile
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -17,17 +19,129 @@ class Settings(BaseSettings):
     gemini_api_key: str
     gemini_model: str = "gemini-1.5-flash"
     
+    # Complexity-based model tiering (see services.model_router); gemini_model is the standard tier
+    gemini_tiering_enabled: bool = True
+    gemini_fast_model: str = "gemini-1.5-flash-8b"
+    gemini_large_model: str = "gemini-1.5-pro"
+    gemini_standard_tier_score: float = 4.0
+    gemini_large_tier_score: float = 6.5
+    gemini_fast_max_output_tokens: int = 4096
+    gemini_standard_max_output_tokens: int = 6144
+    gemini_large_max_output_tokens: int = 8192
+    
     # Hugging Face API Configuration (Fallback)
     hf_api_token: str
     hf_model: str = "mistralai/Mistral-7B-Instruct"
     hf_api_url: str = "https://api-inference.huggingface.co/models"
     
+    # Section-level regeneration output budget (tokens)
+    section_max_output_tokens: int = 1024
+    
+    # Generation deadline, split across provider attempts (X-Request-Timeout header overrides, up to the max)
+    generation_deadline_s: float = 120.0
+    generation_deadline_max_s: float = 300.0
+    provider_min_attempt_s: float = 5.0  # attempts with less time left than this are skipped
+    provider_max_inflight_calls: int = 32  # upstream call threads per worker, abandoned ones included; 0 = unlimited
+    
+    # Offline template tier: serve simple prompts without an LLM call
+    template_tier_enabled: bool = True
+    template_max_prompt_words: int = 25
+    
+    # Generated-output validation (process pool; 0 workers = validate inline)
+    validation_workers: int = 1
+    validation_timeout_s: float = 10.0
+    quality_min_score: int = 60
+    quality_retries: int = 1  # extra Gemini attempts when the score is too low
+    
+    # Revision history: store a full snapshot every N revisions, deltas in between
+    revision_snapshot_interval: int = 10
+    
+    # Idempotency-Key replay for POST /api/generate-website
+    idempotency_ttl_s: int = 86400
+    idempotency_lock_s: int = 300  # in-progress claims older than this are taken over
+    idempotency_wait_s: float = 120.0  # how long a retry waits for the in-progress original
+    idempotency_poll_ms: int = 250
+    
+    # Project change feed (GET /api/projects/changes)
+    change_feed_max_wait_s: float = 30.0  # long-poll cap
+    change_feed_tombstone_ttl_s: int = 604800  # older tokens get reset=true
+    
+    # Retention: background clean-up of the projects table (0 disables a rule)
+    retention_enabled: bool = False
+    retention_interval_s: int = 3600
+    retention_max_age_days: int = 0
+    retention_max_per_type: int = 0
+    retention_delete_fallback: bool = True  # failed / static-fallback-only results
+    retention_fallback_grace_minutes: int = 60
+    retention_stale_generating_minutes: int = 60  # abandoned skeleton-mode generations are marked failed
+    stale_generating_sweep_interval_s: int = 300  # runs even with retention disabled
+    retention_batch_size: int = 500
+    retention_batch_pause_ms: int = 50
+    retention_max_deletes_per_run: int = 50000
+    retention_vacuum_pages: int = 0  # SQLite incremental_vacuum pages per run; 0 = all free pages
+    
+    # Published previews: inline <style>/<script> bodies become content-addressed assets
+    asset_base_url: str = "/api/assets"  # point at a CDN mirroring GET /api/assets
+    asset_min_bytes: int = 256  # smaller blocks stay inline (not worth a request)
+    asset_max_age_s: int = 31536000  # Cache-Control max-age for assets (immutable)
+    asset_memory_cache_entries: int = 256  # per-process cache of hot asset bodies
+    asset_gc_grace_s: int = 86400  # unreferenced assets are kept this long after last use
+    
+    # Project read responses: bodies estimated larger than this are encoded and sent incrementally
+    response_stream_threshold: int = 262144
+    response_chunk_size: int = 65536
+    
     # Database Configuration
     database_url: str
     
+    # Connection pool (sync and async engines)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    
+    # Statement caches: SQLAlchemy compiled-statement cache and asyncpg prepared statements
+    db_query_cache_size: int = 500
+    db_prepared_statement_cache_size: int = 100
+    
+    # Read replicas (comma-separated URLs): read-only project queries round-robin over the healthy ones
+    db_replica_urls: str = ""
+    db_replica_health_interval_s: float = 5.0
+    db_replica_max_lag_s: float = 0  # Postgres replicas further behind are skipped; 0 = don't check
+    db_read_your_writes_s: float = 2.0  # reads this soon after a project write use the primary; 0 = off
+    
+    # SQLite tuning, applied on every new connection when database_url is SQLite
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456
+    sqlite_cache_size: int = -64000
+    sqlite_auto_vacuum: str = "incremental"  # lets retention hand freed pages back to the OS
+    
+    # SQLite single-writer commit queue for new projects
+    sqlite_batch_writes: bool = True
+    sqlite_batch_max_size: int = 64
+    sqlite_batch_max_wait_ms: int = 2
+    
     # Debug Mode
     debug: bool = False
     
+    # Admin endpoints (/api/admin/*): require X-Admin-Token; disabled while unset
+    admin_token: str = ""
+    
+    # Multi-worker deployment: schema-init lock, cross-worker shared state
+    schema_lock_path: str = os.path.join(tempfile.gettempdir(), "website_generator_schema.lock")
+    shared_state_path: str = os.path.join(tempfile.gettempdir(), "website_generator_shared.db")
+    shared_state_poll_ms: int = 250  # per-process refresh of cached shared counters (change signal, last write)
+    max_concurrent_generations: int = 0  # across all workers; 0 = unlimited
+    
+    # Slow-request profiling (opt-in)
+    profiling_enabled: bool = False
+    profiling_threshold_ms: int = 5000
+    profiling_interval_ms: int = 10
+    profiling_dir: str = "./profiles"
+    profiling_max_files: int = 20
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,25 +1,235 @@
 """
 Database connection and session management
+
+Writes (and anything that must see them) use the primary: engine,
+SessionLocal, get_db / get_async_db. Read-only project queries use
+get_read_db / get_async_read_db, which round-robin over the healthy
+replicas in settings.db_replica_urls and fall back to the primary when
+there are none, none are healthy, or a project write committed within
+settings.db_read_your_writes_s.
 """
-from sqlalchemy import create_engine
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, List, Optional
+from sqlalchemy import Column, Integer, Table, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.schema import CreateColumn
 from .config import get_settings
+from .services import metrics
+from .services.batch_writer import BatchedWriter
+from .services.shared_state import get_mirror
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Arbitrary application-wide key for the Postgres schema-init advisory lock
+_SCHEMA_LOCK_KEY = 727_051_001
+
+# Bump whenever models change; init_db() skips schema work when the stored marker matches
+SCHEMA_VERSION = 6
+
+
+class _PoolWaitTimingMixin:
+    """Time how long callers wait for a pooled connection"""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_WAIT.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_PoolWaitTimingMixin, QueuePool):
+    """QueuePool for the sync engine with wait-time metrics"""
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_PoolWaitTimingMixin, AsyncAdaptedQueuePool):
+    """Queue pool for the async engine with wait-time metrics"""
+    metrics_label = "async"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """In-memory SQLite can't use a queue pool (each connection is a new database)"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _pool_options(url: str, pool_class) -> dict:
+    """Engine keyword arguments for pool sizing from Settings"""
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "poolclass": pool_class,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+def _count_checkouts(engine: Engine, label: str) -> None:
+    """Count pool checkouts and publish pool occupancy at scrape time"""
+    event.listen(engine, "checkout", lambda *args: metrics.DB_POOL_CHECKOUTS.labels(label).inc())
+
+    def collect():
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            metrics.DB_POOL_CHECKED_OUT.labels(label).set(pool.checkedout())
+            metrics.DB_POOL_SIZE.labels(label).set(pool.size())
+            metrics.DB_POOL_OVERFLOW.labels(label).set(max(pool.overflow(), 0))
+
+    metrics.REGISTRY.add_collector(collect)
+
+
+def is_sqlite(url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def sqlite_pragmas() -> dict:
+    """Connection PRAGMAs for the SQLite engine profile (WAL, relaxed fsync, busy wait, mmap, cache, auto-vacuum)"""
+    return {
+        # SQLite leaves foreign keys (and ON DELETE CASCADE) off unless asked per connection
+        "foreign_keys": "ON",
+        # Only takes effect on a new database file (or after a VACUUM, see services.retention)
+        "auto_vacuum": settings.sqlite_auto_vacuum,
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+    }
+
+
+def apply_sqlite_pragmas(target_engine: Engine, pragmas: dict) -> None:
+    """Run PRAGMAs on every new DBAPI connection of an engine"""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    event.listen(target_engine, "connect", on_connect)
+
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL to its async driver
+
+    sqlite:// -> sqlite+aiosqlite://, postgresql:// -> postgresql+asyncpg://
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    return url
+
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
     echo=settings.debug,
     pool_pre_ping=True,
+    query_cache_size=settings.db_query_cache_size,
+    **_pool_options(settings.database_url, InstrumentedQueuePool),
 )
+_count_checkouts(engine, "sync")
+if is_sqlite(settings.database_url):
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory are created on first use so the async
+# driver (aiosqlite / asyncpg) is only imported when something needs it
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_batched_writer: Optional[BatchedWriter] = None
+
 # Base class for ORM models
 Base = declarative_base()
 
+# Single-row schema version marker
+schema_version_table = Table(
+    "schema_version",
+    Base.metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get (creating on first use) the async engine"""
+    global _async_engine
+    if _async_engine is None:
+        async_url = to_async_url(settings.database_url)
+        connect_args = {}
+        if make_url(async_url).drivername == "postgresql+asyncpg":
+            connect_args["prepared_statement_cache_size"] = settings.db_prepared_statement_cache_size
+        _async_engine = create_async_engine(
+            async_url,
+            echo=settings.debug,
+            pool_pre_ping=True,
+            query_cache_size=settings.db_query_cache_size,
+            connect_args=connect_args,
+            **_pool_options(async_url, InstrumentedAsyncQueuePool),
+        )
+        _count_checkouts(_async_engine.sync_engine, "async")
+        if is_sqlite(async_url):
+            apply_sqlite_pragmas(_async_engine.sync_engine, sqlite_pragmas())
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get (creating on first use) the AsyncSession factory"""
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+def get_batched_writer() -> Optional[BatchedWriter]:
+    """
+    Get the single-writer commit queue, or None when batching doesn't apply
+
+    Only used for file-backed SQLite with sqlite_batch_writes enabled; other
+    databases handle concurrent writers themselves.
+    """
+    global _batched_writer
+    if not settings.sqlite_batch_writes or not is_sqlite(settings.database_url) or _is_memory_sqlite(settings.database_url):
+        return None
+    if _batched_writer is None:
+        _batched_writer = BatchedWriter(
+            SessionLocal,
+            max_batch_size=settings.sqlite_batch_max_size,
+            max_wait_ms=settings.sqlite_batch_max_wait_ms,
+        )
+    return _batched_writer
+
 
 def get_db() -> Session:
     """
@@ -34,6 +244,391 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get an async database session
+    Usage: @app.get("/route")
+           async def my_route(db: AsyncSession = Depends(get_async_db)):
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+# ---------------------------------------------------------------------------
+# Read replicas
+# ---------------------------------------------------------------------------
+
+# Shared-state key: epoch ms of the last committed project write (any worker)
+_LAST_WRITE_KEY = "db:last_project_write_ms"
+
+
+def replica_urls() -> List[str]:
+    """Configured replica URLs (settings.db_replica_urls, comma-separated)"""
+    return [url.strip() for url in settings.db_replica_urls.split(",") if url.strip()]
+
+
+def _replica_sqlite_pragmas() -> dict:
+    # Read tuning only; query_only makes the connection refuse writes (replicas are copies)
+    pragmas = sqlite_pragmas()
+    read_pragmas = {name: pragmas[name] for name in ("busy_timeout", "mmap_size", "cache_size")}
+    read_pragmas["query_only"] = "ON"
+    return read_pragmas
+
+
+class Replica:
+    """One read replica: sync engine, lazily created async engine and health state"""
+
+    def __init__(self, index: int, url: str):
+        self.index = index
+        self.url = url
+        self.label = f"replica{index}"
+        self.healthy = False
+        self.checked = False
+        self.engine = create_engine(
+            url,
+            echo=settings.debug,
+            pool_pre_ping=True,
+            query_cache_size=settings.db_query_cache_size,
+            connect_args=self._connect_args(url),
+            **_pool_options(url, InstrumentedQueuePool),
+        )
+        _count_checkouts(self.engine, self.label)
+        if is_sqlite(url):
+            apply_sqlite_pragmas(self.engine, _replica_sqlite_pragmas())
+        self._async_engine: Optional[AsyncEngine] = None
+
+    @staticmethod
+    def _connect_args(url: str) -> dict:
+        """Postgres replicas: read-only transactions even if the URL points at a writable server"""
+        drivername = make_url(url).drivername
+        if drivername in ("postgresql", "postgresql+psycopg2"):
+            return {"options": "-c default_transaction_read_only=on"}
+        if drivername == "postgresql+asyncpg":
+            return {
+                "server_settings": {"default_transaction_read_only": "on"},
+                "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            }
+        return {}
+
+    def async_engine(self) -> AsyncEngine:
+        """Get (creating on first use) the replica's async engine"""
+        if self._async_engine is None:
+            async_url = to_async_url(self.url)
+            self._async_engine = create_async_engine(
+                async_url,
+                echo=settings.debug,
+                pool_pre_ping=True,
+                query_cache_size=settings.db_query_cache_size,
+                connect_args=self._connect_args(async_url),
+                **_pool_options(async_url, InstrumentedAsyncQueuePool),
+            )
+            _count_checkouts(self._async_engine.sync_engine, f"{self.label}_async")
+            if is_sqlite(async_url):
+                apply_sqlite_pragmas(self._async_engine.sync_engine, _replica_sqlite_pragmas())
+        return self._async_engine
+
+    def check(self) -> bool:
+        """
+        Probe the replica and update its health
+
+        Healthy means reachable, on the current SCHEMA_VERSION (a copy taken
+        before a migration would fail on new columns) and, on Postgres with
+        db_replica_max_lag_s set, replaying within that lag.
+        """
+        problem = None
+        database = make_url(self.url).database
+        if is_sqlite(self.url) and database and not _is_memory_sqlite(self.url) and not os.path.exists(database):
+            # Connecting would create an empty file
+            self.set_health(False, f"{database} does not exist")
+            return False
+        try:
+            with self.engine.connect() as conn:
+                version = conn.execute(schema_version_table.select()).scalar()
+                if version != SCHEMA_VERSION:
+                    problem = f"schema version {version}, expected {SCHEMA_VERSION}"
+                elif settings.db_replica_max_lag_s > 0 and conn.dialect.name == "postgresql":
+                    lag = conn.execute(text(
+                        "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                    )).scalar()
+                    if lag is not None and lag > settings.db_replica_max_lag_s:
+                        problem = f"replication lag {lag:.1f}s"
+        except Exception as e:
+            problem = f"{type(e).__name__}: {str(e).splitlines()[0][:200]}"
+        self.set_health(problem is None, problem)
+        return self.healthy
+
+    def set_health(self, healthy: bool, problem: Optional[str] = None) -> None:
+        if healthy and not self.healthy:
+            logger.info(f"✅ Read {self.label} healthy")
+        elif not healthy and (self.healthy or not self.checked):
+            logger.warning(f"⚠️ Read {self.label} unhealthy, reads go elsewhere: {problem}")
+        self.healthy = healthy
+        self.checked = True
+        metrics.DB_REPLICA_HEALTHY.labels(self.label).set(1 if healthy else 0)
+
+    def dispose(self, close: bool = True) -> None:
+        self.engine.dispose(close=close)
+        if self._async_engine is not None:
+            self._async_engine.sync_engine.dispose(close=close)
+            self._async_engine = None
+
+
+class ReplicaSet:
+    """Round-robin over the healthy replicas, with a background health monitor"""
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(index, url) for index, url in enumerate(urls)]
+        self._next = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pick(self) -> Optional[Replica]:
+        """Next healthy replica, or None"""
+        if not self.replicas:
+            return None
+        for replica in self.replicas:
+            if not replica.checked:
+                # Monitor not started (scripts, benchmarks): probe on first use
+                replica.check()
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+    def check_all(self) -> None:
+        for replica in self.replicas:
+            replica.check()
+
+    def _run(self) -> None:
+        while not self._stop.wait(max(settings.db_replica_health_interval_s, 0.1)):
+            self.check_all()
+
+    def start(self) -> None:
+        if not self.replicas or (self._thread is not None and self._thread.is_alive()):
+            return
+        self.check_all()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def dispose(self, close: bool = True) -> None:
+        for replica in self.replicas:
+            replica.dispose(close=close)
+
+
+_replica_set: Optional[ReplicaSet] = None
+
+
+def get_replica_set() -> ReplicaSet:
+    """Get (creating on first use) the replica set for settings.db_replica_urls"""
+    global _replica_set
+    if _replica_set is None:
+        _replica_set = ReplicaSet(replica_urls())
+    return _replica_set
+
+
+def start_replica_monitor() -> None:
+    """Probe the replicas now and then every db_replica_health_interval_s (application startup)"""
+    replica_set = get_replica_set()
+    replica_set.start()
+    if replica_set.replicas:
+        # Start caching other workers' last write before the first read arrives
+        get_mirror().watch(_LAST_WRITE_KEY)
+        healthy = sum(replica.healthy for replica in replica_set.replicas)
+        logger.info(f"✅ Read routing: {healthy}/{len(replica_set.replicas)} replicas healthy")
+
+
+def stop_replica_monitor() -> None:
+    """Stop the health monitor (application shutdown)"""
+    if _replica_set is not None:
+        _replica_set.stop()
+
+
+def note_project_write() -> None:
+    """
+    Record that a project write committed (read-your-writes window, all workers)
+
+    Only updates this process's SharedStateMirror: the shared file is written
+    by the mirror thread, so this is safe in commit hooks on the event loop.
+    """
+    if settings.db_read_your_writes_s <= 0 or not settings.db_replica_urls:
+        return
+    get_mirror().set_max_later(_LAST_WRITE_KEY, int(time.time() * 1000))
+
+
+def _within_read_your_writes() -> bool:
+    # Cached copy: this worker's writes at once, other workers' within shared_state_poll_ms
+    window_ms = settings.db_read_your_writes_s * 1000
+    if window_ms <= 0:
+        return False
+    return time.time() * 1000 - get_mirror().value(_LAST_WRITE_KEY) < window_ms
+
+
+def _read_replica() -> Optional[Replica]:
+    """Replica for a read-only session, or None for the primary"""
+    replica_set = get_replica_set()
+    if not replica_set.replicas:
+        return None
+    if _within_read_your_writes():
+        metrics.DB_READ_ROUTES.labels("primary_recent_write").inc()
+        return None
+    replica = replica_set.pick()
+    metrics.DB_READ_ROUTES.labels(replica.label if replica else "primary_no_healthy_replica").inc()
+    return replica
+
+
+def _failed_on_replica(replica: Replica, error: Exception) -> None:
+    # A dropped connection takes the replica out of rotation until the monitor sees it back
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        replica.set_health(False, str(error)[:200])
+
+
+def get_read_db() -> Iterator[Session]:
+    """
+    Dependency to get a read-only database session (replica when available)
+    Usage: @app.get("/route")
+           def my_route(db: Session = Depends(get_read_db)):
+    """
+    replica = _read_replica()
+    db = SessionLocal(bind=replica.engine) if replica else SessionLocal()
+    try:
+        yield db
+    except Exception as e:
+        if replica is not None:
+            _failed_on_replica(replica, e)
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get a read-only async database session (replica when available)
+    Usage: @app.get("/route")
+           async def my_route(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    replica = _read_replica()
+    factory = get_async_sessionmaker()
+    async with (factory(bind=replica.async_engine()) if replica else factory()) as db:
+        try:
+            yield db
+        except Exception as e:
+            if replica is not None:
+                _failed_on_replica(replica, e)
+            raise
+
+
+@contextmanager
+def _schema_lock():
+    """
+    Serialize schema initialization across processes
+
+    Postgres uses a session advisory lock (works across hosts); other
+    databases use an exclusive lock on settings.schema_lock_path.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _SCHEMA_LOCK_KEY})
+        return
+    if fcntl is None:
+        yield
+        return
+    directory = os.path.dirname(settings.schema_lock_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(settings.schema_lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Set once the schema is known to exist; inherited by workers forked after a preloaded init
+_schema_ready = False
+
+
+def _stored_schema_version() -> Optional[int]:
+    """Schema version recorded in the database, or None if there is no marker yet"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(schema_version_table.select()).scalar()
+    except Exception:
+        return None
+
+
+def _add_missing_columns(conn) -> None:
+    """
+    Add columns (and their indexes) that models gained after their table was created
+    
+    create_all only creates missing tables. This covers additive changes
+    only; new columns need a server_default or nullable=True.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        added = False
+        for column in table.columns:
+            if column.name not in existing:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}"))
+                added = True
+        if added:
+            indexed = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexed:
+                    index.create(conn)
+
+
 def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
+    """
+    Initialize database tables (once per process tree, under a cross-process lock)
+    
+    A single marker query replaces the per-table reflection of create_all on
+    every start; create_all only runs when the marker is missing or stale.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    if _stored_schema_version() != SCHEMA_VERSION:
+        with _schema_lock():
+            if _stored_schema_version() != SCHEMA_VERSION:
+                Base.metadata.create_all(bind=engine)
+                with engine.begin() as conn:
+                    _add_missing_columns(conn)
+                    conn.execute(schema_version_table.delete())
+                    conn.execute(schema_version_table.insert().values(version=SCHEMA_VERSION))
+    _schema_ready = True
+
+
+def reset_after_fork() -> None:
+    """
+    Drop connection state inherited from the parent process
+
+    Pooled connections must never be shared across fork; close=False leaves
+    the parent's sockets alone while this process starts with empty pools.
+    """
+    global _async_engine, _async_session_factory, _batched_writer, _replica_set
+    engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+    _async_engine = None
+    _async_session_factory = None
+    _batched_writer = None
+    if _replica_set is not None:
+        # The monitor thread didn't survive the fork; startup starts a new one
+        _replica_set.dispose(close=False)
+        _replica_set = None
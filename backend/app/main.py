@@ -4,8 +4,12 @@ Main FastAPI application
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import get_settings
-from .database import init_db
-from .routers import projects, health
+from .database import init_db, start_replica_monitor, stop_replica_monitor
+from .middleware import MetricsMiddleware, TimingMiddleware
+from .services.profiler import SamplingProfiler
+from .routers import projects, health, metrics, admin, assets
+from .services import startup as startup_report
+from .services import quality_service, retention, shared_state
 
 # Get settings
 settings = get_settings()
@@ -28,6 +32,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Add stage timing middleware (Server-Timing header, optional slow-request profiling)
+app.add_middleware(
+    TimingMiddleware,
+    profiler=SamplingProfiler(
+        output_dir=settings.profiling_dir,
+        threshold_ms=settings.profiling_threshold_ms,
+        interval_ms=settings.profiling_interval_ms,
+        max_files=settings.profiling_max_files,
+    ) if settings.profiling_enabled else None,
+)
+
+# Add request metrics middleware (outermost, so it times the full request)
+app.add_middleware(MetricsMiddleware)
+
 # Initialize database
 @app.on_event("startup")
 def startup():
@@ -38,11 +56,26 @@ def startup():
     except Exception as e:
         print(f"Database initialization warning: {e}")
         print("Note: Ensure PostgreSQL is running and DATABASE_URL is correct in .env")
+    start_replica_monitor()
+    retention.start_worker()
+    startup_report.mark("startup_complete")
+
+
+@app.on_event("shutdown")
+def shutdown():
+    """Stop background worker processes and threads"""
+    retention.stop_worker()
+    stop_replica_monitor()
+    quality_service.shutdown_pool()
+    shared_state.stop_mirror()
 
 
 # Include routers
 app.include_router(health.router)
 app.include_router(projects.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+app.include_router(assets.router)
 
 
 @app.get("/")
@@ -56,6 +89,9 @@ def root():
     }
 
 
+startup_report.mark("app_imported")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,107 @@
+"""
+ASGI middleware for request instrumentation
+"""
+import json
+import logging
+import time
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from .services import metrics, startup, timing
+from .services.profiler import SamplingProfiler
+
+timing_logger = logging.getLogger("app.timing")
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and status per route template
+
+    Implemented as a plain ASGI middleware (not BaseHTTPMiddleware) so it adds
+    no extra task or body buffering to the request path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        end = None
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code, end
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                end = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            # Latency ends with the last body chunk, not after background tasks
+            metrics.HTTP_REQUEST_DURATION.labels(method, route_label).observe((end or time.perf_counter()) - start)
+            metrics.HTTP_REQUESTS.labels(method, route_label, status_code).inc()
+            startup.mark_first_request()
+
+
+class TimingMiddleware:
+    """
+    Per-request stage timing
+
+    Binds a RequestTimer to the request context, returns the recorded stages
+    in a Server-Timing header, and writes one structured JSON log line per
+    request. With a profiler configured, slow requests also get a stack profile.
+    """
+
+    def __init__(self, app, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = timing.start_request(profile=self.profiler is not None)
+        if self.profiler is not None:
+            self.profiler.register(timer)
+        status_code = 500
+        total = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, total
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timer.server_timing_header())
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                total = timer.elapsed()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            profile_path = None
+            if self.profiler is not None:
+                profile_path = await run_in_threadpool(self.profiler.finish, timer, f"{method} {route}")
+            timing_logger.info(json.dumps({
+                "event": "request_timing",
+                "method": method,
+                "route": route,
+                "status": status_code,
+                "total_ms": round((total if total is not None else timer.elapsed()) * 1000, 1),
+                "stages": timer.stages_ms(),
+                "profile": profile_path,
+            }))
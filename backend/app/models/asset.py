@@ -0,0 +1,65 @@
+"""
+Database models for published pages and their content-addressed assets
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, Text
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class StaticAsset(Base):
+    """
+    A style or script body extracted from generated HTML, stored once per content
+
+    Attributes:
+        hash: SHA-256 of kind and content (also the public file name)
+        kind: css or js
+        content: The style sheet / script source
+        size: Content length in bytes (UTF-8)
+        created_at: When the content was first published
+        last_seen_at: Last time a publish referenced it (garbage-collection grace)
+    """
+    __tablename__ = "static_assets"
+
+    hash = Column(String(64), primary_key=True)
+    kind = Column(String(8), nullable=False, comment="css, js")
+    content = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    last_seen_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<StaticAsset(hash={self.hash[:12]}, kind={self.kind}, size={self.size})>"
+
+
+class PublishedPage(Base):
+    """
+    A project's HTML with its inline styles and scripts replaced by asset links
+
+    Attributes:
+        project_id: Published project
+        change_seq: The project's change_seq when published (stale once it moves on)
+        html: Rewritten document
+        etag: SHA-256 of html, for conditional preview requests
+        source_bytes: Size of the inline document before extraction
+        published_at: When the page was (re)published
+    """
+    __tablename__ = "published_pages"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    change_seq = Column(Integer, nullable=False)
+    html = Column(Text, nullable=False)
+    etag = Column(String(64), nullable=False)
+    source_bytes = Column(Integer, nullable=False)
+    published_at = Column(DateTime, default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PublishedPage(project_id={self.project_id}, change_seq={self.change_seq})>"
+
+
+# Which assets each published page links to; assets no page references are garbage-collected
+published_page_assets = Table(
+    "published_page_assets",
+    Base.metadata,
+    Column("project_id", Integer, ForeignKey("published_pages.project_id", ondelete="CASCADE"), primary_key=True),
+    Column("asset_hash", String(64), ForeignKey("static_assets.hash"), primary_key=True, index=True),
+)
@@ -0,0 +1,44 @@
+"""
+Database models for the project change feed
+"""
+from sqlalchemy import Column, DateTime, DDL, Integer, Table, event
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ProjectTombstone(Base):
+    """
+    Marker for a deleted project, so change-feed clients can drop it
+
+    Attributes:
+        id: Unique tombstone identifier
+        project_id: Deleted project's ID
+        change_seq: Change sequence number of the deleting transaction
+        deleted_at: When the project was deleted
+    """
+    __tablename__ = "project_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<ProjectTombstone(project_id={self.project_id}, change_seq={self.change_seq})>"
+
+
+# Single-row change counter. Writers bump it inside their transaction, so the
+# row lock orders commits by sequence number; tombstone_horizon is the highest
+# sequence whose tombstones have been pruned.
+change_feed_state = Table(
+    "change_feed_state",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("seq", Integer, nullable=False),
+    Column("tombstone_horizon", Integer, nullable=False),
+)
+event.listen(
+    change_feed_state,
+    "after_create",
+    DDL("INSERT INTO change_feed_state (id, seq, tombstone_horizon) VALUES (1, 0, 0)"),
+)
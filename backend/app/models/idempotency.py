@@ -0,0 +1,35 @@
+"""
+Database models for idempotent request handling
+"""
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied Idempotency-Key and the response it produced
+
+    Attributes:
+        key: Idempotency-Key header value
+        request_hash: SHA-256 of the request body the key was first used with
+        status: in_progress while the original request runs, then completed
+        project_id: Project created by the original request, if any
+        response: JSON response body to replay
+        locked_until: When an in_progress claim is considered abandoned
+        created_at: When the key was first seen
+        expires_at: When the key may be reused / purged
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="in_progress", comment="in_progress, completed")
+    project_id = Column(Integer, nullable=True)
+    response = Column(Text, nullable=True, comment="JSON response body")
+    locked_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey(key={self.key}, status={self.status}, project_id={self.project_id})>"
@@ -20,6 +20,8 @@ class Project(Base):
         css: Generated CSS content
         javascript: Generated JavaScript content
         project_metadata: Additional project metadata (JSON format)
+        status: Generation status (generating, ready, failed)
+        change_seq: Change-feed sequence number of the last create/update
         created_at: Project creation timestamp
         updated_at: Last update timestamp
     """
@@ -38,6 +40,21 @@ class Project(Base):
     css = Column(Text, nullable=False)
     javascript = Column(Text, nullable=True)
     project_metadata = Column(Text, nullable=True, comment="JSON metadata")
+    status = Column(
+        String(20),
+        nullable=False,
+        default="ready",
+        server_default="ready",
+        comment="generating, ready, failed"
+    )
+    change_seq = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        index=True,
+        comment="stamped by services.change_feed on every create/update"
+    )
     created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
@@ -0,0 +1,37 @@
+"""
+Database models for project revision history
+"""
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ProjectRevision(Base):
+    """
+    One saved version of a project
+    
+    Attributes:
+        id: Unique revision row identifier
+        project_id: Project this revision belongs to
+        revision: 1-based version number within the project
+        is_snapshot: True if payload is a full copy, False if it is a delta
+            against the previous revision
+        payload: zlib-compressed JSON (full fields, or per-field edit ops)
+        size: Stored payload size in bytes
+        created_at: When this version was saved
+    """
+    __tablename__ = "project_revisions"
+    __table_args__ = (
+        UniqueConstraint("project_id", "revision", name="uq_project_revision"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    revision = Column(Integer, nullable=False)
+    is_snapshot = Column(Boolean, nullable=False, default=False)
+    payload = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<ProjectRevision(project_id={self.project_id}, revision={self.revision}, snapshot={self.is_snapshot})>"
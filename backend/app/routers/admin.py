@@ -0,0 +1,140 @@
+"""
+Administrative endpoints
+"""
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..database import get_read_db
+from ..schemas.project import WebsiteType
+from ..services import retention, startup, usage
+from ..services.project_service import ProjectService
+
+settings = get_settings()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Dependency guarding admin endpoints
+    
+    Fails closed: without ADMIN_TOKEN configured every admin route is refused.
+    
+    Raises:
+        HTTPException: 403 unless ADMIN_TOKEN is set and the header matches it
+    """
+    expected = settings.admin_token.encode()
+    supplied = (x_admin_token or "").encode()
+    if not expected or not hmac.compare_digest(supplied, expected):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get(
+    "/startup",
+    summary="Startup-time report",
+    description="Cold-start phase timings and a python -X importtime breakdown of the app import"
+)
+def startup_report(
+    top: int = Query(20, ge=1, le=200),
+    refresh: bool = Query(False)
+):
+    """
+    Report where cold-start time goes.
+    
+    Args:
+        top: Number of modules to list per ranking
+        refresh: Re-measure the import breakdown instead of using the cached run
+        
+    Returns:
+        Phase timings for this process and the import-time breakdown
+    """
+    report = startup.phases()
+    report["imports"] = startup.import_time_breakdown(top=top, refresh=refresh)
+    return report
+
+
+@router.get(
+    "/usage",
+    summary="Model usage report",
+    description="Token usage, latency and quality per model tier and website type over recent generations"
+)
+def usage_report(
+    limit: int = Query(1000, ge=1, le=20000),
+    website_type: WebsiteType = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Aggregate recorded usage to tune model tiers on real traffic.
+    
+    Args:
+        limit: Number of most recent projects to include
+        website_type: Only include one website type (optional)
+        db: Database session
+        
+    Returns:
+        Totals plus per-tier and per-website-type summaries
+    """
+    return usage.aggregate(ProjectService.recent_metadata(db, limit=limit, website_type=website_type))
+
+
+@router.get(
+    "/retention",
+    summary="Retention policy and storage",
+    description="Configured retention rules, what they would delete now, and database size"
+)
+def retention_status():
+    """
+    Preview the retention rules without deleting anything.
+    
+    Returns:
+        Policy settings, a dry-run count per rule and storage figures
+    """
+    return {
+        "policy": retention.policy(),
+        "preview": retention.run(dry_run=True),
+        "storage": retention.storage_stats(),
+    }
+
+
+@router.post(
+    "/retention/run",
+    summary="Run retention now",
+    description="Apply the retention rules in batches and reclaim freed space"
+)
+def run_retention(
+    dry_run: bool = Query(False),
+    reclaim: bool = Query(True)
+):
+    """
+    Apply the retention rules immediately (also when the background worker is disabled).
+    
+    Args:
+        dry_run: Only count what each rule would delete
+        reclaim: Run incremental VACUUM (SQLite) / VACUUM ANALYZE (Postgres) afterwards
+        
+    Returns:
+        Per-rule counts, batches, reclaim result and storage after the run
+    """
+    report = retention.run(dry_run=dry_run, reclaim=reclaim)
+    report["storage"] = retention.storage_stats()
+    return report
+
+
+@router.post(
+    "/retention/convert-auto-vacuum",
+    summary="Convert SQLite to incremental auto-vacuum",
+    description="One-time full VACUUM switching an existing SQLite database to auto_vacuum=incremental (locks the database while it runs)"
+)
+def convert_auto_vacuum():
+    """
+    Convert a SQLite database created before auto_vacuum=incremental was configured.
+    
+    Returns:
+        Conversion result and storage afterwards
+    """
+    report = retention.convert_sqlite_auto_vacuum()
+    report["storage"] = retention.storage_stats()
+    return report
@@ -0,0 +1,64 @@
+"""
+Content-addressed asset endpoint for published previews
+"""
+import re
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import get_settings
+from ..database import get_async_db
+from ..services import metrics, publishing
+
+router = APIRouter(prefix="/api", tags=["assets"])
+settings = get_settings()
+
+_ASSET_NAME = re.compile(r"^([0-9a-f]{64})\.(css|js)$")
+
+
+@router.get(
+    "/assets/{name}",
+    summary="Get a published asset",
+    description="Serve a style sheet or script by content hash ({hash}.css or {hash}.js); cacheable forever"
+)
+async def get_asset(
+    name: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Serve a content-addressed asset.
+    
+    The URL changes whenever the content does, so responses are marked
+    immutable and browsers / CDNs never need to revalidate them.
+    
+    Args:
+        name: {hash}.css or {hash}.js
+        if_none_match: Conditional request header
+        db: Database session
+        
+    Returns:
+        The asset body, or 304 Not Modified
+        
+    Raises:
+        HTTPException: If no asset has this name
+    """
+    match = _ASSET_NAME.match(name)
+    if not match:
+        metrics.ASSET_REQUESTS.labels("not_found").inc()
+        raise HTTPException(status_code=404, detail="Asset not found")
+    asset_hash, kind = match.groups()
+    headers = {
+        "ETag": f'"{asset_hash}"',
+        "Cache-Control": f"public, max-age={settings.asset_max_age_s}, immutable",
+    }
+    if publishing.etag_matches(if_none_match, asset_hash):
+        metrics.ASSET_REQUESTS.labels("not_modified").inc()
+        return Response(status_code=304, headers=headers)
+    
+    asset = await publishing.get_asset_async(db, asset_hash)
+    
+    if asset is None or asset[0] != kind:
+        metrics.ASSET_REQUESTS.labels("not_found").inc()
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    return Response(asset[1], headers=headers, media_type=publishing.MEDIA_TYPES[kind])
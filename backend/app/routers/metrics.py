@@ -0,0 +1,19 @@
+"""
+Prometheus metrics endpoint
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..services.metrics import REGISTRY, CONTENT_TYPE_LATEST
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Expose request, provider, parsing and database metrics in Prometheus text format",
+    response_class=PlainTextResponse,
+)
+def get_metrics():
+    """Render all registered metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
@@ -1,22 +1,74 @@
 """
 API routes for website generation
 """
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Query
+from contextlib import contextmanager
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..config import get_settings
+from ..database import get_db, get_async_db, get_async_read_db
 from ..schemas.project import (
+    BulkDeleteRequest,
+    BulkDeleteResponse,
     GenerateWebsiteRequest,
     GenerateWebsiteResponse,
+    GenerationMode,
+    ProjectChangesResponse,
     ProjectResponse,
     ProjectListResponse,
+    ProjectRevisionContentResponse,
+    ProjectRevisionResponse,
+    ProjectSectionResponse,
+    ProjectStatus,
+    ProjectStatusResponse,
+    PublishResponse,
+    RegenerateSectionRequest,
     WebsiteType
 )
+from ..services import change_feed, deadline, idempotency, publishing, section_editor, serialization, skeletons
+from ..services.ai_service import get_ai_service
 from ..services.website_generator import WebsiteGeneratorService
 from ..services.project_service import ProjectService
+from ..services.revision_service import RevisionService
+from ..services import metrics
+from ..services.shared_state import get_shared_state
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["projects"])
+settings = get_settings()
+
+
+@contextmanager
+def _generation_slot():
+    """
+    Hold one of max_concurrent_generations slots across all workers
+    
+    Raises:
+        HTTPException: 503 when every slot is taken
+    """
+    if settings.max_concurrent_generations <= 0:
+        yield
+        return
+    shared_state = get_shared_state()
+    token = shared_state.try_acquire("generations", settings.max_concurrent_generations)
+    if token is None:
+        raise HTTPException(status_code=503, detail="Too many website generations in progress, please retry shortly")
+    try:
+        yield
+    finally:
+        shared_state.release(token)
+
+
+def generation_slot():
+    """Dependency enforcing max_concurrent_generations (see _generation_slot)"""
+    with _generation_slot():
+        yield
 
 
 @router.post(
@@ -25,23 +77,132 @@ router = APIRouter(prefix="/api", tags=["projects"])
     summary="Generate a website from natural language",
     description="Takes user requirements and generates HTML, CSS, and JS using AI"
 )
-def generate_website(
+async def generate_website(
     request: GenerateWebsiteRequest,
-    db: Session = Depends(get_db)
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(default=None, min_length=1, max_length=255),
+    x_request_timeout: Optional[float] = Header(default=None, gt=0)
 ):
     """
     Generate a complete website based on user requirements.
     
+    In skeleton mode the project is saved with a precomputed placeholder
+    page for its type and returned immediately with status "generating";
+    the site is generated in the background and swapped into the same
+    project (poll GET /api/projects/{id}/status).
+    
+    With an Idempotency-Key header, a retry of the same request replays the
+    original response (marked Idempotent-Replayed: true) instead of
+    generating again, waiting for the original if it is still running.
+    
+    Generation runs against a deadline (generation_deadline_s, or the
+    X-Request-Timeout header in seconds up to generation_deadline_max_s)
+    split across the provider attempts. If the client disconnects, provider
+    calls in flight are abandoned and nothing is saved; an Idempotency-Key
+    is released, so a retry with it generates again.
+    
     Args:
-        request: GenerateWebsiteRequest with user_prompt, website_type, and optional title
+        request: GenerateWebsiteRequest with user_prompt, website_type, optional title and mode
+        http_request: Raw request, watched for a client disconnect
+        background_tasks: Runs skeleton-mode generation after the response
         db: Database session
+        idempotency_key: Idempotency-Key header (optional)
+        x_request_timeout: Deadline override in seconds (optional)
         
     Returns:
-        GenerateWebsiteResponse with generated code and project ID
+        GenerateWebsiteResponse with generated (or skeleton) code and project ID
         
     Raises:
-        HTTPException: If generation fails or API error occurs
+        HTTPException: If generation fails or API error occurs; 409 if the
+            original request is still running after idempotency_wait_s;
+            422 if the key was used with a different request
     """
+    with deadline.scope(deadline.request_budget(x_request_timeout)) as budget:
+        watcher = asyncio.create_task(_cancel_on_disconnect(http_request, budget))
+        try:
+            if idempotency_key is not None:
+                stored = await _claim_idempotency_key(request, db, idempotency_key)
+                if stored is not None:
+                    return serialization.json_response(stored, headers={"Idempotent-Replayed": "true"})
+            # The threadpool worker runs in a copy of this context, so it sees the deadline
+            return await run_in_threadpool(_handle_generate_website, request, background_tasks, db, idempotency_key)
+        except deadline.GenerationCancelled:
+            logger.info("🔌 Client disconnected, website generation cancelled before saving")
+            # Nobody is listening; 499 (client closed request) only shows up in logs and metrics
+            return Response(status_code=499)
+        finally:
+            watcher.cancel()
+
+
+async def _cancel_on_disconnect(http_request: Request, budget: deadline.Deadline) -> None:
+    """Cancel the request's deadline once its client disconnects"""
+    while True:
+        # The body has been read, so the next message is the disconnect
+        message = await http_request.receive()
+        if message["type"] == "http.disconnect":
+            budget.cancel()
+            return
+
+
+async def _claim_idempotency_key(request: GenerateWebsiteRequest, db: Session, idempotency_key: str) -> Optional[dict]:
+    """
+    Claim the key (None: this request runs) or get the stored response to replay
+    
+    Raises:
+        HTTPException: 422 if the key was used with a different request; 409
+            (with Retry-After) if the original is still running after idempotency_wait_s
+    """
+    try:
+        return await idempotency.claim_async(db, idempotency_key, idempotency.request_hash(request.model_dump(mode="json")))
+    except idempotency.IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except idempotency.IdempotencyKeyInProgress as e:
+        retry_after = max(int(settings.idempotency_poll_ms / 1000), 1)
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(retry_after)})
+
+
+def _handle_generate_website(
+    request: GenerateWebsiteRequest,
+    background_tasks: BackgroundTasks,
+    db: Session,
+    idempotency_key: Optional[str]
+):
+    """generate_website body once any Idempotency-Key is claimed (blocking: provider calls, DB writes)"""
+    if idempotency_key is None:
+        with _generation_slot():
+            return serialization.json_response(_generate_website(request, background_tasks, db))
+    
+    # Also on GenerationCancelled: the client is gone, so its retry must not wait for or replay this run
+    completed = False
+    try:
+        with _generation_slot():
+            result = _generate_website(request, background_tasks, db)
+        # id 0 is the unsaved error page: don't pin it to the key, let a retry generate
+        if result["id"]:
+            idempotency.complete(db, idempotency_key, _json_compatible(result), result["id"])
+            completed = True
+        return serialization.json_response(result)
+    finally:
+        if not completed:
+            idempotency.release(db, idempotency_key)
+
+
+def _json_compatible(payload: dict) -> dict:
+    """Round-trip a response payload through JSON (datetimes to strings) for storage"""
+    return json.loads(serialization.dumps(payload))
+
+
+def _generate_website(
+    request: GenerateWebsiteRequest,
+    background_tasks: BackgroundTasks,
+    db: Session
+) -> dict:
+    """Run one generation and save the project; returns the GenerateWebsiteResponse payload"""
+    if request.mode == GenerationMode.SKELETON:
+        return _generate_skeleton_first(request, background_tasks, db)
+    
     try:
         # Initialize AI service
         ai_service = WebsiteGeneratorService()
@@ -49,12 +210,16 @@ def generate_website(
         # Generate website code
         generated_code = ai_service.generate_website(
             request.user_prompt,
-            request.website_type
+            request.website_type.value,
+            request.title
         )
         
         # Generate title if not provided
         title = request.title or f"{request.website_type.value.title()} - AI Generated"
         
+        # The client may have gone while the last attempt finished
+        deadline.check("save")
+        
         # Save to database (note: ai_service returns 'js' not 'javascript')
         project = ProjectService.create_project(
             db=db,
@@ -64,24 +229,17 @@ def generate_website(
             html=generated_code['html'],
             css=generated_code['css'],
             javascript=generated_code.get('js', ''),  # Map 'js' to 'javascript' field
-            metadata={'source': 'gemini_api_with_hf_fallback'}
+            metadata=WebsiteGeneratorService.metadata_for(generated_code)
         )
         
-        return GenerateWebsiteResponse(
-            id=project.id,
-            title=project.title,
-            website_type=project.website_type,
-            html=project.html,
-            css=project.css,
-            javascript=project.javascript,
-            created_at=project.created_at
-        )
+        return serialization.to_dict(project, serialization.GENERATED_FIELDS)
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
     except Exception as e:
         # Log full error for debugging
         logger.error(f"Website generation error: {str(e)}", exc_info=True)
+        metrics.FALLBACK_HTML_SERVED.labels("route_error").inc()
         # Don't crash - return graceful error response with fallback indication
         # This allows frontend to show the partial generation message
         return GenerateWebsiteResponse(
@@ -117,7 +275,77 @@ def generate_website(
             css="<style>/* Fallback CSS */</style>",
             javascript="<script>/* Fallback JS */</script>",
             created_at=None
-        )
+        ).model_dump()
+
+
+def _generate_skeleton_first(
+    request: GenerateWebsiteRequest,
+    background_tasks: BackgroundTasks,
+    db: Session
+) -> dict:
+    """Save a skeleton project now and schedule its generation (see generate_website)"""
+    title = request.title or f"{request.website_type.value.title()} - AI Generated"
+    skeleton = skeletons.skeleton_for(request.website_type.value, title)
+    project = ProjectService.create_project(
+        db=db,
+        title=title,
+        website_type=request.website_type,
+        user_prompt=request.user_prompt,
+        html=skeleton['html'],
+        css=skeleton['css'],
+        javascript=skeleton['js'],
+        metadata={'source': 'skeleton'},
+        status=ProjectStatus.GENERATING
+    )
+    background_tasks.add_task(
+        WebsiteGeneratorService().personalize_project,
+        project.id,
+        request.user_prompt,
+        request.website_type.value,
+        request.title
+    )
+    return serialization.to_dict(project, serialization.GENERATED_FIELDS)
+
+
+@router.get(
+    "/projects/changes",
+    response_model=ProjectChangesResponse,
+    summary="Project change feed",
+    description="Projects created, updated or deleted since a token, with optional long-polling"
+)
+async def get_project_changes(
+    since: Optional[str] = Query(None, description="Token from the previous call; omit to get the current head token"),
+    limit: int = Query(100, ge=1, le=500),
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for a change when there is none yet"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Incremental sync for project lists.
+    
+    Start by calling without `since` (returns the head token, then load the
+    list), then keep passing back the returned token. With `wait`, the call
+    returns as soon as something changes (capped at change_feed_max_wait_s).
+    
+    Args:
+        since: Opaque token from the previous response
+        limit: Maximum changed + deleted entries per page
+        wait: Long-poll timeout in seconds
+        db: Database session
+        
+    Returns:
+        ProjectChangesResponse with changed projects, deleted IDs and the next token
+        
+    Raises:
+        HTTPException: 400 if the token is malformed
+    """
+    try:
+        cursor = change_feed.decode_token(since) if since is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    changes = await change_feed.changes_since(db, cursor, limit=limit, wait_s=wait)
+    changes["changed"] = [serialization.to_dict(p, serialization.PROJECT_LIST_FIELDS) for p in changes["changed"]]
+    return serialization.json_response(changes)
 
 
 @router.get(
@@ -126,9 +354,9 @@ def generate_website(
     summary="Get a generated project",
     description="Retrieve a previously generated website project by ID"
 )
-def get_project(
+async def get_project(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Retrieve a generated website project.
@@ -143,12 +371,43 @@ def get_project(
     Raises:
         HTTPException: If project not found
     """
-    project = ProjectService.get_project(db, project_id)
+    project = await ProjectService.get_project_dict_async(db, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
     
-    return ProjectResponse.from_orm(project)
+    return serialization.json_response(project)
+
+
+@router.get(
+    "/projects/{project_id}/status",
+    response_model=ProjectStatusResponse,
+    summary="Get project generation status",
+    description="Poll whether a skeleton-mode project has been generated"
+)
+async def get_project_status(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Lightweight status check for skeleton-mode generation.
+    
+    Args:
+        project_id: ID of the project
+        db: Database session
+        
+    Returns:
+        ProjectStatusResponse with status and updated_at
+        
+    Raises:
+        HTTPException: If project not found
+    """
+    status = await ProjectService.get_project_status_async(db, project_id)
+    
+    if not status:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    return status
 
 
 @router.get(
@@ -157,11 +416,11 @@ def get_project(
     summary="List all projects",
     description="Retrieve a paginated list of all generated projects"
 )
-def list_projects(
+async def list_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     website_type: WebsiteType = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     List all generated projects with pagination.
@@ -175,14 +434,14 @@ def list_projects(
     Returns:
         List of ProjectListResponse objects
     """
-    projects = ProjectService.list_projects(
+    projects = await ProjectService.list_project_dicts_async(
         db,
         skip=skip,
         limit=limit,
         website_type=website_type
     )
     
-    return [ProjectListResponse.from_orm(p) for p in projects]
+    return serialization.json_response(projects)
 
 
 @router.delete(
@@ -190,9 +449,9 @@ def list_projects(
     summary="Delete a project",
     description="Delete a generated website project by ID"
 )
-def delete_project(
+async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a project.
@@ -207,9 +466,334 @@ def delete_project(
     Raises:
         HTTPException: If project not found
     """
-    success = ProjectService.delete_project(db, project_id)
+    success = await ProjectService.delete_project_async(db, project_id)
     
     if not success:
         raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
     
     return {"message": f"Project {project_id} deleted successfully"}
+
+
+@router.post(
+    "/projects/bulk-delete",
+    response_model=BulkDeleteResponse,
+    summary="Delete several projects",
+    description="Delete up to 1000 projects (and their revision history) in one transaction"
+)
+async def bulk_delete_projects(
+    request: BulkDeleteRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete projects by ID in one set-based statement.
+    
+    Args:
+        request: BulkDeleteRequest with the project IDs
+        db: Database session
+        
+    Returns:
+        BulkDeleteResponse with deleted and not-found IDs
+    """
+    requested = list(dict.fromkeys(request.ids))
+    deleted = await ProjectService.delete_projects_async(db, requested)
+    metrics.RETENTION_DELETED.labels("bulk_delete").inc(len(deleted))
+    found = set(deleted)
+    return BulkDeleteResponse(
+        deleted=sorted(found),
+        not_found=[project_id for project_id in requested if project_id not in found]
+    )
+
+
+@router.get(
+    "/projects/{project_id}/sections",
+    response_model=list[ProjectSectionResponse],
+    summary="List project sections",
+    description="List the semantic sections (header, nav, section, article, footer) of a project's HTML"
+)
+async def list_project_sections(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    List the addressable sections of a project.
+    
+    Args:
+        project_id: ID of the project
+        db: Database session
+        
+    Returns:
+        List of ProjectSectionResponse objects in document order
+        
+    Raises:
+        HTTPException: If project not found
+    """
+    project = await ProjectService.get_project_async(db, project_id)
+    
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    return [
+        ProjectSectionResponse(id=section.id, tag=section.tag, length=len(section.html))
+        for section in section_editor.parse_sections(project.html)
+    ]
+
+
+@router.post(
+    "/projects/{project_id}/publish",
+    response_model=PublishResponse,
+    summary="Publish a project",
+    description="Extract inline styles and scripts into content-addressed, immutable assets and store the rewritten page"
+)
+async def publish_project(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Publish a project's preview page.
+    
+    Args:
+        project_id: ID of the project
+        db: Database session
+        
+    Returns:
+        PublishResponse with the page's assets
+        
+    Raises:
+        HTTPException: If project not found
+    """
+    project = await ProjectService.get_project_async(db, project_id)
+    
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    published = await publishing.publish_async(db, project)
+    page = published["page"]
+    return PublishResponse(
+        project_id=project_id,
+        preview_url=f"{router.prefix}/projects/{project_id}/preview",
+        etag=page.etag,
+        html_bytes=len(page.html.encode("utf-8")),
+        source_bytes=page.source_bytes,
+        assets=published["assets"],
+        published_at=page.published_at,
+    )
+
+
+@router.get(
+    "/projects/{project_id}/preview",
+    response_class=HTMLResponse,
+    summary="Preview a project",
+    description="Serve the published page (republished first if the project changed); assets load from /api/assets"
+)
+async def preview_project(
+    project_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Serve a project's published page.
+    
+    The page revalidates on every visit (ETag) while the assets it links
+    to are cached as immutable, so a repeat visit transfers at most the HTML.
+    
+    Args:
+        project_id: ID of the project
+        if_none_match: Conditional request header
+        db: Database session
+        
+    Returns:
+        The page HTML, or 304 Not Modified
+        
+    Raises:
+        HTTPException: If project not found
+    """
+    page = await publishing.get_page_async(db, project_id)
+    
+    if not page:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    headers = {
+        "ETag": f'"{page.etag}"',
+        "Cache-Control": "no-cache",
+        # Generated scripts run in an opaque origin, away from the API's
+        "Content-Security-Policy": "sandbox allow-scripts allow-forms allow-popups allow-modals",
+    }
+    if publishing.etag_matches(if_none_match, page.etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(page.html, headers=headers)
+
+
+@router.post(
+    "/projects/{project_id}/regenerate-section",
+    response_model=ProjectResponse,
+    summary="Regenerate one section",
+    description="Regenerate a single section of a project's HTML and splice it back into the page"
+)
+def regenerate_section(
+    project_id: int,
+    request: RegenerateSectionRequest,
+    db: Session = Depends(get_db),
+    _slot: None = Depends(generation_slot)
+):
+    """
+    Regenerate one section of a project.
+    
+    Only the target section and a compact style summary are sent to the
+    model, so small edits cost a fraction of a full regeneration.
+    
+    Args:
+        project_id: ID of the project to edit
+        request: RegenerateSectionRequest with section_id and instruction
+        db: Database session
+        
+    Returns:
+        ProjectResponse with the updated project
+        
+    Raises:
+        HTTPException: If project or section not found, or both AI providers fail
+    """
+    project = ProjectService.get_project(db, project_id)
+    
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    sections = section_editor.parse_sections(project.html)
+    section = next((s for s in sections if s.id == request.section_id), None)
+    if section is None:
+        available = ", ".join(s.id for s in sections) or "none"
+        raise HTTPException(
+            status_code=404,
+            detail=f"Section '{request.section_id}' not found (available: {available})"
+        )
+    
+    fragment = get_ai_service().regenerate_section(
+        section_html=section.html,
+        tag=section.tag,
+        instruction=request.instruction,
+        style=section_editor.style_summary(project.html),
+        website_type=project.website_type,
+    )
+    if fragment is None:
+        raise HTTPException(status_code=502, detail="AI providers could not regenerate the section, please try again")
+    
+    fragment = section_editor.ensure_section_id(fragment, section.tag, section.id)
+    updated = ProjectService.update_project(
+        db,
+        project_id,
+        html=section_editor.splice_section(project.html, section, fragment)
+    )
+    return serialization.json_response(serialization.to_dict(updated, serialization.PROJECT_FIELDS))
+
+
+@router.get(
+    "/projects/{project_id}/revisions",
+    response_model=list[ProjectRevisionResponse],
+    summary="List project revisions",
+    description="List the saved versions of a project, newest first"
+)
+async def list_project_revisions(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    List the revision history of a project.
+    
+    History starts with the first edit; a project that was never edited
+    has no revisions.
+    
+    Args:
+        project_id: ID of the project
+        db: Database session
+        
+    Returns:
+        List of ProjectRevisionResponse objects, newest first
+        
+    Raises:
+        HTTPException: If project not found
+    """
+    project = await ProjectService.get_project_async(db, project_id)
+    
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    
+    revisions = await db.run_sync(RevisionService.list_revisions, project_id)
+    return [ProjectRevisionResponse.from_orm(r) for r in revisions]
+
+
+@router.get(
+    "/projects/{project_id}/revisions/{revision}",
+    response_model=ProjectRevisionContentResponse,
+    summary="Get a project revision",
+    description="Reconstruct the HTML, CSS and JS of one saved version of a project"
+)
+async def get_project_revision(
+    project_id: int,
+    revision: int,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Fetch one version of a project.
+    
+    Args:
+        project_id: ID of the project
+        revision: Revision number
+        db: Database session
+        
+    Returns:
+        ProjectRevisionContentResponse with the reconstructed content
+        
+    Raises:
+        HTTPException: If the revision does not exist
+    """
+    content = await db.run_sync(RevisionService.reconstruct, project_id, revision)
+    
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} of project {project_id} not found")
+    
+    return ProjectRevisionContentResponse(**content)
+
+
+@router.post(
+    "/projects/{project_id}/revisions/{revision}/restore",
+    response_model=ProjectResponse,
+    summary="Restore a project revision",
+    description="Make a saved version the current content of a project (recorded as a new revision)"
+)
+def restore_project_revision(
+    project_id: int,
+    revision: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Restore an earlier version of a project.
+    
+    The restore is itself an edit, so it appends a new revision and the
+    versions after the restored one stay available.
+    
+    Args:
+        project_id: ID of the project
+        revision: Revision number to restore
+        db: Database session
+        
+    Returns:
+        ProjectResponse with the restored project
+        
+    Raises:
+        HTTPException: If the revision does not exist
+    """
+    content = RevisionService.reconstruct(db, project_id, revision)
+    
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} of project {project_id} not found")
+    
+    updated = ProjectService.update_project(
+        db,
+        project_id,
+        title=content["title"],
+        html=content["html"],
+        css=content["css"],
+        javascript=content["javascript"]
+    )
+    if updated is None:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} not found")
+    return serialization.json_response(serialization.to_dict(updated, serialization.PROJECT_FIELDS))
@@ -2,7 +2,7 @@
 Pydantic schemas for API request/response validation
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -15,6 +15,19 @@ class WebsiteType(str, Enum):
     LANDING_PAGE = "landing_page"
 
 
+class ProjectStatus(str, Enum):
+    """Generation status of a project"""
+    GENERATING = "generating"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class GenerationMode(str, Enum):
+    """How generate-website responds"""
+    FULL = "full"          # wait for the generated site
+    SKELETON = "skeleton"  # return a skeleton page now, generate in the background
+
+
 class GenerateWebsiteRequest(BaseModel):
     """
     Request schema for generating a website
@@ -23,10 +36,13 @@ class GenerateWebsiteRequest(BaseModel):
         user_prompt: Natural language description of desired website
         website_type: Type of website to generate
         title: Optional project title (auto-generated if not provided)
+        mode: "full" waits for generation; "skeleton" returns a placeholder
+            page immediately and fills the project in the background
     """
     user_prompt: str = Field(..., min_length=10, max_length=2000)
     website_type: WebsiteType = Field(default=WebsiteType.LANDING_PAGE)
     title: Optional[str] = Field(default=None, max_length=255)
+    mode: GenerationMode = Field(default=GenerationMode.FULL)
 
 
 class GeneratedCode(BaseModel):
@@ -47,6 +63,7 @@ class GenerateWebsiteResponse(BaseModel):
         html: Generated HTML
         css: Generated CSS
         javascript: Generated JavaScript (if applicable)
+        status: "generating" while a skeleton is being replaced, else "ready"
         created_at: Creation timestamp
     """
     id: int
@@ -55,6 +72,7 @@ class GenerateWebsiteResponse(BaseModel):
     html: str
     css: str
     javascript: Optional[str] = None
+    status: ProjectStatus = ProjectStatus.READY
     created_at: datetime
     
     class Config:
@@ -70,6 +88,7 @@ class ProjectResponse(BaseModel):
     html: str
     css: str
     javascript: Optional[str] = None
+    status: ProjectStatus
     created_at: datetime
     updated_at: datetime
     
@@ -82,8 +101,142 @@ class ProjectListResponse(BaseModel):
     id: int
     title: str
     website_type: WebsiteType
+    status: ProjectStatus
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class ProjectStatusResponse(BaseModel):
+    """Lightweight generation status for polling"""
+    id: int
+    status: ProjectStatus
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class RegenerateSectionRequest(BaseModel):
+    """
+    Request schema for regenerating one section of a project
+    
+    Attributes:
+        section_id: Section id attribute (or generated "<tag>-<n>" id)
+        instruction: What to change in the section
+    """
+    section_id: str = Field(..., min_length=1, max_length=100)
+    instruction: str = Field(..., min_length=3, max_length=1000)
+
+
+class ProjectSectionResponse(BaseModel):
+    """A semantic section of a project's HTML"""
+    id: str
+    tag: str
+    length: int
+
+
+class ProjectRevisionResponse(BaseModel):
+    """
+    One entry of a project's revision history
+    
+    Attributes:
+        revision: 1-based version number
+        is_snapshot: Whether the version is stored in full rather than as a delta
+        size: Stored (compressed) size in bytes
+        created_at: When the version was saved
+    """
+    revision: int
+    is_snapshot: bool
+    size: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ProjectRevisionContentResponse(BaseModel):
+    """Response schema for a reconstructed project revision"""
+    revision: int
+    title: str
+    html: str
+    css: str
+    javascript: Optional[str] = None
+    created_at: datetime
+
+
+class BulkDeleteRequest(BaseModel):
+    """Request schema for deleting several projects at once"""
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkDeleteResponse(BaseModel):
+    """
+    Response schema for a bulk delete
+    
+    Attributes:
+        deleted: IDs that were deleted
+        not_found: Requested IDs that did not exist
+    """
+    deleted: List[int]
+    not_found: List[int]
+
+
+class ProjectChangesResponse(BaseModel):
+    """
+    Response schema for the project change feed
+    
+    Attributes:
+        changed: Projects created or updated since the token
+        deleted: IDs of projects deleted since the token
+        token: Pass as `since` on the next call
+        has_more: More changes are ready; call again right away
+        reset: The token is too old or unknown; reload the full list
+    """
+    changed: List[ProjectListResponse]
+    deleted: List[int]
+    token: str
+    has_more: bool = False
+    reset: bool = False
+
+
+class PublishedAssetResponse(BaseModel):
+    """
+    A content-addressed style sheet or script of a published page
+    
+    Attributes:
+        hash: SHA-256 of kind and content
+        kind: css or js
+        size: Content length in bytes
+        url: Where the page loads it from
+        shared: The same content was already stored (by this or another project)
+    """
+    hash: str
+    kind: str
+    size: int
+    url: str
+    shared: bool
+
+
+class PublishResponse(BaseModel):
+    """
+    Response schema for publishing a project
+    
+    Attributes:
+        project_id: Published project
+        preview_url: URL of the published page
+        etag: Entity tag of the page HTML
+        html_bytes: Size of the published HTML
+        source_bytes: Size of the inline document it replaces
+        assets: Assets the page links to
+        published_at: When the page was published
+    """
+    project_id: int
+    preview_url: str
+    etag: str
+    html_bytes: int
+    source_bytes: int
+    assets: List[PublishedAssetResponse]
+    published_at: datetime
@@ -6,17 +6,14 @@ Fallback: HuggingFace Inference API
 import logging
 import json
 import time
-import google.generativeai as genai
-import requests
 from typing import Optional
 from ..config import get_settings
+from . import deadline, metrics, model_router, quality_service, template_engine, timing, usage
+from .section_editor import extract_fragment
 
 logger = logging.getLogger(__name__)
 
-# Get settings
-settings = get_settings()
-
-# Fallback HTML template for when both providers fail
+# Static page for when both providers fail and no prompt is available for the template engine
 FALLBACK_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -43,67 +40,283 @@ FALLBACK_HTML = """<!DOCTYPE html>
 </body>
 </html>"""
 
+# What each website type contains (prompt wording; skeleton pages follow the same structure)
+WEBSITE_DESCRIPTIONS = {
+    "landing_page": "a professional landing page with hero section, features, CTA, and contact info",
+    "portfolio": "a developer/designer portfolio with project showcase, skills, and contact section",
+    "blog": "a blog website with post listing, categories, search functionality, and article view",
+    "ecommerce": "an e-commerce store with product grid, filters, shopping cart, and checkout",
+}
+
 
 class AIService:
     """AI service with Gemini primary and HuggingFace fallback"""
     
     def __init__(self):
-        """Initialize AI service with both providers"""
-        self.settings = settings
-        self._init_gemini()
+        """Initialize AI service (provider SDKs are imported on first use)"""
+        self.settings = get_settings()
+        self._genai = None
     
-    def _init_gemini(self):
-        """Initialize Gemini API"""
-        try:
+    def _gemini_sdk(self):
+        """Import and configure the Gemini SDK on first use"""
+        if self._genai is None:
+            # Deferred: google.generativeai costs ~0.3s to import (cold start)
+            import google.generativeai as genai
             genai.configure(api_key=self.settings.gemini_api_key)
             logger.info("✅ Gemini API initialized successfully")
-        except Exception as e:
-            logger.warning(f"⚠️ Gemini API initialization failed: {e}")
+            self._genai = genai
+        return self._genai
     
-    def generate_website(self, prompt: str, website_type: str = "landing_page") -> dict:
+    def generate_website(
+        self,
+        prompt: str,
+        website_type: str = "landing_page",
+        user_prompt: Optional[str] = None,
+        title: Optional[str] = None
+    ) -> dict:
         """
-        Generate website code using Gemini or HuggingFace
+        Generate website code using the template engine, Gemini or HuggingFace
         
         Args:
             prompt: User description of desired website
             website_type: Type of website (landing_page, portfolio, blog, ecommerce)
+            user_prompt: Raw user requirements; enables the offline template
+                tier (first tier for simple prompts, and the final fallback)
+            title: Explicit site title, if the user gave one
         
         Returns:
-            dict with 'html', 'css', 'js' keys
+            dict with 'html', 'css', 'js' keys, plus 'provider', 'quality'
+            and 'usage' (model tier, tokens and latency of every provider call)
+        
+        Raises:
+            deadline.GenerationCancelled: The request's client disconnected
         """
         logger.info(f"🔄 Starting website generation for type: {website_type}")
         
+        # The request's deadline when the route bound one, else generation_deadline_s
+        with deadline.scope(), usage.ledger() as ledger:
+            slots = None
+            if user_prompt and self.settings.template_tier_enabled:
+                slots = template_engine.extract_slots(
+                    user_prompt, website_type, title, max_simple_words=self.settings.template_max_prompt_words
+                )
+            complexity = model_router.estimate_complexity(user_prompt or prompt, website_type, slots)
+            ledger.complexity = complexity.score
+            
+            if slots is not None and slots.simple:
+                logger.info("✅ Simple prompt, website assembled by template engine")
+                ledger.tier, ledger.model = "template", "template_engine"
+                metrics.MODEL_TIER_SELECTIONS.labels("template").inc()
+                result = self._from_template(slots, "simple_prompt")
+            else:
+                tier = model_router.select_tier(complexity)
+                ledger.tier, ledger.model = tier.name, tier.model
+                metrics.MODEL_TIER_SELECTIONS.labels(tier.name).inc()
+                logger.info(
+                    f"🧭 Complexity {complexity.score} -> {tier.name} tier "
+                    f"({tier.model}, {tier.max_output_tokens} output tokens)"
+                )
+                with metrics.GENERATIONS_IN_FLIGHT.track_inprogress():
+                    result = self._generate(prompt, website_type, slots, tier)
+            
+            result["usage"] = ledger.summary()
+            return result
+    
+    def _from_template(self, slots: "template_engine.Slots", reason: str) -> dict:
+        """Assemble a site offline (deterministic output; not re-validated)"""
+        with timing.stage("template"):
+            result = template_engine.render(slots)
+        metrics.TEMPLATE_GENERATIONS.labels(reason).inc()
+        result["provider"] = "template"
+        result["quality"] = None
+        return result
+    
+    def _generate(
+        self,
+        prompt: str,
+        website_type: str,
+        slots: Optional["template_engine.Slots"] = None,
+        tier: Optional["model_router.ModelTier"] = None
+    ) -> dict:
+        """
+        Run the provider chain: Gemini, then HuggingFace, then static fallback
+        
+        Each candidate is validated and scored before it is returned. A page
+        scoring below quality_min_score is retried on Gemini (with its issues
+        listed in the prompt) up to quality_retries times, then handed to
+        the next provider in the chain. With slots, the template engine
+        replaces the static fallback page. Gemini calls use the tier's model
+        and output budget (settings.gemini_model / 4096 tokens without one).
+        
+        Each attempt gets an even share of the remaining deadline across the
+        attempts still possible; once too little is left the chain skips
+        straight to the offline fallback.
+        """
+        budget = deadline.current() or deadline.Deadline(self.settings.generation_deadline_s)
+        
         # Build the comprehensive prompt
         system_prompt = self._build_system_prompt(website_type)
         user_prompt = self._build_user_prompt(prompt, website_type)
         
         # Try Gemini first (Primary)
-        try:
-            result = self._try_gemini(system_prompt, user_prompt)
-            if result:
+        gemini_attempts = 1 + max(self.settings.quality_retries, 0) if self.settings.gemini_api_key else 0
+        fallback_attempts = 1 if self.settings.hf_api_token else 0
+        gemini_prompt = user_prompt
+        for attempt in range(gemini_attempts):
+            budget.check("gemini")
+            if not budget.can_attempt():
+                metrics.PROVIDER_ATTEMPTS_SKIPPED.labels("gemini").inc()
+                break
+            timeout = budget.attempt_timeout(gemini_attempts - attempt + fallback_attempts)
+            try:
+                with timing.stage("gemini"):
+                    result = self._try_gemini(system_prompt, gemini_prompt, tier, timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ Gemini generation error: {str(e)}")
+                result = None
+            if not result:
+                break
+            budget.check("validate")
+            if self._passes_quality(result, "gemini"):
                 logger.info("✅ Website generated successfully with Gemini")
                 return result
-        except Exception as e:
-            logger.warning(f"⚠️ Gemini generation error: {str(e)}")
+            gemini_prompt = self._build_repair_prompt(user_prompt, result["quality"])
         
         # Fallback to HuggingFace
         logger.info("⚠️ Gemini failed, falling back to HuggingFace")
-        try:
-            result = self._try_huggingface(system_prompt, user_prompt)
-            if result:
-                logger.info("✅ Website generated successfully with HuggingFace")
-                return result
-        except Exception as e:
-            logger.warning(f"⚠️ HuggingFace generation error: {str(e)}")
+        metrics.FALLBACK_ACTIVATIONS.labels("huggingface").inc()
+        budget.check("huggingface")
+        if budget.can_attempt():
+            try:
+                with timing.stage("huggingface"):
+                    result = self._try_huggingface(system_prompt, user_prompt, budget.attempt_timeout(1))
+                if result:
+                    budget.check("validate")
+                if result and self._passes_quality(result, "huggingface"):
+                    logger.info("✅ Website generated successfully with HuggingFace")
+                    return result
+            except Exception as e:
+                logger.warning(f"⚠️ HuggingFace generation error: {str(e)}")
+        else:
+            logger.warning(f"⚠️ Deadline nearly spent ({budget.remaining():.1f}s left), skipping HuggingFace")
+            metrics.PROVIDER_ATTEMPTS_SKIPPED.labels("huggingface").inc()
+        
+        if slots is not None:
+            logger.error("❌ Both AI providers failed, assembling website with template engine")
+            return self._from_template(slots, "provider_fallback")
         
         # If both fail, return fallback HTML (no crash!)
         logger.error("❌ Both AI providers failed, returning fallback HTML")
+        metrics.FALLBACK_HTML_SERVED.labels("ai_service").inc()
         return {
             "html": FALLBACK_HTML,
             "css": "<style>/* Styles included in HTML */</style>",
             "js": "<script>/* Fallback mode */</script>",
+            "provider": "fallback",
+            "quality": None,
         }
     
+    def _passes_quality(self, result: dict, provider: str) -> bool:
+        """
+        Validate a parsed candidate and decide whether it may be persisted
+        
+        Adds 'provider' and 'quality' (validator report or None) to result.
+        """
+        result["provider"] = provider
+        with timing.stage("validate"):
+            report = quality_service.score_output(result["html"], result["css"], result["js"])
+        result["quality"] = report
+        if report is None:
+            return True  # validation unavailable; don't discard the page
+        
+        metrics.QUALITY_SCORE.labels(provider).observe(report["score"])
+        if report["score"] >= self.settings.quality_min_score:
+            return True
+        
+        metrics.QUALITY_REJECTIONS.labels(provider).inc()
+        codes = ", ".join(issue["code"] for issue in report["issues"][:5])
+        logger.warning(f"⚠️ {provider} output scored {report['score']} (< {self.settings.quality_min_score}): {codes}")
+        return False
+    
+    def _build_repair_prompt(self, user_prompt: str, report: dict, max_issues: int = 8) -> str:
+        """User prompt for a retry, listing what was wrong with the previous page"""
+        problems = "\n".join(
+            f"- {issue['message']}" for issue in report["issues"][:max_issues]
+        )
+        return f"""{user_prompt}
+
+Your previous answer was rejected by an automated validator:
+{problems}
+
+Fix every problem listed above in this new answer."""
+    
+    def regenerate_section(
+        self,
+        section_html: str,
+        tag: str,
+        instruction: str,
+        style: str,
+        website_type: str = "landing_page"
+    ) -> Optional[str]:
+        """
+        Regenerate a single section of an existing page
+        
+        Only the target section and a compact style summary are sent, with a
+        small output budget, instead of a full-site round trip.
+        
+        Args:
+            section_html: Current markup of the section
+            tag: Section element name (header, section, footer, ...)
+            instruction: What the user wants changed
+            style: Style summary of the surrounding page
+            website_type: Type of website the section belongs to
+        
+        Returns:
+            Replacement markup for the section, or None if both providers failed
+        """
+        logger.info(f"🔄 Regenerating <{tag}> section for type: {website_type}")
+        prompt = self._build_section_prompt(section_html, tag, instruction, style, website_type)
+        max_tokens = self.settings.section_max_output_tokens
+        
+        with deadline.scope() as budget, metrics.GENERATIONS_IN_FLIGHT.track_inprogress():
+            with timing.stage("gemini"):
+                response_text = self._call_gemini(prompt, max_output_tokens=max_tokens, timeout=budget.attempt_timeout(2))
+            fragment = extract_fragment(response_text, tag) if response_text else None
+            if fragment:
+                return fragment
+            
+            logger.info("⚠️ Gemini section edit failed, falling back to HuggingFace")
+            metrics.FALLBACK_ACTIVATIONS.labels("huggingface").inc()
+            with timing.stage("huggingface"):
+                response_text = self._call_huggingface(
+                    f"[INST] {prompt} [/INST]", max_new_tokens=max_tokens, timeout=budget.attempt_timeout(1)
+                )
+            fragment = extract_fragment(response_text, tag) if response_text else None
+            if fragment:
+                return fragment
+        
+        metrics.PARSE_FAILURES.labels("missing_section").inc()
+        logger.error("❌ Both AI providers failed to regenerate the section")
+        return None
+    
+    def _build_section_prompt(self, section_html: str, tag: str, instruction: str, style: str, website_type: str) -> str:
+        """Build a compact prompt for editing one section"""
+        return f"""You are editing one <{tag}> section of an existing {website_type.replace('_', ' ')} website.
+
+Page style (match it):
+{style}
+
+Current section:
+{section_html}
+
+Requested change:
+{instruction}
+
+Rules:
+- Return ONLY the complete replacement <{tag}>...</{tag}> element, no other text
+- Keep the same id attribute and Tailwind CSS styling conventions
+- Semantic, accessible HTML; no external assets; no inline event handlers"""
+    
     def _build_system_prompt(self, website_type: str) -> str:
         """Build system prompt for consistent output"""
         return """You are a senior UI/UX designer and frontend engineer specializing in modern web design.
@@ -137,14 +350,7 @@ Focus on clean, maintainable, production-ready code."""
     
     def _build_user_prompt(self, user_description: str, website_type: str) -> str:
         """Build user prompt with context"""
-        website_descriptions = {
-            "landing_page": "a professional landing page with hero section, features, CTA, and contact info",
-            "portfolio": "a developer/designer portfolio with project showcase, skills, and contact section",
-            "blog": "a blog website with post listing, categories, search functionality, and article view",
-            "ecommerce": "an e-commerce store with product grid, filters, shopping cart, and checkout",
-        }
-        
-        website_desc = website_descriptions.get(website_type, "a modern website")
+        website_desc = WEBSITE_DESCRIPTIONS.get(website_type, "a modern website")
         
         return f"""Generate {website_desc}.
 
@@ -169,9 +375,54 @@ Return ONLY the JSON response in this exact format:
 
 Do NOT add any text before or after the JSON."""
     
-    def _try_gemini(self, system_prompt: str, user_prompt: str) -> Optional[dict]:
+    def _try_gemini(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tier: Optional["model_router.ModelTier"] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[dict]:
         """Try to generate website using Gemini API"""
         start_time = time.time()
+        
+        # Combined prompt for Gemini
+        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        if tier is not None:
+            response_text = self._call_gemini(full_prompt, max_output_tokens=tier.max_output_tokens, model=tier.model, timeout=timeout)
+        else:
+            response_text = self._call_gemini(full_prompt, max_output_tokens=4096, timeout=timeout)
+        if not response_text:
+            return None
+        
+        # Parse the response
+        parsed = self._parse_ai_response(response_text)
+        if parsed:
+            logger.info(f"✅ Gemini succeeded in {time.time() - start_time:.1f}s")
+            return parsed
+        
+        logger.warning("⚠️ Gemini response parsing failed")
+        return None
+    
+    def _call_gemini(
+        self,
+        full_prompt: str,
+        max_output_tokens: int = 4096,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Send a prompt to Gemini and return the raw response text (None on failure)
+        
+        The call is abandoned after timeout seconds (default: the whole
+        generation deadline) or as soon as the request is cancelled.
+        """
+        timeout = timeout if timeout is not None else self.settings.generation_deadline_s
+        start_time = time.time()
+        outcome = "failure"
+        model_name = model or self.settings.gemini_model
+        sent = False
+        response = None
+        response_text = None
         try:
             logger.info("🚀 Attempting Gemini API...")
             
@@ -180,20 +431,23 @@ Do NOT add any text before or after the JSON."""
                 logger.error("❌ GEMINI_API_KEY not set in environment")
                 return None
             
-            model = genai.GenerativeModel(self.settings.gemini_model)
-            
-            # Combined prompt for Gemini
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
+            genai = self._gemini_sdk()
+            gemini = genai.GenerativeModel(model_name)
             
             logger.debug(f"Gemini prompt length: {len(full_prompt)} chars")
+            metrics.PROMPT_CHARS.labels("gemini").inc(len(full_prompt))
             
             # Generate with timeout and explicit safety settings
-            response = model.generate_content(
+            sent = True
+            response = deadline.call(
+                "gemini",
+                timeout,
+                gemini.generate_content,
                 full_prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.7,
                     top_p=0.9,
-                    max_output_tokens=4096,
+                    max_output_tokens=max_output_tokens,
                 ),
                 safety_settings=[
                     {
@@ -224,38 +478,56 @@ Do NOT add any text before or after the JSON."""
             
             elapsed = time.time() - start_time
             logger.debug(f"Gemini response received ({elapsed:.1f}s, {len(response_text)} chars)")
-            
-            # Parse the response
-            parsed = self._parse_ai_response(response_text)
-            if parsed:
-                logger.info(f"✅ Gemini succeeded in {elapsed:.1f}s")
-                return parsed
-            
-            logger.warning("⚠️ Gemini response parsing failed")
-            return None
+            metrics.RESPONSE_CHARS.labels("gemini").inc(len(response_text))
+            outcome = "success"
+            return response_text
         
+        except deadline.GenerationCancelled:
+            outcome = "cancelled"
+            raise
+        except deadline.UpstreamSaturated:
+            logger.warning("⚠️ Gemini attempt refused: too many upstream calls still running")
+            sent = False
+            outcome = "saturated"
+            return None
+        except deadline.AttemptTimeout:
+            elapsed = time.time() - start_time
+            logger.error(f"❌ Gemini timeout ({elapsed:.1f}s, >{timeout:.1f}s)")
+            outcome = "timeout"
+            return None
         except Exception as e:
             elapsed = time.time() - start_time
             logger.error(f"❌ Gemini API error ({elapsed:.1f}s): {type(e).__name__}: {str(e)[:200]}")
             return None
+        finally:
+            elapsed = time.time() - start_time
+            metrics.PROVIDER_LATENCY.labels("gemini", outcome).observe(elapsed)
+            if sent:
+                self._record_gemini_usage(model_name, outcome, elapsed, full_prompt, response, response_text)
     
-    def _try_huggingface(self, system_prompt: str, user_prompt: str) -> Optional[dict]:
+    def _record_gemini_usage(self, model_name: str, outcome: str, elapsed: float, full_prompt: str, response, response_text: Optional[str]) -> None:
+        """Account a Gemini call, using reported token counts when the SDK provides them"""
+        reported = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(reported, "prompt_token_count", None)
+        output_tokens = getattr(reported, "candidates_token_count", None)
+        estimated = prompt_tokens is None or output_tokens is None
+        usage.record_call(
+            "gemini",
+            model_name,
+            outcome,
+            elapsed,
+            prompt_tokens if prompt_tokens is not None else usage.estimate_tokens(full_prompt),
+            output_tokens if output_tokens is not None else usage.estimate_tokens(response_text or ""),
+            estimated=estimated,
+        )
+    
+    def _try_huggingface(self, system_prompt: str, user_prompt: str, timeout: Optional[float] = None) -> Optional[dict]:
         """Try to generate website using HuggingFace Inference API"""
         start_time = time.time()
-        try:
-            logger.info("🚀 Attempting HuggingFace API...")
-            
-            # Check if API token is set
-            if not self.settings.hf_api_token:
-                logger.error("❌ HF_API_TOKEN not set in environment")
-                return None
-            
-            url = f"{self.settings.hf_api_url}/{self.settings.hf_model}"
-            headers = {"Authorization": f"Bearer {self.settings.hf_api_token}"}
-            
-            # Format prompt for instruction-following models (Mistral)
-            # Don't mix system+user, just use clear instruction format
-            full_prompt = f"""[INST] You are a professional web developer. Generate a complete, responsive website based on this requirement:
+        
+        # Format prompt for instruction-following models (Mistral)
+        # Don't mix system+user, just use clear instruction format
+        full_prompt = f"""[INST] You are a professional web developer. Generate a complete, responsive website based on this requirement:
 
 {user_prompt}
 
@@ -271,21 +543,65 @@ Requirements:
 - Include Tailwind CSS CDN in <head>
 - Mobile-first responsive design
 - Valid JSON only [/INST]"""
+        
+        generated_text = self._call_huggingface(full_prompt, max_new_tokens=4096, timeout=timeout)
+        if not generated_text:
+            return None
+        
+        # Parse the response
+        parsed = self._parse_ai_response(generated_text)
+        if parsed:
+            logger.info(f"✅ HuggingFace succeeded in {time.time() - start_time:.1f}s")
+            return parsed
+        
+        logger.warning("⚠️ HuggingFace response parsing failed")
+        return None
+    
+    def _call_huggingface(self, full_prompt: str, max_new_tokens: int = 4096, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Send a prompt to the HuggingFace Inference API and return the generated text (None on failure)
+        
+        The call is abandoned after timeout seconds (default: the whole
+        generation deadline) or as soon as the request is cancelled.
+        """
+        import requests  # Deferred to first use (cold start)
+        
+        timeout = timeout if timeout is not None else self.settings.generation_deadline_s
+        start_time = time.time()
+        outcome = "failure"
+        sent = False
+        generated_text = None
+        try:
+            logger.info("🚀 Attempting HuggingFace API...")
+            
+            # Check if API token is set
+            if not self.settings.hf_api_token:
+                logger.error("❌ HF_API_TOKEN not set in environment")
+                return None
+            
+            url = f"{self.settings.hf_api_url}/{self.settings.hf_model}"
+            headers = {"Authorization": f"Bearer {self.settings.hf_api_token}"}
             
             payload = {
                 "inputs": full_prompt,
                 "parameters": {
-                    "max_new_tokens": 4096,
+                    "max_new_tokens": max_new_tokens,
                     "temperature": 0.7,
                     "top_p": 0.9,
                     "do_sample": True,
+                    # Only the completion: the echoed prompt contains example JSON that breaks parsing
+                    "return_full_text": False,
                 }
             }
             
             logger.debug(f"HF request URL: {url}")
             logger.debug(f"HF prompt length: {len(full_prompt)} chars")
+            metrics.PROMPT_CHARS.labels("huggingface").inc(len(full_prompt))
             
-            response = requests.post(url, json=payload, headers=headers, timeout=90)
+            sent = True
+            response = deadline.call(
+                "huggingface", timeout, requests.post, url, json=payload, headers=headers, timeout=timeout
+            )
             
             elapsed = time.time() - start_time
             logger.debug(f"HuggingFace response status: {response.status_code} (in {elapsed:.1f}s)")
@@ -294,6 +610,8 @@ Requirements:
                 logger.warning(f"⚠️ HuggingFace error {response.status_code}: {response.text[:200]}")
                 return None
             
+            metrics.RESPONSE_CHARS.labels("huggingface").inc(len(response.text))
+            
             data = response.json()
             logger.debug(f"HuggingFace response type: {type(data)}, keys: {data.keys() if isinstance(data, dict) else 'N/A'}")
             
@@ -323,18 +641,21 @@ Requirements:
                 logger.warning("⚠️ HuggingFace returned empty response")
                 return None
             
-            # Parse the response
-            parsed = self._parse_ai_response(str(generated_text))
-            if parsed:
-                logger.info(f"✅ HuggingFace succeeded in {elapsed:.1f}s")
-                return parsed
-            
-            logger.warning("⚠️ HuggingFace response parsing failed")
-            return None
+            outcome = "success"
+            return str(generated_text)
         
-        except requests.Timeout:
+        except deadline.GenerationCancelled:
+            outcome = "cancelled"
+            raise
+        except deadline.UpstreamSaturated:
+            logger.warning("⚠️ HuggingFace attempt refused: too many upstream calls still running")
+            sent = False
+            outcome = "saturated"
+            return None
+        except (requests.Timeout, deadline.AttemptTimeout):
             elapsed = time.time() - start_time
-            logger.error(f"❌ HuggingFace timeout ({elapsed:.1f}s, >90s)")
+            logger.error(f"❌ HuggingFace timeout ({elapsed:.1f}s, >{timeout:.1f}s)")
+            outcome = "timeout"
             return None
         except requests.ConnectionError as e:
             elapsed = time.time() - start_time
@@ -344,6 +665,20 @@ Requirements:
             elapsed = time.time() - start_time
             logger.error(f"❌ HuggingFace API error ({elapsed:.1f}s): {type(e).__name__}: {str(e)[:200]}")
             return None
+        finally:
+            elapsed = time.time() - start_time
+            metrics.PROVIDER_LATENCY.labels("huggingface", outcome).observe(elapsed)
+            if sent:
+                # The Inference API doesn't report token counts
+                usage.record_call(
+                    "huggingface",
+                    self.settings.hf_model,
+                    outcome,
+                    elapsed,
+                    usage.estimate_tokens(full_prompt),
+                    usage.estimate_tokens(str(generated_text or "")),
+                    estimated=True,
+                )
     
     def _parse_ai_response(self, response_text: str) -> Optional[dict]:
         """
@@ -361,9 +696,15 @@ Requirements:
         - JSON wrapped in markdown code blocks
         - Preamble text before JSON
         """
+        with timing.stage("parse", metrics.PARSE_DURATION):
+            return self._parse_json_payload(response_text)
+    
+    def _parse_json_payload(self, response_text: str) -> Optional[dict]:
+        """Extract and validate the JSON payload (see _parse_ai_response)"""
         try:
             if not response_text or not str(response_text).strip():
                 logger.warning("⚠️ Empty response text")
+                metrics.PARSE_FAILURES.labels("empty").inc()
                 return None
             
             response_text = str(response_text).strip()
@@ -400,6 +741,7 @@ Requirements:
                 # Try to use what we have
                 if "html" not in data:
                     logger.error("❌ HTML is missing from response")
+                    metrics.PARSE_FAILURES.labels("missing_html").inc()
                     return None
             
             # Extract and validate content
@@ -409,6 +751,7 @@ Requirements:
             
             if not html or len(html) < 50:  # Sanity check: HTML should have some content
                 logger.warning(f"⚠️ HTML content too short ({len(html)} chars)")
+                metrics.PARSE_FAILURES.labels("html_too_short").inc()
                 return None
             
             logger.info(f"✅ Parsed AI response successfully (HTML: {len(html)} chars)")
@@ -421,11 +764,27 @@ Requirements:
         except json.JSONDecodeError as e:
             logger.warning(f"⚠️ JSON parse error at line {e.lineno}, col {e.colno}: {e.msg}")
             logger.debug(f"Response text (first 500 chars): {response_text[:500]}")
+            metrics.PARSE_FAILURES.labels("invalid_json").inc()
             return None
         except Exception as e:
             logger.warning(f"⚠️ Error parsing AI response: {type(e).__name__}: {str(e)}")
+            metrics.PARSE_FAILURES.labels("error").inc()
             return None
 
 
-# Create singleton instance
-ai_service = AIService()
+# Singleton instance, created on first use (after fork in multi-worker mode)
+_ai_service: Optional[AIService] = None
+
+
+def get_ai_service() -> AIService:
+    """Get the process-wide AIService, creating it on first use"""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
+
+
+def reset_ai_service() -> None:
+    """Discard the AIService so provider clients are rebuilt in this process"""
+    global _ai_service
+    _ai_service = None
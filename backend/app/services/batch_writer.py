@@ -0,0 +1,112 @@
+"""
+Batched Writer Service
+Single-writer commit queue for SQLite
+
+SQLite allows one writer at a time, so concurrent request threads committing
+one row each mostly wait on the database lock. The BatchedWriter funnels
+inserts through one background thread that groups whatever is queued (up to
+max_batch_size, waiting at most max_wait_ms for stragglers) into a single
+transaction. Each caller blocks on its own Future and gets back its object
+with the generated primary key and server defaults loaded.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedWriter:
+    """Groups concurrent ORM inserts into shared transactions"""
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch_size: int = 64, max_wait_ms: int = 2):
+        self.session_factory = session_factory
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait_s = max(max_wait_ms, 0) / 1000.0
+        self._queue: "queue.Queue[Tuple[object, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, obj) -> Future:
+        """Queue an ORM object for insertion"""
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((obj, future))
+        return future
+
+    def insert(self, obj, timeout: Optional[float] = None):
+        """Insert an ORM object and wait for its commit; returns the detached, loaded object"""
+        return self.submit(obj).result(timeout=timeout)
+
+    def _ensure_thread(self) -> None:
+        # Also restarts the writer in a forked child, where the parent's thread doesn't exist
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-batch-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[object, Future]]:
+        """Block for one item, then collect more until the batch is full or max_wait elapses"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._commit(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                # One bad row must not fail the whole group: retry individually
+                logger.warning(f"⚠️ Batched insert of {len(batch)} rows failed ({type(e).__name__}), retrying one by one")
+                for item in batch:
+                    try:
+                        self._commit([item])
+                    except Exception as item_error:
+                        item[1].set_exception(item_error)
+
+    def _commit(self, batch: List[Tuple[object, Future]]) -> None:
+        """Insert a batch in one transaction and resolve its futures"""
+        session = self.session_factory()
+        try:
+            objects = [obj for obj, _ in batch]
+            session.add_all(objects)
+            start_time = time.perf_counter()
+            session.commit()
+            metrics.DB_COMMIT_DURATION.labels("batched_insert").observe(time.perf_counter() - start_time)
+            metrics.DB_BATCH_SIZE.observe(len(objects))
+
+            # Reload server defaults (created_at, ...) for the whole batch in one query
+            mapper = inspect(objects[0]).mapper
+            if len({inspect(obj).mapper for obj in objects}) == 1 and len(mapper.primary_key) == 1:
+                pk = mapper.primary_key[0]
+                session.query(mapper).filter(pk.in_([inspect(obj).identity[0] for obj in objects])).all()
+            else:
+                for obj in objects:
+                    session.refresh(obj)
+            session.expunge_all()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        for obj, future in batch:
+            future.set_result(obj)
@@ -0,0 +1,245 @@
+"""
+Change Feed Service
+Incremental project sync: GET /api/projects/changes?since=<token>
+
+Every transaction that creates or updates projects takes the next number
+from the single-row change_feed_state counter and stamps it on the rows
+(projects.change_seq, indexed); deletes write ProjectTombstone rows with
+it. The counter row stays locked until commit, so transactions commit in
+sequence order and a reader never skips a number that commits later.
+
+A token is an opaque wrapper around the last sequence number a client has
+seen. Every change commit bumps a shared-state counter; long-polling
+clients await this process's SharedStateMirror copy of it, so idle waiters
+(and the commit hook, which may run on the event loop under AsyncSession)
+never touch the database or the shared-state file themselves.
+"""
+import base64
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from ..config import get_settings
+from ..database import note_project_write
+from ..models.change_feed import ProjectTombstone, change_feed_state
+from ..models.project import Project
+from .shared_state import get_mirror
+
+logger = logging.getLogger(__name__)
+
+_COUNTER_KEY = "project_changes"
+_SESSION_SEQ = "change_seq"
+_TOKEN_PREFIX = "v1:"
+
+# The feed carries list-view fields only, not the generated code
+_FEED_COLUMNS = load_only(
+    Project.id, Project.title, Project.website_type, Project.status,
+    Project.created_at, Project.updated_at, Project.change_seq,
+)
+
+
+# ---------------------------------------------------------------------------
+# Stamping writes
+# ---------------------------------------------------------------------------
+
+def _transaction_seq(session: Session) -> int:
+    """Sequence number of the session's current transaction (allocated on first change)"""
+    seq = session.info.get(_SESSION_SEQ)
+    if seq is None:
+        connection = session.connection()
+        connection.execute(
+            update(change_feed_state).where(change_feed_state.c.id == 1).values(seq=change_feed_state.c.seq + 1)
+        )
+        seq = connection.execute(select(change_feed_state.c.seq).where(change_feed_state.c.id == 1)).scalar_one()
+        session.info[_SESSION_SEQ] = seq
+    return seq
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_projects(session: Session, flush_context, instances) -> None:
+    changed = [obj for obj in session.new if isinstance(obj, Project)]
+    changed += [obj for obj in session.dirty if isinstance(obj, Project) and session.is_modified(obj)]
+    if changed:
+        seq = _transaction_seq(session)
+        for project in changed:
+            project.change_seq = seq
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_waiters(session: Session) -> None:
+    if session.info.pop(_SESSION_SEQ, None) is None:
+        return
+    # Queued for the mirror thread: wakes this worker's waiters now, other workers' on their next refresh
+    get_mirror().incr_later(_COUNTER_KEY)
+    # Replica reads wait out the read-your-writes window after this
+    note_project_write()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_seq(session: Session) -> None:
+    session.info.pop(_SESSION_SEQ, None)
+
+
+def record_deletions(session: Session, project_ids: List[int]) -> None:
+    """Write tombstones for deleted projects in the session's transaction"""
+    if not project_ids:
+        return
+    seq = _transaction_seq(session)
+    now = datetime.utcnow()
+    session.execute(
+        insert(ProjectTombstone),
+        [{"project_id": project_id, "change_seq": seq, "deleted_at": now} for project_id in project_ids],
+    )
+
+
+def prune_tombstones(db: Session, batch_size: int = 500) -> int:
+    """
+    Delete tombstones older than change_feed_tombstone_ttl_s, in batches
+
+    Raises the tombstone horizon so clients whose token predates it are
+    told to resync instead of silently missing deletions.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=get_settings().change_feed_tombstone_ttl_s)
+    removed = 0
+    while True:
+        rows = db.execute(
+            select(ProjectTombstone.id, ProjectTombstone.change_seq)
+            .where(ProjectTombstone.deleted_at < cutoff)
+            .order_by(ProjectTombstone.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return removed
+        horizon = max(row.change_seq for row in rows)
+        db.execute(delete(ProjectTombstone).where(ProjectTombstone.id.in_([row.id for row in rows])))
+        db.execute(
+            update(change_feed_state)
+            .where(change_feed_state.c.id == 1, change_feed_state.c.tombstone_horizon < horizon)
+            .values(tombstone_horizon=horizon)
+        )
+        db.commit()
+        removed += len(rows)
+        if len(rows) < batch_size:
+            return removed
+
+
+# ---------------------------------------------------------------------------
+# Reading the feed
+# ---------------------------------------------------------------------------
+
+def encode_token(seq: int) -> str:
+    """Opaque token for a sequence number"""
+    return base64.urlsafe_b64encode(f"{_TOKEN_PREFIX}{seq}".encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> int:
+    """
+    Sequence number inside a token
+
+    Raises:
+        ValueError: If the token wasn't produced by encode_token
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed change token")
+    if not raw.startswith(_TOKEN_PREFIX) or not raw[len(_TOKEN_PREFIX):].isdigit():
+        raise ValueError("Malformed change token")
+    return int(raw[len(_TOKEN_PREFIX):])
+
+
+async def _state(db: AsyncSession) -> Tuple[int, int]:
+    row = (await db.execute(
+        select(change_feed_state.c.seq, change_feed_state.c.tombstone_horizon).where(change_feed_state.c.id == 1)
+    )).one()
+    return row.seq, row.tombstone_horizon
+
+
+async def _read_page(db: AsyncSession, since: int, limit: int) -> Tuple[List[Project], List[int], int, bool]:
+    """
+    Changes after `since`, in sequence order, never splitting one transaction's rows across pages
+
+    Returns:
+        (changed projects, deleted IDs, last sequence included, more pending)
+    """
+    projects = list((await db.execute(
+        select(Project)
+        .options(_FEED_COLUMNS)
+        .where(Project.change_seq > since)
+        .order_by(Project.change_seq, Project.id)
+        .limit(limit + 1)
+    )).scalars())
+    tombstones = (await db.execute(
+        select(ProjectTombstone.change_seq, ProjectTombstone.project_id)
+        .where(ProjectTombstone.change_seq > since)
+        .order_by(ProjectTombstone.change_seq, ProjectTombstone.id)
+        .limit(limit + 1)
+    )).all()
+    entries = sorted(
+        [(project.change_seq, project) for project in projects] + [(row.change_seq, row.project_id) for row in tombstones],
+        key=lambda entry: entry[0],
+    )
+    has_more = len(entries) > limit
+    if has_more:
+        boundary = entries[limit][0]
+        page = [entry for entry in entries[:limit] if entry[0] < boundary]
+        if not page:
+            # One transaction touched more rows than a page holds: send all of it
+            group_projects = (await db.execute(
+                select(Project).options(_FEED_COLUMNS).where(Project.change_seq == boundary)
+            )).scalars()
+            group_deleted = (await db.execute(
+                select(ProjectTombstone.project_id).where(ProjectTombstone.change_seq == boundary)
+            )).scalars()
+            page = [(boundary, project) for project in group_projects] + [(boundary, project_id) for project_id in group_deleted]
+        entries = page
+    last_seq = entries[-1][0] if entries else since
+    changed = [payload for _, payload in entries if isinstance(payload, Project)]
+    deleted = [payload for _, payload in entries if not isinstance(payload, Project)]
+    return changed, deleted, last_seq, has_more
+
+
+async def changes_since(db: AsyncSession, since: Optional[int], limit: int = 100, wait_s: float = 0) -> dict:
+    """
+    Projects created/updated and deleted after a sequence number
+
+    Args:
+        db: Async database session
+        since: Last sequence the client has seen (None: just return the head token)
+        limit: Maximum entries per page
+        wait_s: Long-poll up to this long when there is nothing new
+
+    Returns:
+        dict with changed (Project list), deleted (IDs), token, has_more and
+        reset (True when since predates pruned tombstones: reload everything)
+    """
+    settings = get_settings()
+    signal = get_mirror()
+    deadline = time.monotonic() + min(max(wait_s, 0), settings.change_feed_max_wait_s)
+    while True:
+        # Read the signal before the database so a commit in between isn't missed
+        generation = signal.value(_COUNTER_KEY)
+        head, horizon = await _state(db)
+        if since is None or since > head:
+            return {"changed": [], "deleted": [], "token": encode_token(head), "has_more": False, "reset": since is not None}
+        if since < horizon:
+            return {"changed": [], "deleted": [], "token": encode_token(head), "has_more": False, "reset": True}
+        if since < head:
+            changed, deleted, last_seq, has_more = await _read_page(db, since, limit)
+            if changed or deleted or has_more:
+                return {
+                    "changed": changed,
+                    "deleted": deleted,
+                    "token": encode_token(last_seq if has_more else max(last_seq, head)),
+                    "has_more": has_more,
+                    "reset": False,
+                }
+            # Sequence numbers used only by rows that were since deleted and pruned
+            since = head
+        # Nothing new: end the read transaction and wait for the next commit signal
+        await db.rollback()
+        if await signal.wait_changed(_COUNTER_KEY, generation, deadline - time.monotonic()) == generation:
+            return {"changed": [], "deleted": [], "token": encode_token(since), "has_more": False, "reset": False}
@@ -0,0 +1,237 @@
+"""
+Deadline Service
+Per-request time budgets and client-disconnect cancellation for generations
+
+A Deadline is bound to the current request through a context variable
+(like timing.RequestTimer and usage.UsageLedger), so AIService can split
+what is left of it across the provider attempts still possible, and
+provider calls can be abandoned as soon as the client has gone:
+
+    with deadline.scope(seconds) as budget:
+        timeout = budget.attempt_timeout(attempts_left)
+        text = deadline.call("gemini", timeout, model.generate_content, prompt)
+
+GenerationCancelled derives from BaseException (like asyncio.CancelledError)
+so the broad `except Exception` fallbacks along the generation path can't
+turn a disconnect into a fallback page that then gets saved.
+
+An abandoned call keeps its thread (and its provider connection) until the
+provider answers, long after the request and its generation slot are gone.
+Upstream threads are therefore capped per process at
+provider_max_inflight_calls, abandoned ones included: while the cap is
+reached new attempts are refused (UpstreamSaturated) instead of piling more
+threads and requests onto a provider that is already slow.
+"""
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, Set, TypeVar
+from ..config import get_settings
+from . import metrics
+
+T = TypeVar("T")
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("deadline", default=None)
+
+
+class GenerationCancelled(BaseException):
+    """The client disconnected: stop generating and don't save anything"""
+
+
+class AttemptTimeout(TimeoutError):
+    """An upstream call ran past its share of the deadline"""
+
+
+class UpstreamSaturated(AttemptTimeout):
+    """Too many upstream calls (abandoned ones included) are still running to start another"""
+
+
+class Deadline:
+    """Time budget and cancellation flag of one request"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._cancelled = threading.Event()
+        # Events of calls waiting in call(), woken on cancel()
+        self._waiters: Set[threading.Event] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Mark the request cancelled and wake every call() waiting on it"""
+        with self._lock:
+            self._cancelled.set()
+            waiters = list(self._waiters)
+        for waiter in waiters:
+            waiter.set()
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def attempt_timeout(self, attempts_left: int) -> float:
+        """
+        Time for the next of attempts_left provider attempts
+
+        An even share of what's left, but at least provider_min_attempt_s
+        (time an earlier attempt doesn't use rolls over to the later ones).
+        """
+        remaining = self.remaining()
+        share = remaining / max(attempts_left, 1)
+        return min(remaining, max(share, get_settings().provider_min_attempt_s))
+
+    def can_attempt(self) -> bool:
+        """Whether enough time is left to start another provider attempt"""
+        return self.remaining() >= get_settings().provider_min_attempt_s
+
+    def check(self, stage: str) -> None:
+        """
+        Stop here if the client has gone
+
+        Raises:
+            GenerationCancelled: If cancel() was called (counted against stage)
+        """
+        if self.cancelled:
+            metrics.GENERATION_CANCELLATIONS.labels(stage).inc()
+            raise GenerationCancelled(f"Client disconnected (during {stage})")
+
+    def _watch(self, waiter: threading.Event) -> None:
+        with self._lock:
+            self._waiters.add(waiter)
+            if self._cancelled.is_set():
+                waiter.set()
+
+    def _unwatch(self, waiter: threading.Event) -> None:
+        with self._lock:
+            self._waiters.discard(waiter)
+
+
+_upstream_slots: Optional[threading.BoundedSemaphore] = None
+_upstream_slots_lock = threading.Lock()
+
+
+def _slots() -> Optional[threading.BoundedSemaphore]:
+    """Per-process cap on upstream call threads (None: unlimited)"""
+    global _upstream_slots
+    limit = get_settings().provider_max_inflight_calls
+    if limit <= 0:
+        return None
+    if _upstream_slots is None:
+        with _upstream_slots_lock:
+            if _upstream_slots is None:
+                _upstream_slots = threading.BoundedSemaphore(limit)
+    return _upstream_slots
+
+
+def request_budget(requested_s: Optional[float]) -> float:
+    """Deadline for a request: the requested seconds up to generation_deadline_max_s, else generation_deadline_s"""
+    settings = get_settings()
+    if requested_s is None:
+        return settings.generation_deadline_s
+    return min(requested_s, settings.generation_deadline_max_s)
+
+
+def current() -> Optional[Deadline]:
+    """Deadline of the current request, if any"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def scope(seconds: Optional[float] = None) -> Iterator[Deadline]:
+    """
+    Bind a deadline to the current context
+
+    Nested scopes reuse the deadline already bound, so the request's budget
+    (and its cancellation) reaches everything below it.
+
+    Args:
+        seconds: Budget for a new deadline (default settings.generation_deadline_s)
+    """
+    bound = _current_deadline.get()
+    if bound is not None:
+        yield bound
+        return
+    budget = Deadline(seconds if seconds is not None else get_settings().generation_deadline_s)
+    token = _current_deadline.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_deadline.reset(token)
+
+
+def check(stage: str) -> None:
+    """Deadline.check() on the current deadline, if any"""
+    budget = _current_deadline.get()
+    if budget is not None:
+        budget.check(stage)
+
+
+def call(provider: str, timeout: float, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking upstream call, giving up at its timeout or when the client disconnects
+
+    Neither requests nor the Gemini SDK can be interrupted from another
+    thread, so the call runs on a daemon thread and the caller stops
+    waiting for it; an abandoned call ends on its own socket timeout and its
+    result is dropped. Without a bound deadline fn simply runs inline.
+
+    Args:
+        provider: Label for the abandoned-call metric
+        timeout: Seconds to wait for the result
+        fn: The call
+
+    Raises:
+        GenerationCancelled: The client disconnected first
+        UpstreamSaturated: provider_max_inflight_calls upstream calls are still running
+        AttemptTimeout: timeout passed first
+    """
+    budget = _current_deadline.get()
+    if budget is None:
+        return fn(*args, **kwargs)
+    budget.check(provider)
+
+    slots = _slots()
+    if slots is not None and not slots.acquire(blocking=False):
+        metrics.UPSTREAM_CALLS_REFUSED.labels(provider).inc()
+        raise UpstreamSaturated(f"{provider}: too many upstream calls still running")
+
+    future: Future = Future()
+    done = threading.Event()
+    future.add_done_callback(lambda _: done.set())
+
+    def run() -> None:
+        metrics.UPSTREAM_CALLS_IN_FLIGHT.inc()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            # Held until the call really ends, also when the caller has stopped waiting
+            metrics.UPSTREAM_CALLS_IN_FLIGHT.dec()
+            if slots is not None:
+                slots.release()
+
+    budget._watch(done)
+    try:
+        try:
+            threading.Thread(target=run, name=f"upstream-{provider}", daemon=True).start()
+        except BaseException:
+            if slots is not None:
+                slots.release()
+            raise
+        done.wait(timeout)
+    finally:
+        budget._unwatch(done)
+    if future.done():
+        return future.result()
+    if budget.cancelled:
+        metrics.UPSTREAM_CALLS_ABANDONED.labels(provider, "cancelled").inc()
+        budget.check(provider)
+    metrics.UPSTREAM_CALLS_ABANDONED.labels(provider, "deadline").inc()
+    raise AttemptTimeout(f"{provider} call exceeded its {timeout:.1f}s share of the deadline")
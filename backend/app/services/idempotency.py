@@ -0,0 +1,188 @@
+"""
+Idempotency Service
+Idempotency-Key handling for POST /api/generate-website
+
+The first request with a key inserts an in_progress row (the primary key
+makes that claim atomic across workers) and runs normally; its response is
+then stored against the key until settings.idempotency_ttl_s. A retry with
+the same key and body replays the stored response, or polls while the
+original is still running. Claims whose owner died (locked_until passed)
+are taken over; failed originals release their key so a retry can run.
+
+claim() is a single non-blocking attempt; claim_async() polls it with
+asyncio.sleep between attempts, so waiting retries don't hold threadpool
+threads that generations and sync routes need.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.idempotency import IdempotencyKey
+from . import deadline, metrics
+
+logger = logging.getLogger(__name__)
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """The key was already used with a different request body"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """The original request is still running (after the wait limit, for claim_async)"""
+
+
+def request_hash(payload: dict) -> str:
+    """Stable SHA-256 of a request body"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _try_insert(db: Session, key: str, body_hash: str, now: datetime) -> bool:
+    settings = get_settings()
+    try:
+        # Core insert: the primary key makes concurrent claims race-safe across workers
+        db.execute(insert(IdempotencyKey).values(
+            key=key,
+            request_hash=body_hash,
+            status=IN_PROGRESS,
+            locked_until=now + timedelta(seconds=settings.idempotency_lock_s),
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.idempotency_ttl_s),
+        ))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def claim(db: Session, key: str, body_hash: str, waited: bool = False) -> Optional[dict]:
+    """
+    Claim a key for a new request, or get the response already stored for it
+
+    Args:
+        db: Database session (committed / rolled back here)
+        key: Idempotency-Key header value
+        body_hash: request_hash() of the request body
+        waited: Whether the caller already polled (for the replay metric)
+
+    Returns:
+        None if the caller now owns the key and must run the request (then
+        call complete() or release()), else the stored response body
+
+    Raises:
+        IdempotencyKeyMismatch: Key already used with a different body
+        IdempotencyKeyInProgress: The original is still running
+    """
+    settings = get_settings()
+    while True:
+        now = datetime.utcnow()
+        if _try_insert(db, key, body_hash, now):
+            metrics.IDEMPOTENCY_REQUESTS.labels("new").inc()
+            return None
+        row = db.execute(
+            select(IdempotencyKey).where(IdempotencyKey.key == key).execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        if row is None:
+            continue
+        if row.expires_at <= now:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now))
+            db.commit()
+            continue
+        if row.request_hash != body_hash:
+            metrics.IDEMPOTENCY_REQUESTS.labels("mismatch").inc()
+            raise IdempotencyKeyMismatch("Idempotency-Key was already used with a different request")
+        if row.status == COMPLETED:
+            metrics.IDEMPOTENCY_REQUESTS.labels("waited" if waited else "replayed").inc()
+            response = json.loads(row.response)
+            db.rollback()
+            return response
+        if row.locked_until is not None and row.locked_until <= now:
+            taken = db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status == IN_PROGRESS,
+                    IdempotencyKey.locked_until <= now,
+                )
+                .values(locked_until=now + timedelta(seconds=settings.idempotency_lock_s))
+            ).rowcount
+            db.commit()
+            if taken:
+                logger.warning(f"⚠️ Idempotency key {key} was abandoned by its original request, taking over")
+                metrics.IDEMPOTENCY_REQUESTS.labels("takeover").inc()
+                return None
+            continue
+        # End the read transaction so the next poll sees the original's commit
+        db.rollback()
+        raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still in progress")
+
+
+async def claim_async(db: Session, key: str, body_hash: str) -> Optional[dict]:
+    """
+    claim(), waiting up to idempotency_wait_s for an original still in progress
+
+    Each attempt runs in the threadpool; between attempts the coroutine
+    sleeps, holding no thread. The wait also ends when the request's
+    deadline is cancelled (the retry's own client disconnected).
+
+    Raises:
+        IdempotencyKeyMismatch: Key already used with a different body
+        IdempotencyKeyInProgress: Original still running after idempotency_wait_s
+        GenerationCancelled: The client disconnected while waiting
+    """
+    settings = get_settings()
+    wait_until = time.monotonic() + settings.idempotency_wait_s
+    waited = False
+    while True:
+        try:
+            return await run_in_threadpool(claim, db, key, body_hash, waited)
+        except IdempotencyKeyInProgress:
+            if time.monotonic() >= wait_until:
+                metrics.IDEMPOTENCY_REQUESTS.labels("in_progress").inc()
+                raise
+        deadline.check("idempotency_wait")
+        waited = True
+        await asyncio.sleep(settings.idempotency_poll_ms / 1000.0)
+
+
+def complete(db: Session, key: str, response: dict, project_id: Optional[int] = None) -> None:
+    """Store the response of a claimed key for replay"""
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(status=COMPLETED, response=json.dumps(response), project_id=project_id, locked_until=None)
+    )
+    db.commit()
+
+
+def release(db: Session, key: str) -> None:
+    """Give up a claimed key (the request failed), so a retry runs again"""
+    db.rollback()
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == IN_PROGRESS))
+    db.commit()
+
+
+def purge_expired(db: Session, batch_size: int = 500) -> int:
+    """Delete expired keys in batches; returns the number removed"""
+    removed = 0
+    while True:
+        now = datetime.utcnow()
+        keys = list(db.scalars(select(IdempotencyKey.key).where(IdempotencyKey.expires_at <= now).limit(batch_size)))
+        if not keys:
+            return removed
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.key.in_(keys)))
+        db.commit()
+        removed += len(keys)
+        if len(keys) < batch_size:
+            return removed
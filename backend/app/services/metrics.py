@@ -0,0 +1,487 @@
+"""
+Metrics Service
+In-process Prometheus metrics (counters, gauges, histograms)
+
+Every metric keeps a bounded number of label sets: once a metric has seen
+``max_label_sets`` distinct label combinations, new combinations are folded
+into a single ``other`` series so memory cannot grow with label cardinality.
+Label children are cached, so the hot path is a dict lookup plus a locked
+integer/float update.
+"""
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Label value used once a metric reaches its label-set limit
+OVERFLOW_LABEL = "other"
+
+# Default latency buckets (seconds) - covers sub-ms DB work up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 90.0, 120.0)
+
+# Exposition format content type (Starlette appends "; charset=utf-8" to text/* responses)
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the text exposition format"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a {name="value",...} label block"""
+    parts = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _CounterChild:
+    """Single counter series"""
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _GaugeChild:
+    """Single gauge series"""
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    @contextmanager
+    def track_inprogress(self):
+        """Increment while the block runs"""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _HistogramChild:
+    """Single histogram series with fixed upper bounds"""
+
+    __slots__ = ("_upper_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self._upper_bounds = upper_bounds
+        # One slot per bucket plus the implicit +Inf bucket
+        self._counts = [0] * (len(upper_bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Return (cumulative bucket counts, sum)"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+
+    type_name = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        max_label_sets: int = 32,
+        registry: Optional["Registry"] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_label_sets = max_label_sets
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+        if not self.labelnames:
+            self._default = self._get_child(())
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _get_child(self, values: Tuple[str, ...]):
+        child = self._children.get(values)
+        if child is not None:
+            return child
+        with self._lock:
+            child = self._children.get(values)
+            if child is not None:
+                return child
+            if len(self._children) >= self.max_label_sets:
+                values = (OVERFLOW_LABEL,) * len(self.labelnames)
+                child = self._children.get(values)
+                if child is not None:
+                    return child
+            child = self._new_child()
+            self._children[values] = child
+            return child
+
+    def labels(self, *values) -> object:
+        """Get the child series for the given label values"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        return self._get_child(tuple(str(v) for v in values))
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render HELP/TYPE headers and samples"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def track_inprogress(self):
+        return self._default.track_inprogress()
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, **kwargs)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        bounds = self.upper_bounds + (float("inf"),)
+        for values, child in list(self._children.items()):
+            cumulative, total = child.snapshot()
+            for bound, count in zip(bounds, cumulative):
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {count}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative[-1]}"
+
+
+class Registry:
+    """Collection of metrics rendered together by /metrics"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Duplicate metric name: {metric.name}")
+            self._metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before rendering"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        for collector in list(self._collectors):
+            collector()
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Default registry
+REGISTRY = Registry()
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+# Route labels use the route template (/api/projects/{project_id}), never the raw path
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+    max_label_sets=128,
+)
+
+# ---------------------------------------------------------------------------
+# AI providers
+# ---------------------------------------------------------------------------
+PROVIDER_LATENCY = Histogram(
+    "ai_provider_latency_seconds",
+    "Upstream AI provider call latency",
+    ["provider", "outcome"],
+)
+PARSE_DURATION = Histogram(
+    "ai_parse_duration_seconds",
+    "Time spent parsing AI provider responses",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+PARSE_FAILURES = Counter(
+    "ai_parse_failures_total",
+    "AI responses that could not be parsed, by reason",
+    ["reason"],
+)
+FALLBACK_ACTIVATIONS = Counter(
+    "ai_fallback_activations_total",
+    "Times generation fell back to a secondary provider",
+    ["provider"],
+)
+FALLBACK_HTML_SERVED = Counter(
+    "ai_fallback_html_served_total",
+    "Static fallback pages served instead of generated output",
+    ["source"],
+)
+PROMPT_CHARS = Counter(
+    "ai_prompt_chars_total",
+    "Characters sent to AI providers",
+    ["provider"],
+)
+RESPONSE_CHARS = Counter(
+    "ai_response_chars_total",
+    "Characters received from AI providers",
+    ["provider"],
+)
+AI_TOKENS = Counter(
+    "ai_tokens_total",
+    "Tokens sent to and received from AI providers (estimated where not reported)",
+    ["provider", "model", "direction"],
+)
+MODEL_TIER_SELECTIONS = Counter(
+    "ai_model_tier_selections_total",
+    "Generations routed to each model tier",
+    ["tier"],
+)
+IDEMPOTENCY_REQUESTS = Counter(
+    "ai_idempotency_requests_total",
+    "Generate requests carrying an Idempotency-Key, by outcome (new, replayed, waited, takeover, mismatch, in_progress)",
+    ["outcome"],
+)
+GENERATIONS_IN_FLIGHT = Gauge(
+    "ai_generations_in_flight",
+    "Website generations currently running",
+)
+TEMPLATE_GENERATIONS = Counter(
+    "ai_template_generations_total",
+    "Sites assembled by the offline template engine, by reason",
+    ["reason"],
+)
+VALIDATION_DURATION = Histogram(
+    "ai_output_validation_seconds",
+    "Time spent validating generated output (including process-pool hand-off)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+QUALITY_SCORE = Histogram(
+    "ai_output_quality_score",
+    "Quality score (0-100) of generated output",
+    ["provider"],
+    buckets=(10, 20, 30, 40, 50, 60, 70, 80, 90, 100),
+)
+QUALITY_REJECTIONS = Counter(
+    "ai_output_quality_rejections_total",
+    "Generated pages rejected for scoring below quality_min_score",
+    ["provider"],
+)
+
+# ---------------------------------------------------------------------------
+# Database
+# ---------------------------------------------------------------------------
+DB_COMMIT_DURATION = Histogram(
+    "db_commit_duration_seconds",
+    "Database commit latency",
+    ["operation"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine"],
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool",
+    ["engine"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["engine"],
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size",
+    ["engine"],
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Overflow connections currently open beyond the pool size",
+    ["engine"],
+)
+DB_READ_ROUTES = Counter(
+    "db_read_routes_total",
+    "Read-only sessions by where they were routed (replicaN or the primary and why)",
+    ["target"],
+)
+DB_REPLICA_HEALTHY = Gauge(
+    "db_replica_healthy",
+    "Whether a read replica passed its last health check",
+    ["replica"],
+)
+DB_BATCH_SIZE = Histogram(
+    "db_batch_insert_size",
+    "Rows committed per batched-writer transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+RETENTION_DELETED = Counter(
+    "db_retention_deleted_total",
+    "Projects deleted by retention rules and bulk deletes",
+    ["rule"],
+)
+RETENTION_RUN_DURATION = Histogram(
+    "db_retention_run_seconds",
+    "Duration of retention runs (batched deletes plus space reclamation)",
+)
+STALE_GENERATIONS_RECOVERED = Counter(
+    "db_stale_generations_recovered_total",
+    "Skeleton-mode projects left at generating by a lost worker and marked failed",
+)
+DB_SPACE_RECLAIMED = Counter(
+    "db_space_reclaimed_bytes_total",
+    "Bytes returned to the filesystem by incremental vacuum (SQLite)",
+)
+ASSETS_PUBLISHED = Counter(
+    "assets_published_total",
+    "Style and script blocks extracted by publishing, by whether their content was already stored",
+    ["kind", "outcome"],
+)
+ASSET_REQUESTS = Counter(
+    "asset_requests_total",
+    "GET /api/assets requests by outcome (cache, db, not_modified, not_found)",
+    ["outcome"],
+)
+GENERATION_CANCELLATIONS = Counter(
+    "generation_cancellations_total",
+    "Generations stopped (and not saved) because the client disconnected, by the stage they had reached",
+    ["stage"],
+)
+UPSTREAM_CALLS_ABANDONED = Counter(
+    "upstream_calls_abandoned_total",
+    "Provider calls given up mid-flight, by reason (cancelled, deadline)",
+    ["provider", "reason"],
+)
+UPSTREAM_CALLS_REFUSED = Counter(
+    "upstream_calls_refused_total",
+    "Provider calls not started because provider_max_inflight_calls were still running (abandoned ones included)",
+    ["provider"],
+)
+UPSTREAM_CALLS_IN_FLIGHT = Gauge(
+    "upstream_calls_in_flight",
+    "Provider calls running on upstream threads, abandoned ones included",
+)
+PROVIDER_ATTEMPTS_SKIPPED = Counter(
+    "provider_attempts_skipped_total",
+    "Provider attempts not started because the request deadline was (nearly) spent",
+    ["provider"],
+)
@@ -0,0 +1,77 @@
+"""
+Model Router
+Pick a Gemini model tier and output budget from request complexity
+
+Complexity is a weighted sum of prompt features:
+    website type      landing 1.0, blog/portfolio 1.5, ecommerce 2.5
+    sections          0.5 per section the page needs (requested + type defaults)
+    advanced features 1.0 per distinct request the template library can't build
+                      (logins, payments, charts, booking, ...)
+    prompt length     1 point per 50 words, capped at 2
+
+Scores below gemini_standard_tier_score go to the fast tier, scores from
+gemini_large_tier_score up go to the large tier, the rest to the standard
+tier (settings.gemini_model).
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+from ..config import get_settings
+from . import template_engine
+
+TYPE_WEIGHTS = {"landing_page": 1.0, "blog": 1.5, "portfolio": 1.5, "ecommerce": 2.5}
+
+
+@dataclass
+class ModelTier:
+    """Model and output budget for one generation"""
+    name: str
+    model: str
+    max_output_tokens: int
+
+
+@dataclass
+class Complexity:
+    """Estimated request complexity and the features behind it"""
+    score: float
+    features: dict = field(default_factory=dict)
+
+
+def estimate_complexity(
+    user_prompt: str,
+    website_type: str,
+    slots: Optional[template_engine.Slots] = None
+) -> Complexity:
+    """
+    Score how demanding a generation request is
+
+    Args:
+        user_prompt: Raw user requirements
+        website_type: WebsiteType value
+        slots: Already extracted template slots for this prompt, if any
+    """
+    slots = slots or template_engine.extract_slots(user_prompt, website_type)
+    lowered = user_prompt.lower()
+    words = len(lowered.split())
+    advanced = sorted(set(template_engine.COMPLEX_MARKERS.findall(lowered)))
+    score = (
+        TYPE_WEIGHTS.get(website_type, 1.0)
+        + 0.5 * len(slots.sections)
+        + 1.0 * len(advanced)
+        + min(words / 50, 2.0)
+    )
+    return Complexity(
+        score=round(score, 2),
+        features={"website_type": website_type, "words": words, "sections": len(slots.sections), "advanced": advanced},
+    )
+
+
+def select_tier(complexity: Complexity) -> ModelTier:
+    """Map a complexity score to a model tier (standard tier when tiering is off)"""
+    settings = get_settings()
+    if not settings.gemini_tiering_enabled:
+        return ModelTier("standard", settings.gemini_model, 4096)
+    if complexity.score >= settings.gemini_large_tier_score:
+        return ModelTier("large", settings.gemini_large_model, settings.gemini_large_max_output_tokens)
+    if complexity.score >= settings.gemini_standard_tier_score:
+        return ModelTier("standard", settings.gemini_model, settings.gemini_standard_max_output_tokens)
+    return ModelTier("fast", settings.gemini_fast_model, settings.gemini_fast_max_output_tokens)
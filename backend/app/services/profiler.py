@@ -0,0 +1,118 @@
+"""
+Sampling Profiler
+Opt-in stack sampling for slow requests
+
+While profiling is enabled, one background thread periodically samples the
+stacks of threads that are inside a timed stage of an in-flight request (see
+timing.stage). When a request finishes above the latency threshold its samples
+are written as a folded-stack file ("frame;frame;frame count" per line) into a
+bounded ring directory. Folded stacks open offline in speedscope
+(https://www.speedscope.app) or Brendan Gregg's flamegraph.pl.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from .timing import RequestTimer
+
+logger = logging.getLogger(__name__)
+
+# Cap on distinct stacks kept per request, so a pathological request can't grow without bound
+MAX_STACKS_PER_REQUEST = 5000
+
+
+def _fold_stack(frame) -> str:
+    """Render a frame chain root-first as 'module:function;...'"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        parts.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+class SamplingProfiler:
+    """Samples stacks of in-stage request threads and saves slow-request profiles"""
+
+    def __init__(self, output_dir: str, threshold_ms: int, interval_ms: int, max_files: int):
+        self.output_dir = output_dir
+        self.threshold_s = threshold_ms / 1000.0
+        self.interval_s = max(interval_ms, 1) / 1000.0
+        self.max_files = max_files
+        self._samples: "dict[RequestTimer, Counter]" = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, timer: RequestTimer) -> None:
+        """Start sampling a request"""
+        with self._lock:
+            self._samples[timer] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def finish(self, timer: RequestTimer, label: str) -> Optional[str]:
+        """
+        Stop sampling a request and save its profile if it was slow
+
+        Returns:
+            Path of the written profile, or None
+        """
+        with self._lock:
+            samples = self._samples.pop(timer, None)
+        if not samples or timer.elapsed() < self.threshold_s:
+            return None
+        try:
+            return self._write(samples, label, timer.elapsed())
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write profile: {e}")
+            return None
+
+    def _run(self) -> None:
+        """Sampler loop; exits when no request is registered"""
+        while True:
+            with self._lock:
+                if not self._samples:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for timer, samples in self._samples.items():
+                    for ident in timer.active_thread_ids():
+                        frame = frames.get(ident)
+                        if frame is None:
+                            continue
+                        stack = _fold_stack(frame)
+                        if stack in samples or len(samples) < MAX_STACKS_PER_REQUEST:
+                            samples[stack] += 1
+                del frames
+            time.sleep(self.interval_s)
+
+    def _write(self, samples: Counter, label: str, elapsed: float) -> str:
+        """Write folded stacks and trim the ring to max_files"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:60] or "request"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        filename = f"{stamp}-{time.time_ns() % 1_000_000:06d}-{safe_label}-{int(elapsed * 1000)}ms.folded"
+        path = os.path.join(self.output_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        profiles = sorted(
+            (entry for entry in os.scandir(self.output_dir) if entry.name.endswith(".folded")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in profiles[:-self.max_files] if self.max_files > 0 else []:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+        logger.info(f"📊 Saved slow-request profile: {path}")
+        return path
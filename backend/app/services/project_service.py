@@ -1,11 +1,26 @@
 """
 Project service for database operations
 """
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from ..database import get_batched_writer
 from ..models.project import Project
-from ..schemas.project import WebsiteType
-from typing import List, Optional
+from ..models.asset import PublishedPage, published_page_assets
+from ..models.revision import ProjectRevision
+from ..schemas.project import ProjectStatus, WebsiteType
+from typing import List, Optional, Sequence, Tuple
+import asyncio
 import json
+from . import change_feed, metrics, serialization, timing
+from .revision_service import RevisionService
+
+
+# Postgres locks the row being edited with SELECT ... FOR UPDATE. SQLite has no
+# row locks and pysqlite only begins a transaction at the first write, so edits
+# start with this no-op UPDATE to take the write lock before reading: the reads
+# after it see the latest committed row and revision head.
+_SQLITE_WRITE_LOCK = text("UPDATE projects SET id = id WHERE id = :id")
 
 
 class ProjectService:
@@ -20,7 +35,8 @@ class ProjectService:
         html: str,
         css: str,
         javascript: Optional[str] = None,
-        metadata: Optional[dict] = None
+        metadata: Optional[dict] = None,
+        status: ProjectStatus = ProjectStatus.READY
     ) -> Project:
         """Create a new project in the database"""
         
@@ -31,12 +47,22 @@ class ProjectService:
             html=html,
             css=css,
             javascript=javascript or "",
-            project_metadata=json.dumps(metadata) if metadata else None
+            project_metadata=json.dumps(metadata) if metadata else None,
+            status=status.value
         )
         
+        # SQLite: hand the insert to the single-writer queue, which commits
+        # concurrent creates together and returns the loaded row
+        writer = get_batched_writer()
+        if writer is not None:
+            with timing.stage("db_commit"):
+                return writer.insert(project)
+        
         db.add(project)
-        db.commit()
-        db.refresh(project)
+        with timing.stage("db_commit", metrics.DB_COMMIT_DURATION.labels("create_project")):
+            db.commit()
+        with timing.stage("db_refresh"):
+            db.refresh(project)
         return project
     
     @staticmethod
@@ -59,15 +85,60 @@ class ProjectService:
         
         return query.offset(skip).limit(limit).all()
     
+    @staticmethod
+    def recent_metadata(
+        db: Session,
+        limit: int = 1000,
+        website_type: Optional[WebsiteType] = None
+    ) -> List[Tuple[str, dict]]:
+        """(website_type, parsed project_metadata) of the most recent projects"""
+        query = db.query(Project.website_type, Project.project_metadata).order_by(Project.created_at.desc())
+        
+        if website_type:
+            query = query.filter(Project.website_type == website_type)
+        
+        rows = []
+        for project_type, raw in query.limit(limit).all():
+            try:
+                rows.append((project_type, json.loads(raw) if raw else {}))
+            except ValueError:
+                continue
+        return rows
+    
     @staticmethod
     def delete_project(db: Session, project_id: int) -> bool:
         """Delete a project by ID"""
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if project:
-            db.delete(project)
-            db.commit()
-            return True
-        return False
+        return bool(ProjectService.delete_projects(db, [project_id], operation="delete_project"))
+    
+    @staticmethod
+    def delete_projects(db: Session, project_ids: List[int], operation: str = "delete_projects") -> List[int]:
+        """
+        Delete projects, their revision history and published pages in one transaction
+        
+        Set-based: one SELECT for the IDs that exist and one DELETE per
+        table, without loading the rows. Change-feed tombstones are written
+        in the same transaction.
+        
+        Args:
+            db: Database session
+            project_ids: Projects to delete
+            operation: Label for the commit-latency metric
+            
+        Returns:
+            IDs that existed and were deleted
+        """
+        if not project_ids:
+            return []
+        existing = list(db.scalars(select(Project.id).where(Project.id.in_(project_ids))))
+        if existing:
+            db.execute(delete(ProjectRevision).where(ProjectRevision.project_id.in_(existing)))
+            db.execute(delete(published_page_assets).where(published_page_assets.c.project_id.in_(existing)))
+            db.execute(delete(PublishedPage).where(PublishedPage.project_id.in_(existing)))
+            db.execute(delete(Project).where(Project.id.in_(existing)))
+            change_feed.record_deletions(db, existing)
+            with timing.stage("db_commit", metrics.DB_COMMIT_DURATION.labels(operation)):
+                db.commit()
+        return existing
     
     @staticmethod
     def update_project(
@@ -76,12 +147,23 @@ class ProjectService:
         title: Optional[str] = None,
         **kwargs
     ) -> Optional[Project]:
-        """Update a project"""
-        project = db.query(Project).filter(Project.id == project_id).first()
+        """
+        Update a project
+        
+        The row is locked before it is read (see _SQLITE_WRITE_LOCK), so
+        concurrent edits of one project take their revision numbers and
+        deltas in turn.
+        """
+        if db.get_bind().dialect.name == "sqlite":
+            db.execute(_SQLITE_WRITE_LOCK, {"id": project_id})
+        project = db.query(Project).filter(Project.id == project_id).with_for_update().populate_existing().first()
         
         if not project:
+            db.rollback()
             return None
         
+        previous = RevisionService.capture(project)
+        
         if title:
             project.title = title
         
@@ -89,6 +171,173 @@ class ProjectService:
             if hasattr(project, key) and value is not None:
                 setattr(project, key, value)
         
-        db.commit()
-        db.refresh(project)
+        # Record the edit in the project's revision history, same transaction
+        with timing.stage("revision"):
+            RevisionService.record(db, project_id, previous, RevisionService.capture(project))
+        
+        with timing.stage("db_commit", metrics.DB_COMMIT_DURATION.labels("update_project")):
+            db.commit()
+        with timing.stage("db_refresh"):
+            db.refresh(project)
+        return project
+    
+    # ------------------------------------------------------------------
+    # Async equivalents (AsyncSession from database.get_async_db)
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    async def create_project_async(
+        db: AsyncSession,
+        title: str,
+        website_type: WebsiteType,
+        user_prompt: str,
+        html: str,
+        css: str,
+        javascript: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        status: ProjectStatus = ProjectStatus.READY
+    ) -> Project:
+        """Create a new project in the database"""
+        
+        project = Project(
+            title=title,
+            website_type=website_type,
+            user_prompt=user_prompt,
+            html=html,
+            css=css,
+            javascript=javascript or "",
+            project_metadata=json.dumps(metadata) if metadata else None,
+            status=status.value
+        )
+        
+        writer = get_batched_writer()
+        if writer is not None:
+            with timing.stage("db_commit"):
+                return await asyncio.wrap_future(writer.submit(project))
+        
+        db.add(project)
+        with timing.stage("db_commit", metrics.DB_COMMIT_DURATION.labels("create_project")):
+            await db.commit()
+        with timing.stage("db_refresh"):
+            await db.refresh(project)
+        return project
+    
+    @staticmethod
+    async def get_project_async(db: AsyncSession, project_id: int) -> Optional[Project]:
+        """Get a project by ID"""
+        return await db.get(Project, project_id)
+    
+    @staticmethod
+    async def get_project_dict_async(
+        db: AsyncSession,
+        project_id: int,
+        fields: Sequence[str] = serialization.PROJECT_FIELDS
+    ) -> Optional[dict]:
+        """Get a project's response fields as a plain dict (column query, no ORM instance)"""
+        result = await db.execute(
+            select(*(getattr(Project, field) for field in fields)).where(Project.id == project_id)
+        )
+        row = result.first()
+        return dict(row._mapping) if row else None
+    
+    @staticmethod
+    async def get_project_status_async(db: AsyncSession, project_id: int) -> Optional[dict]:
+        """Get a project's status and updated_at without loading its code"""
+        result = await db.execute(
+            select(Project.id, Project.status, Project.updated_at).where(Project.id == project_id)
+        )
+        row = result.first()
+        return dict(row._mapping) if row else None
+    
+    @staticmethod
+    async def list_projects_async(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        website_type: Optional[WebsiteType] = None
+    ) -> List[Project]:
+        """List projects with optional filtering"""
+        query = select(Project).order_by(Project.created_at.desc())
+        
+        if website_type:
+            query = query.filter(Project.website_type == website_type)
+        
+        result = await db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def list_project_dicts_async(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        website_type: Optional[WebsiteType] = None,
+        fields: Sequence[str] = serialization.PROJECT_LIST_FIELDS
+    ) -> List[dict]:
+        """List projects as plain dicts of the given fields (skips the generated code by default)"""
+        query = select(*(getattr(Project, field) for field in fields)).order_by(Project.created_at.desc())
+        
+        if website_type:
+            query = query.filter(Project.website_type == website_type)
+        
+        result = await db.execute(query.offset(skip).limit(limit))
+        return [dict(row._mapping) for row in result]
+    
+    @staticmethod
+    async def delete_project_async(db: AsyncSession, project_id: int) -> bool:
+        """Delete a project by ID"""
+        return bool(await ProjectService.delete_projects_async(db, [project_id], operation="delete_project"))
+    
+    @staticmethod
+    async def delete_projects_async(
+        db: AsyncSession,
+        project_ids: List[int],
+        operation: str = "delete_projects"
+    ) -> List[int]:
+        """Delete projects, their revision history and published pages in one transaction (see delete_projects)"""
+        if not project_ids:
+            return []
+        existing = list(await db.scalars(select(Project.id).where(Project.id.in_(project_ids))))
+        if existing:
+            await db.execute(delete(ProjectRevision).where(ProjectRevision.project_id.in_(existing)))
+            await db.execute(delete(published_page_assets).where(published_page_assets.c.project_id.in_(existing)))
+            await db.execute(delete(PublishedPage).where(PublishedPage.project_id.in_(existing)))
+            await db.execute(delete(Project).where(Project.id.in_(existing)))
+            await db.run_sync(change_feed.record_deletions, existing)
+            with timing.stage("db_commit", metrics.DB_COMMIT_DURATION.labels(operation)):
+                await db.commit()
+        return existing
+    
+    @staticmethod
+    async def update_project_async(
+        db: AsyncSession,
+        project_id: int,
+        title: Optional[str] = None,
+        **kwargs
+    ) -> Optional[Project]:
+        """Update a project (row locked as in update_project)"""
+        if db.get_bind().dialect.name == "sqlite":
+            await db.execute(_SQLITE_WRITE_LOCK, {"id": project_id})
+        project = await db.get(Project, project_id, with_for_update=True, populate_existing=True)
+        
+        if not project:
+            await db.rollback()
+            return None
+        
+        previous = RevisionService.capture(project)
+        
+        if title:
+            project.title = title
+        
+        for key, value in kwargs.items():
+            if hasattr(project, key) and value is not None:
+                setattr(project, key, value)
+        
+        current = RevisionService.capture(project)
+        with timing.stage("revision"):
+            await db.run_sync(RevisionService.record, project_id, previous, current)
+        
+        with timing.stage("db_commit", metrics.DB_COMMIT_DURATION.labels("update_project")):
+            await db.commit()
+        with timing.stage("db_refresh"):
+            await db.refresh(project)
         return project
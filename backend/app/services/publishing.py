@@ -0,0 +1,377 @@
+"""
+Publishing Service
+Serve generated sites with content-addressed, immutable style and script assets
+
+A project keeps its code inline (html plus the css / javascript fields),
+so a preview re-downloads every byte on each visit. Publishing assembles
+the project's document, moves each inline <style> / <script> body of at
+least settings.asset_min_bytes into a StaticAsset keyed by the SHA-256 of
+its kind and content, and rewrites the tag to reference
+{asset_base_url}/{hash}.css|.js. Identical
+blocks in different projects (template styles, shared widgets) are stored
+once and cached by browsers once; repeat visits revalidate only the HTML.
+
+Pages are republished lazily: a PublishedPage remembers the project's
+change_seq, and the preview route republishes when it has moved on.
+Assets that no page links to any more are removed by purge_orphans()
+(run by the retention worker) after settings.asset_gc_grace_s.
+"""
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from html import escape
+from threading import Lock
+from typing import List, Optional, Tuple
+from sqlalchemy import delete, exists, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.asset import PublishedPage, StaticAsset, published_page_assets
+from ..models.project import Project
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CSS = "css"
+JS = "js"
+# Starlette adds "; charset=utf-8" to text/* types
+MEDIA_TYPES = {CSS: "text/css", JS: "text/javascript"}
+
+# Comments are matched (and left alone) so tags inside them aren't extracted
+_BLOCK = re.compile(r"<!--.*?-->|<(style|script)\b([^>]*)>(.*?)</\1\s*>", re.IGNORECASE | re.DOTALL)
+_SRC_ATTR = re.compile(r"(?:^|\s)src\s*=", re.IGNORECASE)
+_TYPE_ATTR = re.compile(r"""\s+type\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+# async/defer are ignored on inline classic scripts; keep them from taking effect once external
+_TIMING_ATTR = re.compile(r"""\s+(?:async|defer)(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+))?(?=[\s/]|$)""", re.IGNORECASE)
+_JS_TYPES = {"", "text/javascript", "application/javascript", "module"}
+_CSS_TYPES = {"", "text/css"}
+_HTML_TAG = re.compile(r"<html\b", re.IGNORECASE)
+_HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+_BODY_START = re.compile(r"<body\b[^>]*>", re.IGNORECASE)
+_BODY_END = re.compile(r"</body\s*>", re.IGNORECASE)
+
+_PAGE_SHELL = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{title}</title>
+<script src="https://cdn.tailwindcss.com"></script>
+</head>
+<body>
+{body}
+</body>
+</html>"""
+
+
+@dataclass
+class ExtractedAsset:
+    """A style or script body lifted out of a document"""
+    hash: str
+    kind: str
+    content: str
+    size: int
+
+
+@dataclass
+class Extraction:
+    """A rewritten document and the assets it now links to (in document order, unique)"""
+    html: str
+    assets: List[ExtractedAsset] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Building and rewriting documents
+# ---------------------------------------------------------------------------
+
+def _wrap(code: str, tag: str) -> str:
+    """Fields hold either a complete <style>/<script> element or bare code"""
+    code = (code or "").strip()
+    if not code or re.search(rf"<{tag}\b", code, re.IGNORECASE):
+        return code
+    return f"<{tag}>\n{code}\n</{tag}>"
+
+
+def compose_document(html: str, css: str, javascript: str, title: str = "Website") -> str:
+    """
+    The full page a project renders as: html with its css and javascript fields applied
+
+    Blocks already present in the html (the template engine repeats its
+    styles in both places) aren't added a second time.
+    """
+    document = html or ""
+    if not _HTML_TAG.search(document):
+        document = _PAGE_SHELL.format(title=escape(title or "Website"), body=document)
+    style = _wrap(css, "style")
+    if style and style not in document:
+        head_end, body_start = _HEAD_END.search(document), _BODY_START.search(document)
+        at = head_end.start() if head_end else body_start.end() if body_start else 0
+        document = f"{document[:at]}{style}\n{document[at:]}"
+    script = _wrap(javascript, "script")
+    if script and script not in document:
+        body_ends = list(_BODY_END.finditer(document))
+        at = body_ends[-1].start() if body_ends else len(document)
+        document = f"{document[:at]}{script}\n{document[at:]}"
+    return document
+
+
+def _normalize(code: str) -> str:
+    # Newline and edge whitespace differences shouldn't split otherwise identical blocks
+    return code.replace("\r\n", "\n").strip()
+
+
+def _attr_type(attrs: str) -> str:
+    match = _TYPE_ATTR.search(attrs)
+    if not match:
+        return ""
+    return next(value for value in match.groups() if value is not None).strip().lower()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches a (strong, unquoted) entity tag"""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/").strip('"') for candidate in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def asset_url(asset_hash: str, kind: str) -> str:
+    """Public URL of an asset"""
+    return f"{get_settings().asset_base_url.rstrip('/')}/{asset_hash}.{kind}"
+
+
+def extract_assets(document: str, min_bytes: Optional[int] = None) -> Extraction:
+    """
+    Move inline style and script bodies into content-addressed assets
+
+    Scripts with a src, non-JavaScript scripts (JSON-LD, templates) and
+    blocks smaller than min_bytes stay inline. Extracted scripts keep their
+    position, so execution order is unchanged.
+
+    Args:
+        document: HTML document
+        min_bytes: Smallest body worth its own request (default settings.asset_min_bytes)
+
+    Returns:
+        Extraction with the rewritten HTML and the linked assets
+    """
+    if min_bytes is None:
+        min_bytes = get_settings().asset_min_bytes
+    assets: "OrderedDict[str, ExtractedAsset]" = OrderedDict()
+
+    def replace(match: "re.Match") -> str:
+        tag = match.group(1)
+        if tag is None:
+            return match.group(0)
+        tag = tag.lower()
+        attrs, body = match.group(2), _normalize(match.group(3))
+        kind = CSS if tag == "style" else JS
+        content_type = _attr_type(attrs)
+        if kind == JS and (_SRC_ATTR.search(attrs) or content_type not in _JS_TYPES):
+            return match.group(0)
+        if kind == CSS and content_type not in _CSS_TYPES:
+            return match.group(0)
+        encoded = body.encode("utf-8")
+        if not body or len(encoded) < min_bytes:
+            return match.group(0)
+        # The kind is part of the digest so identical bytes used as CSS and as JS get separate assets
+        digest = hashlib.sha256(kind.encode() + b"\0" + encoded).hexdigest()
+        assets.setdefault(digest, ExtractedAsset(hash=digest, kind=kind, content=body, size=len(encoded)))
+        url = asset_url(digest, kind)
+        if kind == CSS:
+            return f'<link rel="stylesheet" href="{url}"{_TYPE_ATTR.sub("", attrs).rstrip()}>'
+        if content_type != "module":
+            attrs = _TIMING_ATTR.sub("", attrs)
+        return f'<script src="{url}"{attrs.rstrip()}></script>'
+
+    html = _BLOCK.sub(replace, document)
+    return Extraction(html=html, assets=list(assets.values()))
+
+
+# ---------------------------------------------------------------------------
+# Storing pages and assets
+# ---------------------------------------------------------------------------
+
+def _insert_assets_if_missing(dialect: str, assets: List[ExtractedAsset], now: datetime):
+    """INSERT ... ON CONFLICT (hash) DO NOTHING for the supported dialects"""
+    dialect_insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(dialect)
+    rows = [
+        {"hash": a.hash, "kind": a.kind, "content": a.content, "size": a.size, "created_at": now, "last_seen_at": now}
+        for a in assets
+    ]
+    if dialect_insert is None:
+        return insert(StaticAsset), rows
+    return dialect_insert(StaticAsset).on_conflict_do_nothing(index_elements=["hash"]), rows
+
+
+async def _store(db: AsyncSession, project: Project, document: str, extraction: Extraction) -> Tuple[PublishedPage, set]:
+    now = datetime.utcnow()
+    hashes = [asset.hash for asset in extraction.assets]
+    shared = set()
+    if hashes:
+        shared = set(await db.scalars(select(StaticAsset.hash).where(StaticAsset.hash.in_(hashes))))
+        new_assets = [asset for asset in extraction.assets if asset.hash not in shared]
+        if new_assets:
+            dialect = (await db.connection()).dialect.name
+            statement, rows = _insert_assets_if_missing(dialect, new_assets, now)
+            await db.execute(statement, rows)
+        if shared:
+            # Keeps reused assets out of purge_orphans() while this transaction is open
+            await db.execute(update(StaticAsset).where(StaticAsset.hash.in_(shared)).values(last_seen_at=now))
+
+    page = await db.get(PublishedPage, project.id)
+    if page is None:
+        page = PublishedPage(project_id=project.id)
+        db.add(page)
+    page.change_seq = project.change_seq
+    page.html = extraction.html
+    page.etag = hashlib.sha256(extraction.html.encode("utf-8")).hexdigest()
+    page.source_bytes = len(document.encode("utf-8"))
+    page.published_at = now
+    await db.flush()
+    await db.execute(delete(published_page_assets).where(published_page_assets.c.project_id == project.id))
+    if hashes:
+        await db.execute(insert(published_page_assets), [{"project_id": project.id, "asset_hash": h} for h in hashes])
+    await db.commit()
+    return page, shared
+
+
+async def publish_async(db: AsyncSession, project: Project) -> dict:
+    """
+    Publish a project: extract its assets and store the rewritten page
+
+    Args:
+        db: Async database session (committed here)
+        project: Project to publish (html, css, javascript, change_seq loaded)
+
+    Returns:
+        dict with the PublishedPage and the assets it links to, each
+        flagged shared when its content was already stored
+    """
+    document = compose_document(project.html, project.css, project.javascript, project.title)
+    extraction = extract_assets(document)
+    try:
+        page, shared = await _store(db, project, document, extraction)
+    except IntegrityError:
+        # A concurrent publish of the same project won; serve its page
+        await db.rollback()
+        page = await db.get(PublishedPage, project.id, populate_existing=True)
+        shared = {asset.hash for asset in extraction.assets}
+        if page is None:
+            raise
+    for asset in extraction.assets:
+        metrics.ASSETS_PUBLISHED.labels(asset.kind, "shared" if asset.hash in shared else "new").inc()
+    return {
+        "page": page,
+        "assets": [
+            {"hash": a.hash, "kind": a.kind, "size": a.size, "url": asset_url(a.hash, a.kind), "shared": a.hash in shared}
+            for a in extraction.assets
+        ],
+    }
+
+
+async def get_page_async(db: AsyncSession, project_id: int) -> Optional[PublishedPage]:
+    """
+    The project's published page, republished first if the project changed since
+
+    Returns:
+        PublishedPage, or None if the project doesn't exist
+    """
+    project_seq = await db.scalar(select(Project.change_seq).where(Project.id == project_id))
+    if project_seq is None:
+        return None
+    page = await db.get(PublishedPage, project_id)
+    if page is not None and page.change_seq == project_seq:
+        return page
+    project = await db.get(Project, project_id)
+    if project is None:
+        return None
+    return (await publish_async(db, project))["page"]
+
+
+# ---------------------------------------------------------------------------
+# Serving and collecting assets
+# ---------------------------------------------------------------------------
+
+class _AssetCache:
+    """Small LRU of asset bodies; safe to cache forever since content never changes under a hash"""
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, asset_hash: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(asset_hash)
+            if entry is not None:
+                self._entries.move_to_end(asset_hash)
+            return entry
+
+    def put(self, asset_hash: str, kind: str, body: bytes) -> None:
+        capacity = get_settings().asset_memory_cache_entries
+        if capacity <= 0:
+            return
+        with self._lock:
+            self._entries[asset_hash] = (kind, body)
+            self._entries.move_to_end(asset_hash)
+            while len(self._entries) > capacity:
+                self._entries.popitem(last=False)
+
+
+_cache = _AssetCache()
+
+
+async def get_asset_async(db: AsyncSession, asset_hash: str) -> Optional[Tuple[str, bytes]]:
+    """
+    Kind and UTF-8 body of an asset
+
+    Returns:
+        (kind, body), or None if no asset has this hash
+    """
+    cached = _cache.get(asset_hash)
+    if cached is not None:
+        metrics.ASSET_REQUESTS.labels("cache").inc()
+        return cached
+    row = (await db.execute(
+        select(StaticAsset.kind, StaticAsset.content).where(StaticAsset.hash == asset_hash)
+    )).one_or_none()
+    if row is None:
+        return None
+    body = row.content.encode("utf-8")
+    _cache.put(asset_hash, row.kind, body)
+    metrics.ASSET_REQUESTS.labels("db").inc()
+    return row.kind, body
+
+
+def purge_orphans(db: Session, batch_size: int = 500) -> int:
+    """Delete assets no published page links to, unused for asset_gc_grace_s; returns the number removed"""
+    cutoff = datetime.utcnow() - timedelta(seconds=get_settings().asset_gc_grace_s)
+    orphaned = (
+        select(StaticAsset.hash)
+        .where(
+            StaticAsset.last_seen_at < cutoff,
+            ~exists().where(published_page_assets.c.asset_hash == StaticAsset.hash),
+        )
+        .limit(batch_size)
+    )
+    removed = 0
+    while True:
+        hashes = list(db.scalars(orphaned))
+        if not hashes:
+            return removed
+        result = db.execute(
+            delete(StaticAsset).where(
+                StaticAsset.hash.in_(hashes),
+                StaticAsset.last_seen_at < cutoff,
+                ~exists().where(published_page_assets.c.asset_hash == StaticAsset.hash),
+            )
+        )
+        db.commit()
+        removed += result.rowcount
+        if len(hashes) < batch_size:
+            return removed
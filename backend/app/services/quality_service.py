@@ -0,0 +1,89 @@
+"""
+Quality Service
+Runs output validation (services.validator) in a process pool
+
+Validation is pure CPU work on ~20-50 KB pages, so it runs in separate
+processes and the calling thread only waits on a future (GIL released).
+The pool is created on first use in each process (never inherited across
+fork) with the "spawn" start method, since forking a threaded server
+process is unsafe. If the pool breaks or validation_workers is 0, pages
+are validated inline instead.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from ..config import get_settings
+from . import metrics, validator
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Process-wide validation pool (None when validation runs inline)"""
+    global _pool
+    workers = get_settings().validation_workers
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            logger.info(f"✅ Validation pool started ({workers} worker{'s' if workers != 1 else ''})")
+        return _pool
+
+
+def score_output(html: str, css: str = "", js: str = "") -> Optional[dict]:
+    """
+    Validate and score generated output off the calling thread
+
+    Args:
+        html: Full HTML document
+        css: CSS field
+        js: JS field
+
+    Returns:
+        validator.validate() result plus validation_ms, or None if validation
+        timed out (the output is then treated as unvalidated, not rejected)
+    """
+    global _pool
+    start = time.perf_counter()
+    pool = _get_pool()
+    report = None
+    if pool is not None:
+        try:
+            report = pool.submit(validator.validate, html, css, js).result(timeout=get_settings().validation_timeout_s)
+        except FutureTimeoutError:
+            logger.warning("⚠️ Output validation timed out, skipping quality check")
+            return None
+        except BrokenProcessPool:
+            logger.warning("⚠️ Validation pool broke, validating inline and restarting the pool")
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+    if report is None:
+        report = validator.validate(html, css, js)
+    elapsed = time.perf_counter() - start
+    metrics.VALIDATION_DURATION.observe(elapsed)
+    report["validation_ms"] = round(elapsed * 1000, 2)
+    return report
+
+
+def shutdown_pool() -> None:
+    """Stop the validation pool (application shutdown)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def reset_after_fork() -> None:
+    """Forget a pool inherited from the parent; its worker processes belong to the parent"""
+    global _pool
+    _pool = None
@@ -0,0 +1,395 @@
+"""
+Retention Service
+Rule-based clean-up of the projects table, in bounded batches
+
+Rules (settings.retention_*, 0 disables a numeric rule):
+    fallback          failed or static-fallback-only results older than
+                      retention_fallback_grace_minutes
+    max_age           projects older than retention_max_age_days
+    max_per_type      everything beyond the newest retention_max_per_type
+                      projects of each website type
+
+Each batch selects at most retention_batch_size IDs and deletes them (and
+their revisions) in its own short transaction, pausing between batches so
+request writers are never locked out for long. Expired idempotency keys,
+change-feed tombstones and unreferenced published assets are purged the
+same way. A run then reclaims space: PRAGMA incremental_vacuum on SQLite,
+VACUUM (ANALYZE) on Postgres.
+
+Separately, skeleton-mode projects still "generating" after
+retention_stale_generating_minutes (their personalization died with a
+worker) are marked failed, never deleted: the client already has their ID.
+Once failed, the fallback rule removes them like any other failed result.
+
+The RetentionWorker recovers stale generations at startup and every
+stale_generating_sweep_interval_s whether or not retention is enabled, and
+with retention_enabled also runs the rules every retention_interval_s; a
+shared-state lease plus a last-run timestamp make sure only one process
+actually runs the rules per interval.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.orm import Session, load_only
+from ..config import get_settings
+from ..database import SessionLocal, engine
+from ..models.project import Project
+from ..schemas.project import ProjectStatus, WebsiteType
+from . import change_feed, idempotency, metrics, publishing
+from .project_service import ProjectService
+from .shared_state import get_shared_state
+
+logger = logging.getLogger(__name__)
+
+_LEASE_KEY = "retention"
+_LAST_RUN_KEY = "retention:last_run"
+
+# project_metadata is json.dumps()'d with "source" as its first key (WebsiteGeneratorService.metadata_for)
+_FALLBACK_METADATA = '{"source": "fallback"%'
+
+
+def _rule_queries(now: datetime) -> Dict[str, list]:
+    """
+    Candidate selectors per enabled rule, oldest first
+
+    Each value is a list of SELECT Project.id statements (max_per_type has
+    one per website type); callers add the LIMIT.
+    """
+    settings = get_settings()
+    rules: Dict[str, list] = {}
+    if settings.retention_delete_fallback:
+        cutoff = now - timedelta(minutes=settings.retention_fallback_grace_minutes)
+        rules["fallback"] = [
+            select(Project.id)
+            .where(
+                or_(Project.status == ProjectStatus.FAILED.value, Project.project_metadata.like(_FALLBACK_METADATA)),
+                Project.created_at < cutoff,
+            )
+            .order_by(Project.id)
+        ]
+    if settings.retention_max_age_days > 0:
+        cutoff = now - timedelta(days=settings.retention_max_age_days)
+        rules["max_age"] = [select(Project.id).where(Project.created_at < cutoff).order_by(Project.id)]
+    if settings.retention_max_per_type > 0:
+        rules["max_per_type"] = [
+            select(Project.id)
+            .where(Project.website_type == website_type.value)
+            .order_by(Project.created_at.desc(), Project.id.desc())
+            .offset(settings.retention_max_per_type)
+            for website_type in WebsiteType
+        ]
+    return rules
+
+
+def _count(db: Session, query) -> int:
+    return db.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
+
+
+def recover_stale_generating(batch_size: Optional[int] = None) -> int:
+    """
+    Mark skeleton-mode projects stuck at "generating" as failed
+
+    A project stays "generating" only while its personalization runs; one
+    not updated for retention_stale_generating_minutes lost its worker. The
+    status change goes through the ORM so the change feed picks it up.
+
+    Returns:
+        Number of projects marked failed
+    """
+    settings = get_settings()
+    if settings.retention_stale_generating_minutes <= 0:
+        return 0
+    batch_size = max(batch_size or settings.retention_batch_size, 1)
+    cutoff = datetime.utcnow() - timedelta(minutes=settings.retention_stale_generating_minutes)
+    query = (
+        select(Project)
+        .options(load_only(Project.id, Project.status))
+        .where(Project.status == ProjectStatus.GENERATING.value, Project.updated_at < cutoff)
+        .order_by(Project.id)
+        .limit(batch_size)
+    )
+    recovered = 0
+    db = SessionLocal()
+    try:
+        while True:
+            projects = list(db.scalars(query))
+            for project in projects:
+                project.status = ProjectStatus.FAILED.value
+            db.commit()
+            recovered += len(projects)
+            if len(projects) < batch_size:
+                break
+    finally:
+        db.close()
+    if recovered:
+        metrics.STALE_GENERATIONS_RECOVERED.inc(recovered)
+        logger.warning(f"⚠️ Marked {recovered} abandoned skeleton generations as failed")
+    return recovered
+
+
+def run(dry_run: bool = False, reclaim: bool = True) -> dict:
+    """
+    Apply the retention rules once
+
+    Args:
+        dry_run: Only count what each rule would delete
+        reclaim: Reclaim freed space after deleting
+
+    Returns:
+        dict with per-rule counts, elapsed time and the reclaim result
+    """
+    settings = get_settings()
+    start = time.perf_counter()
+    batch_size = max(settings.retention_batch_size, 1)
+    pause_s = max(settings.retention_batch_pause_ms, 0) / 1000.0
+    budget = settings.retention_max_deletes_per_run
+    counts: Dict[str, int] = {}
+    batches = 0
+
+    recovered = 0 if dry_run else recover_stale_generating(batch_size)
+    db = SessionLocal()
+    try:
+        for rule, queries in _rule_queries(datetime.utcnow()).items():
+            counts[rule] = 0
+            for query in queries:
+                if dry_run:
+                    counts[rule] += _count(db, query)
+                    continue
+                while budget > 0:
+                    # max_per_type re-selects past the newest N each time, since the batch before is gone
+                    ids = list(db.scalars(query.limit(min(batch_size, budget))))
+                    if not ids:
+                        break
+                    deleted = ProjectService.delete_projects(db, ids, operation="retention")
+                    counts[rule] += len(deleted)
+                    budget -= len(deleted)
+                    batches += 1
+                    metrics.RETENTION_DELETED.labels(rule).inc(len(deleted))
+                    if len(ids) < batch_size:
+                        break
+                    if pause_s:
+                        time.sleep(pause_s)
+        expired_keys = 0 if dry_run else idempotency.purge_expired(db, batch_size)
+        pruned_tombstones = 0 if dry_run else change_feed.prune_tombstones(db, batch_size)
+        orphaned_assets = 0 if dry_run else publishing.purge_orphans(db, batch_size)
+    finally:
+        db.close()
+
+    report = {"dry_run": dry_run, "would_delete" if dry_run else "deleted": counts}
+    if not dry_run:
+        report.update(batches=batches, budget_exhausted=budget <= 0, stale_generating_failed=recovered,
+                      expired_idempotency_keys=expired_keys, pruned_tombstones=pruned_tombstones,
+                      orphaned_assets=orphaned_assets)
+    if reclaim and not dry_run and sum(counts.values()):
+        report["reclaim"] = reclaim_space()
+    elapsed = time.perf_counter() - start
+    report["elapsed_ms"] = round(elapsed * 1000, 1)
+    if not dry_run:
+        metrics.RETENTION_RUN_DURATION.observe(elapsed)
+        total = sum(counts.values())
+        if total:
+            logger.info(f"🧹 Retention deleted {total} projects in {batches} batches ({elapsed:.1f}s): {counts}")
+    return report
+
+
+def _sqlite_pragma(conn, name: str) -> int:
+    return conn.execute(text(f"PRAGMA {name}")).scalar() or 0
+
+
+def storage_stats() -> dict:
+    """Database size figures (SQLite: file pages and free pages; Postgres: table sizes)"""
+    dialect = engine.dialect.name
+    with engine.connect() as conn:
+        if dialect == "sqlite":
+            page_size = _sqlite_pragma(conn, "page_size")
+            return {
+                "dialect": dialect,
+                "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(_sqlite_pragma(conn, "auto_vacuum")),
+                "size_bytes": _sqlite_pragma(conn, "page_count") * page_size,
+                "free_bytes": _sqlite_pragma(conn, "freelist_count") * page_size,
+            }
+        if dialect == "postgresql":
+            return {
+                "dialect": dialect,
+                "size_bytes": conn.execute(text(
+                    "SELECT pg_total_relation_size('projects') + pg_total_relation_size('project_revisions')"
+                )).scalar(),
+            }
+    return {"dialect": dialect}
+
+
+def reclaim_space() -> dict:
+    """
+    Give space freed by deletes back (SQLite) or make it reusable (Postgres)
+
+    SQLite databases created before auto_vacuum=incremental was configured
+    are left alone (the conversion is a full VACUUM that locks the whole
+    database); convert them with convert_sqlite_auto_vacuum() /
+    POST /api/admin/retention/convert-auto-vacuum in a quiet period.
+    """
+    settings = get_settings()
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        if engine.url.database in (None, "", ":memory:"):
+            return {"method": "none"}
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            page_size = _sqlite_pragma(conn, "page_size")
+            before = _sqlite_pragma(conn, "page_count")
+            if _sqlite_pragma(conn, "auto_vacuum") == 2:
+                method = "incremental_vacuum"
+                pages = max(settings.retention_vacuum_pages, 0)
+                # sqlite3's execute() steps the pragma once (one page); executescript() runs it to completion
+                conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({pages})" if pages else "PRAGMA incremental_vacuum")
+            elif settings.sqlite_auto_vacuum.lower() == "incremental":
+                logger.warning(
+                    "⚠️ SQLite database predates auto_vacuum=incremental; freed pages stay in the file until "
+                    "POST /api/admin/retention/convert-auto-vacuum is run"
+                )
+                return {"method": "none", "conversion_required": True}
+            else:
+                return {"method": "none"}
+            # WAL mode: the file only shrinks once the log is checkpointed
+            conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+            freed = max(before - _sqlite_pragma(conn, "page_count"), 0) * page_size
+        metrics.DB_SPACE_RECLAIMED.inc(freed)
+        return {"method": method, "freed_bytes": freed}
+    if dialect == "postgresql":
+        # Plain VACUUM marks dead tuples reusable without VACUUM FULL's exclusive lock
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM (ANALYZE) projects"))
+            conn.execute(text("VACUUM (ANALYZE) project_revisions"))
+        return {"method": "vacuum_analyze"}
+    return {"method": "none"}
+
+
+def convert_sqlite_auto_vacuum() -> dict:
+    """
+    Switch an existing SQLite database to auto_vacuum=incremental
+
+    Runs a full VACUUM: it holds the database lock for its whole duration
+    and needs free disk space of about the file size, so it's only ever
+    run on explicit request.
+
+    Returns:
+        dict with the method used and the bytes freed
+    """
+    if engine.dialect.name != "sqlite" or engine.url.database in (None, "", ":memory:"):
+        return {"method": "none"}
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if _sqlite_pragma(conn, "auto_vacuum") == 2:
+            return {"method": "none", "auto_vacuum": "incremental"}
+        page_size = _sqlite_pragma(conn, "page_size")
+        before = _sqlite_pragma(conn, "page_count")
+        logger.warning("⚠️ Converting SQLite database to auto_vacuum=incremental (full VACUUM)")
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        freed = max(before - _sqlite_pragma(conn, "page_count"), 0) * page_size
+    metrics.DB_SPACE_RECLAIMED.inc(freed)
+    return {"method": "vacuum", "freed_bytes": freed}
+
+
+def policy() -> dict:
+    """Configured retention rules"""
+    settings = get_settings()
+    return {
+        "enabled": settings.retention_enabled,
+        "interval_s": settings.retention_interval_s,
+        "max_age_days": settings.retention_max_age_days,
+        "max_per_type": settings.retention_max_per_type,
+        "delete_fallback": settings.retention_delete_fallback,
+        "fallback_grace_minutes": settings.retention_fallback_grace_minutes,
+        "stale_generating_minutes": settings.retention_stale_generating_minutes,
+        "stale_generating_sweep_interval_s": settings.stale_generating_sweep_interval_s,
+        "batch_size": settings.retention_batch_size,
+        "max_deletes_per_run": settings.retention_max_deletes_per_run,
+    }
+
+
+class RetentionWorker:
+    """Daemon thread recovering stale generations and (optionally) applying the retention rules"""
+
+    def __init__(self, interval_s: float, sweep_interval_s: float, rules_enabled: bool):
+        self.interval_s = max(interval_s, 1.0)
+        self.sweep_interval_s = max(sweep_interval_s, 1.0)
+        self.rules_enabled = rules_enabled
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        # Recover right away: a restart is exactly when generations get abandoned
+        tick = min(self.sweep_interval_s, self.interval_s) if self.rules_enabled else self.sweep_interval_s
+        next_sweep = 0.0
+        rules_after = time.monotonic() + self.interval_s
+        while True:
+            if time.monotonic() >= next_sweep:
+                next_sweep = time.monotonic() + self.sweep_interval_s
+                try:
+                    recover_stale_generating()
+                except Exception as e:
+                    logger.error(f"❌ Stale generation sweep failed: {str(e)}")
+            if self.rules_enabled and time.monotonic() >= rules_after:
+                try:
+                    self.run_if_due()
+                except Exception as e:
+                    logger.error(f"❌ Retention run failed: {str(e)}")
+            if self._stop.wait(tick):
+                return
+
+    def run_if_due(self) -> Optional[dict]:
+        """Run unless another process holds the lease or ran within the interval"""
+        state = get_shared_state()
+        token = state.try_acquire(_LEASE_KEY, 1)
+        if token is None:
+            return None
+        try:
+            if time.time() - state.get(_LAST_RUN_KEY) < self.interval_s:
+                return None
+            report = run()
+            state.set(_LAST_RUN_KEY, int(time.time()))
+            return report
+        finally:
+            state.release(token)
+
+
+_worker: Optional[RetentionWorker] = None
+
+
+def start_worker() -> None:
+    """Start this process's retention thread (stale-generation recovery always; rules with retention_enabled)"""
+    global _worker
+    settings = get_settings()
+    if not settings.retention_enabled and settings.retention_stale_generating_minutes <= 0:
+        return
+    if _worker is None:
+        _worker = RetentionWorker(
+            settings.retention_interval_s, settings.stale_generating_sweep_interval_s, settings.retention_enabled
+        )
+    _worker.start()
+    if settings.retention_enabled:
+        logger.info(f"✅ Retention worker started in pid {os.getpid()} (every {settings.retention_interval_s}s)")
+
+
+def stop_worker() -> None:
+    """Stop the retention thread (application shutdown)"""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
@@ -0,0 +1,177 @@
+"""
+Revision Service
+Delta-compressed version history for projects
+
+Each revision stores either a full snapshot of the tracked fields or, for
+the revisions in between, per-field edit ops against the previous revision.
+Ops are computed on markup-aware tokens (split after every ">" and newline)
+and stored as character counts, so replaying them is plain string slicing:
+
+    ["=", n]     copy n characters from the previous version
+    ["-", n]     skip n characters of the previous version
+    ["+", text]  insert text
+
+Payloads are zlib-compressed JSON. A snapshot is written every
+settings.revision_snapshot_interval revisions, so rebuilding any version
+replays at most interval - 1 deltas.
+
+History starts lazily: the first edit of a project stores its pre-edit
+state as revision 1. Every change to the tracked fields must go through
+ProjectService.update_project, since deltas assume the stored head matches
+the row being edited.
+"""
+import difflib
+import json
+import re
+import zlib
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.project import Project
+from ..models.revision import ProjectRevision
+
+TRACKED_FIELDS = ("title", "html", "css", "javascript")
+
+_TOKEN_BOUNDARY = re.compile(r"(?<=[>\n])")
+
+
+def _tokens(text: str) -> List[str]:
+    return [token for token in _TOKEN_BOUNDARY.split(text) if token]
+
+
+def _encode(data) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def _decode(payload: bytes):
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def diff_ops(old: str, new: str) -> list:
+    """Edit ops turning old into new (see module docstring)"""
+    a, b = _tokens(old), _tokens(new)
+    ops: list = []
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", sum(len(token) for token in a[i1:i2])])
+            continue
+        if tag in ("delete", "replace"):
+            ops.append(["-", sum(len(token) for token in a[i1:i2])])
+        if tag in ("insert", "replace"):
+            ops.append(["+", "".join(b[j1:j2])])
+    return ops
+
+
+def apply_ops(old: str, ops: list) -> str:
+    """Replay edit ops produced by diff_ops() against old"""
+    parts = []
+    position = 0
+    for op, value in ops:
+        if op == "=":
+            parts.append(old[position:position + value])
+            position += value
+        elif op == "-":
+            position += value
+        else:
+            parts.append(value)
+    return "".join(parts)
+
+
+class RevisionService:
+    """Service for recording and rebuilding project revisions"""
+
+    @staticmethod
+    def capture(project: Project) -> Dict[str, str]:
+        """Tracked field values of a project, taken before it is modified"""
+        return {field: getattr(project, field) or "" for field in TRACKED_FIELDS}
+
+    @staticmethod
+    def record(
+        db: Session,
+        project_id: int,
+        old: Dict[str, str],
+        new: Dict[str, str],
+        snapshot_interval: Optional[int] = None
+    ) -> Optional[ProjectRevision]:
+        """
+        Add the revision for an edit to the session (committed by the caller)
+
+        Args:
+            db: Database session holding the project update
+            project_id: Project being edited
+            old: capture() of the project before the edit
+            new: capture() of the project after the edit
+            snapshot_interval: Revisions per full snapshot (defaults to settings)
+
+        Returns:
+            The new revision, or None if no tracked field changed
+        """
+        if old == new:
+            return None
+        interval = max(snapshot_interval or get_settings().revision_snapshot_interval, 1)
+
+        head = db.query(func.max(ProjectRevision.revision)).filter(
+            ProjectRevision.project_id == project_id
+        ).scalar()
+        if head is None:
+            # First edit: keep the original version as revision 1
+            head = 1
+            payload = _encode(old)
+            db.add(ProjectRevision(project_id=project_id, revision=1, is_snapshot=True, payload=payload, size=len(payload)))
+
+        revision = head + 1
+        is_snapshot = (revision - 1) % interval == 0
+        if is_snapshot:
+            payload = _encode(new)
+        else:
+            payload = _encode({
+                field: diff_ops(old[field], new[field])
+                for field in TRACKED_FIELDS
+                if old[field] != new[field]
+            })
+        row = ProjectRevision(project_id=project_id, revision=revision, is_snapshot=is_snapshot, payload=payload, size=len(payload))
+        db.add(row)
+        return row
+
+    @staticmethod
+    def list_revisions(db: Session, project_id: int) -> List[ProjectRevision]:
+        """Revisions of a project, newest first"""
+        return db.query(ProjectRevision).filter(
+            ProjectRevision.project_id == project_id
+        ).order_by(ProjectRevision.revision.desc()).all()
+
+    @staticmethod
+    def reconstruct(db: Session, project_id: int, revision: int) -> Optional[dict]:
+        """
+        Rebuild the tracked fields of one revision
+
+        Loads the nearest snapshot at or below the revision plus the deltas
+        after it, in a single query.
+
+        Returns:
+            Dict with revision, created_at and the tracked fields, or None if
+            the revision does not exist
+        """
+        base = db.query(func.max(ProjectRevision.revision)).filter(
+            ProjectRevision.project_id == project_id,
+            ProjectRevision.is_snapshot.is_(True),
+            ProjectRevision.revision <= revision
+        ).scalar()
+        if base is None:
+            return None
+
+        rows = db.query(ProjectRevision).filter(
+            ProjectRevision.project_id == project_id,
+            ProjectRevision.revision >= base,
+            ProjectRevision.revision <= revision
+        ).order_by(ProjectRevision.revision).all()
+        if not rows or rows[-1].revision != revision:
+            return None
+
+        fields = _decode(rows[0].payload)
+        for row in rows[1:]:
+            for field, ops in _decode(row.payload).items():
+                fields[field] = apply_ops(fields[field], ops)
+        return {"revision": revision, "created_at": rows[-1].created_at, **fields}
@@ -0,0 +1,168 @@
+"""
+Section Editor Service
+Split generated HTML into semantic sections and splice edited ones back in
+
+Sections are the outermost <header>, <nav>, <section>, <article> and
+<footer> elements of a page. Each is addressed by its id attribute, or
+"<tag>-<n>" (1-based per tag) when it has none. Offsets come from a single
+html.parser pass, so the rest of the document is preserved byte-for-byte
+when a section is replaced.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import List, Optional
+
+SECTION_TAGS = {"header", "nav", "section", "article", "footer"}
+
+# Elements that never have a closing tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# id="..." / id='...' / id=bare inside a start tag (not data-id and the like)
+_ID_ATTR = re.compile(r"""\s+id\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'>]+)""", re.IGNORECASE)
+
+# Tailwind class families worth carrying into a style summary
+_STYLE_CLASS_PATTERNS = {
+    "colors": re.compile(r"^(?:[a-z]+:)*(?:bg|text|border|from|via|to|ring)-(?:[a-z]+-\d{2,3}|white|black)$"),
+    "typography": re.compile(r"^(?:[a-z]+:)*(?:font-(?:sans|serif|mono|light|normal|medium|semibold|bold|extrabold)|text-(?:xs|sm|base|lg|[2-9]?xl)|tracking-\w+|leading-\w+)$"),
+    "shape": re.compile(r"^(?:[a-z]+:)*(?:rounded(?:-\w+)?|shadow(?:-\w+)?|border(?:-\d)?)$"),
+    "layout": re.compile(r"^(?:[a-z]+:)*(?:max-w-\w+|container|grid-cols-\d+|gap-\d+|py-\d+|px-\d+)$"),
+}
+
+
+@dataclass
+class Section:
+    """A top-level semantic section of a page"""
+    id: str
+    tag: str
+    start: int
+    end: int
+    html: str
+
+
+class _SectionParser(HTMLParser):
+    """Records start/end offsets of outermost section elements"""
+
+    def __init__(self, source: str):
+        super().__init__(convert_charrefs=False)
+        self.source = source
+        self._line_offsets = [0]
+        for match in re.finditer("\n", source):
+            self._line_offsets.append(match.end())
+        self.stack: List[str] = []
+        self.sections: List[Section] = []
+        self._open: Optional[tuple] = None  # (tag, id, start, depth)
+        self._tag_counts: Counter = Counter()
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        if self._open is None and tag in SECTION_TAGS:
+            self._tag_counts[tag] += 1
+            section_id = dict(attrs).get("id") or f"{tag}-{self._tag_counts[tag]}"
+            self._open = (tag, section_id, self._offset(), len(self.stack))
+        self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> opens and closes immediately; nothing to track
+        pass
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return  # stray end tag
+        # Implicitly close anything left open inside this element
+        while self.stack:
+            popped = self.stack.pop()
+            if popped == tag:
+                break
+        if self._open is not None and len(self.stack) == self._open[3]:
+            open_tag, section_id, start, _ = self._open
+            end = self.source.find(">", self._offset()) + 1
+            self.sections.append(Section(section_id, open_tag, start, end, self.source[start:end]))
+            self._open = None
+
+
+def parse_sections(html: str) -> List[Section]:
+    """Find the outermost semantic sections of a page, in document order"""
+    parser = _SectionParser(html)
+    parser.feed(html)
+    parser.close()
+    return parser.sections
+
+
+def find_section(html: str, section_id: str) -> Optional[Section]:
+    """Look up a section by id (or generated <tag>-<n> id)"""
+    for section in parse_sections(html):
+        if section.id == section_id:
+            return section
+    return None
+
+
+def splice_section(html: str, section: Section, replacement: str) -> str:
+    """Replace a section's markup, leaving the rest of the document untouched"""
+    return html[:section.start] + replacement + html[section.end:]
+
+
+def style_summary(html: str, per_group: int = 8) -> str:
+    """
+    Compact description of a page's visual style for section prompts
+
+    Lists the most frequent Tailwind color, typography, shape and layout
+    classes so a regenerated section can match without sending the page.
+    """
+    counters = {group: Counter() for group in _STYLE_CLASS_PATTERNS}
+    for class_attr in re.findall(r'class\s*=\s*"([^"]*)"', html):
+        for cls in class_attr.split():
+            for group, pattern in _STYLE_CLASS_PATTERNS.items():
+                if pattern.match(cls):
+                    counters[group][cls] += 1
+                    break
+    lines = ["Tailwind CSS (CDN)."]
+    for group, counter in counters.items():
+        if counter:
+            lines.append(f"{group.title()}: {', '.join(cls for cls, _ in counter.most_common(per_group))}")
+    css_vars = re.findall(r"(--[\w-]+)\s*:\s*([^;]+);", html)
+    if css_vars:
+        lines.append("CSS variables: " + "; ".join(f"{name}: {value.strip()}" for name, value in css_vars[:per_group]))
+    return "\n".join(lines)
+
+
+def extract_fragment(response_text: str, tag: str) -> Optional[str]:
+    """
+    Pull a single <tag>...</tag> element out of a model response
+
+    Tolerates markdown code fences and chatter around the element.
+    """
+    text = response_text.strip()
+    fence = re.search(r"```(?:html)?\s*(.*?)```", text, re.DOTALL)
+    if fence:
+        text = fence.group(1).strip()
+    start = re.search(rf"<{tag}\b", text, re.IGNORECASE)
+    if not start:
+        return None
+    end = text.lower().rfind(f"</{tag}>")
+    if end == -1 or end < start.start():
+        return None
+    return text[start.start():end + len(tag) + 3]
+
+
+def ensure_section_id(fragment: str, tag: str, section_id: str) -> str:
+    """
+    Make sure the regenerated element keeps the id it is addressed by
+
+    An id the model put on the root element is replaced, not kept: later
+    regenerate-section calls and section lookups use the original id.
+    """
+    opening = re.match(rf"<{tag}\b[^>]*>", fragment, re.IGNORECASE)
+    if not opening:
+        return fragment
+    start_tag = _ID_ATTR.sub("", opening.group(0))
+    return f'<{tag} id="{section_id}"' + start_tag[len(tag) + 1:] + fragment[opening.end():]
@@ -0,0 +1,123 @@
+"""
+Serialization Service
+Fast JSON responses for project payloads
+
+Project reads return trusted database rows, so instead of building
+Pydantic models (which re-validate every 10-40 KB code string) and running
+them through FastAPI's encoder, routes turn rows straight into dicts and
+encode them with orjson (stdlib json when orjson isn't installed).
+Payloads estimated above settings.response_stream_threshold are encoded
+incrementally instead: containers are walked and each key, row and string
+is encoded on its own and sent in settings.response_chunk_size pieces, so
+the whole encoded body never sits in memory at once and the first rows go
+out before the last are encoded. Each route's response_model still
+documents the shape in OpenAPI.
+"""
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, Mapping, Optional, Sequence
+from starlette.responses import Response, StreamingResponse
+from ..config import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see requirements.txt
+    orjson = None
+
+# Field sets of the response schemas (schemas.project), for ORM objects
+PROJECT_FIELDS = ("id", "title", "website_type", "user_prompt", "html", "css", "javascript", "status", "created_at", "updated_at")
+PROJECT_LIST_FIELDS = ("id", "title", "website_type", "status", "created_at", "updated_at")
+GENERATED_FIELDS = ("id", "title", "website_type", "html", "css", "javascript", "status", "created_at")
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to compact UTF-8 JSON (datetimes as ISO 8601, enums by value)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def to_dict(source: Any, fields: Sequence[str]) -> dict:
+    """Pick response fields from an ORM object or a result row"""
+    return {field: getattr(source, field) for field in fields}
+
+
+def _estimated_size(content: Any) -> int:
+    """Rough encoded size of content: string lengths plus a few bytes per other value"""
+    if isinstance(content, str):
+        return len(content) + 2
+    if isinstance(content, Mapping):
+        return sum(len(str(key)) + 4 + _estimated_size(value) for key, value in content.items()) + 2
+    if isinstance(content, (list, tuple)):
+        return sum(_estimated_size(item) + 1 for item in content) + 2
+    return 16
+
+
+def _encode_pieces(content: Any, size: int) -> Iterator[bytes]:
+    """JSON for content, piece by piece (same bytes as dumps(content))"""
+    if isinstance(content, Mapping):
+        yield b"{"
+        for index, (key, value) in enumerate(content.items()):
+            yield (b"," if index else b"") + dumps(str(key)) + b":"
+            yield from _encode_pieces(value, size)
+        yield b"}"
+    elif isinstance(content, (list, tuple)):
+        yield b"["
+        for index, item in enumerate(content):
+            if index:
+                yield b","
+            yield from _encode_pieces(item, size)
+        yield b"]"
+    else:
+        encoded = dumps(content)
+        # Long strings (generated code) go out in slices of the chunk size
+        for start in range(0, len(encoded), size):
+            yield encoded[start:start + size]
+
+
+async def _stream(content: Any, size: int) -> AsyncIterator[bytes]:
+    # Async so Starlette sends chunks from the event loop instead of a threadpool
+    buffer = bytearray()
+    for piece in _encode_pieces(content, size):
+        buffer += piece
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    JSON response for trusted content, bypassing response_model validation
+
+    Args:
+        content: dict / list of JSON-compatible values, datetimes and enums
+        status_code: HTTP status
+        headers: Extra response headers
+
+    Returns:
+        A plain Response, or a StreamingResponse encoding the body
+        incrementally (chunked transfer) when it is estimated to exceed
+        response_stream_threshold
+    """
+    settings = get_settings()
+    if _estimated_size(content) <= settings.response_stream_threshold:
+        return Response(dumps(content), status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+    return StreamingResponse(
+        _stream(content, max(settings.response_chunk_size, 1024)),
+        status_code=status_code,
+        headers=headers,
+        media_type=JSON_MEDIA_TYPE,
+    )
@@ -0,0 +1,345 @@
+"""
+Shared State Service
+Counters and concurrency limits shared by all worker processes on a host
+
+Backed by a small SQLite file in WAL mode, opened lazily per process (so a
+connection is never inherited across fork). Counters are atomic upserts;
+limits are leases tagged with the holder's pid, so slots held by a worker
+that crashed are reclaimed on the next acquire.
+
+Every call blocks on the file (up to the busy timeout while another worker
+holds its write lock), so code on the event loop goes through the
+SharedStateMirror instead: one thread per process keeps cached copies of
+the counters it needs and flushes writes queued from the loop.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, Optional, Set, Tuple
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_shared_state: Optional["SharedState"] = None
+_mirror: Optional["SharedStateMirror"] = None
+
+
+class SharedState:
+    """Cross-process counters and leases in a SQLite file"""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-process connection (re-opened after fork)"""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (token TEXT PRIMARY KEY, key TEXT NOT NULL, pid INTEGER NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_leases_key ON leases (key)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Atomically add to a counter and return the new value"""
+        with self._lock:
+            row = self._connection().execute(
+                "INSERT INTO counters (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value RETURNING value",
+                (key, amount),
+            ).fetchone()
+        return row[0]
+
+    def get(self, key: str) -> int:
+        """Current value of a counter (0 if unset)"""
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def set(self, key: str, value: int) -> None:
+        """Set a counter"""
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO counters (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def set_max(self, key: str, value: int) -> None:
+        """Raise a counter to value (never lowers it)"""
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO counters (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = max(value, excluded.value)",
+                (key, value),
+            )
+
+    def get_many(self, keys) -> Dict[str, int]:
+        """Current values of several counters (0 if unset)"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT key, value FROM counters WHERE key IN ({', '.join('?' * len(keys))})", keys
+            ).fetchall()
+        values = dict.fromkeys(keys, 0)
+        values.update(rows)
+        return values
+
+    # ------------------------------------------------------------------
+    # Limits
+    # ------------------------------------------------------------------
+
+    def try_acquire(self, key: str, limit: int) -> Optional[str]:
+        """
+        Take one of `limit` slots for `key`
+
+        Returns:
+            Lease token to pass to release(), or None if all slots are taken
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                holders = conn.execute("SELECT token, pid FROM leases WHERE key = ?", (key,)).fetchall()
+                dead = [token for token, pid in holders if not _pid_alive(pid)]
+                if dead:
+                    conn.executemany("DELETE FROM leases WHERE token = ?", [(token,) for token in dead])
+                if len(holders) - len(dead) >= limit:
+                    conn.execute("COMMIT")
+                    return None
+                token = uuid.uuid4().hex
+                conn.execute("INSERT INTO leases (token, key, pid) VALUES (?, ?, ?)", (token, key, os.getpid()))
+                conn.execute("COMMIT")
+                return token
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def release(self, token: str) -> None:
+        """Give back a slot taken with try_acquire()"""
+        with self._lock:
+            self._connection().execute("DELETE FROM leases WHERE token = ?", (token,))
+
+    def held(self, key: str) -> int:
+        """Number of slots currently held for `key` across all workers"""
+        with self._lock:
+            row = self._connection().execute("SELECT COUNT(*) FROM leases WHERE key = ?", (key,)).fetchone()
+        return row[0]
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process id still exists"""
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # os.kill(pid, 0) terminates the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        # Platforms without signal-0 probing: assume alive
+        return True
+    return True
+
+
+class SharedStateMirror:
+    """
+    Per-process cache of shared counters, kept current by one background thread
+
+    Reads (value) and queued writes (incr_later, set_max_later) never touch
+    the SQLite file, so they're safe on the event loop. Every
+    shared_state_poll_ms the thread flushes queued writes, re-reads the
+    watched counters and wakes the coroutines waiting in wait_changed() on
+    any that moved. Local writes show in the cache (and wake waiters) at
+    once; other workers' writes within one poll interval.
+    """
+
+    def __init__(self, state: SharedState, interval_s: float):
+        self._state = state
+        self.interval_s = max(interval_s, 0.01)
+        self._values: Dict[str, int] = {}
+        self._watched: Set[str] = set()
+        self._pending_incr: Dict[str, int] = {}
+        self._pending_max: Dict[str, int] = {}
+        self._waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="shared-state-mirror", daemon=True)
+                self._thread.start()
+
+    def watch(self, key: str) -> None:
+        """Keep a counter cached (value() returns 0 until the first refresh)"""
+        if key not in self._watched:
+            with self._lock:
+                self._watched.add(key)
+            self._wake.set()
+        self._ensure_running()
+
+    def value(self, key: str) -> int:
+        """Cached value of a watched counter"""
+        self.watch(key)
+        return self._values.get(key, 0)
+
+    def incr_later(self, key: str, amount: int = 1) -> None:
+        """Add to a counter: in the cache now, in the shared file on the next flush"""
+        with self._lock:
+            self._watched.add(key)
+            self._pending_incr[key] = self._pending_incr.get(key, 0) + amount
+            self._values[key] = self._values.get(key, 0) + amount
+            waiters = self._waiters.pop(key, set())
+        self._notify(waiters)
+        self._wake.set()
+        self._ensure_running()
+
+    def set_max_later(self, key: str, value: int) -> None:
+        """Raise a counter to value: in the cache now, in the shared file on the next flush"""
+        with self._lock:
+            self._watched.add(key)
+            self._pending_max[key] = max(self._pending_max.get(key, 0), value)
+            self._values[key] = max(self._values.get(key, 0), value)
+            waiters = self._waiters.pop(key, set())
+        self._notify(waiters)
+        self._wake.set()
+        self._ensure_running()
+
+    async def wait_changed(self, key: str, seen: int, timeout: float) -> int:
+        """
+        Wait until a counter differs from seen, or timeout passes
+
+        Returns:
+            The counter's (cached) value afterwards
+        """
+        self.watch(key)
+        event = asyncio.Event()
+        entry = (asyncio.get_running_loop(), event)
+        with self._lock:
+            if self._values.get(key, 0) != seen:
+                return self._values.get(key, 0)
+            self._waiters.setdefault(key, set()).add(entry)
+        try:
+            await asyncio.wait_for(event.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.get(key, set()).discard(entry)
+        return self.value(key)
+
+    @staticmethod
+    def _notify(waiters) -> None:
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def sync(self) -> None:
+        """Flush queued writes and refresh the watched counters (the thread's job; blocking)"""
+        with self._lock:
+            increments, self._pending_incr = self._pending_incr, {}
+            maxima, self._pending_max = self._pending_max, {}
+            watched = set(self._watched)
+        try:
+            for key, amount in increments.items():
+                self._state.incr(key, amount)
+            for key, value in maxima.items():
+                self._state.set_max(key, value)
+        except Exception:
+            # Keep them for the next round
+            with self._lock:
+                for key, amount in increments.items():
+                    self._pending_incr[key] = self._pending_incr.get(key, 0) + amount
+                for key, value in maxima.items():
+                    self._pending_max[key] = max(self._pending_max.get(key, 0), value)
+            raise
+        fresh = self._state.get_many(watched)
+        woken = []
+        with self._lock:
+            for key, value in fresh.items():
+                # Writes queued since the flush above aren't in the file yet
+                value += self._pending_incr.get(key, 0)
+                value = max(value, self._pending_max.get(key, 0))
+                if self._values.get(key) != value:
+                    self._values[key] = value
+                    woken.extend(self._waiters.pop(key, set()))
+        self._notify(woken)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                logger.warning(f"⚠️ Shared state refresh failed: {str(e)}")
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush what's queued and stop the thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.sync()
+        except Exception as e:
+            logger.warning(f"⚠️ Shared state flush failed: {str(e)}")
+
+
+def get_shared_state() -> SharedState:
+    """Get the process-wide SharedState for settings.shared_state_path"""
+    global _shared_state
+    if _shared_state is None:
+        _shared_state = SharedState(get_settings().shared_state_path)
+    return _shared_state
+
+
+def get_mirror() -> SharedStateMirror:
+    """Get the process-wide SharedStateMirror (its thread starts on first use)"""
+    global _mirror
+    if _mirror is None:
+        _mirror = SharedStateMirror(get_shared_state(), get_settings().shared_state_poll_ms / 1000.0)
+    return _mirror
+
+
+def stop_mirror() -> None:
+    """Flush queued writes and stop the mirror thread (application shutdown)"""
+    if _mirror is not None:
+        _mirror.stop()
+
+
+def reset_after_fork() -> None:
+    """Forget the parent's mirror: its thread didn't survive the fork"""
+    global _mirror
+    _mirror = None
@@ -0,0 +1,171 @@
+"""
+Skeleton Pages
+Precomputed, type-specific placeholder sites shown while generation runs
+
+Each WebsiteType gets a loading-state page with the same structure the
+generator is asked for (see ai_service.WEBSITE_DESCRIPTIONS): pulsing
+placeholder blocks for the hero, features, project grid, post list,
+product grid and so on. Pages are built once at import; serving one is a
+dict lookup plus a title substitution.
+"""
+import html as html_lib
+from typing import Dict
+from .ai_service import WEBSITE_DESCRIPTIONS
+
+_TITLE = "{{title}}"
+
+
+def _bar(width: str, height: str = "h-4", shade: str = "bg-gray-200") -> str:
+    return f'<div class="{height} {width} {shade} rounded"></div>'
+
+
+def _card(lines: int = 2, media: str = "h-40") -> str:
+    body = "".join(_bar(width) for width in ("w-3/4", "w-full", "w-5/6", "w-2/3")[:lines])
+    return (
+        '<div class="rounded-xl border border-gray-100 p-4 space-y-3">'
+        f'<div class="{media} bg-gray-200 rounded-lg"></div>{body}</div>'
+    )
+
+
+def _grid(count: int, columns: str, **card) -> str:
+    return f'<div class="grid gap-6 {columns}">' + "".join(_card(**card) for _ in range(count)) + "</div>"
+
+
+def _section(section_id: str, inner: str, shade: str = "bg-white") -> str:
+    return f'<section id="{section_id}" class="py-16 px-6 {shade}"><div class="max-w-6xl mx-auto space-y-8">{inner}</div></section>'
+
+
+def _heading() -> str:
+    return '<div class="space-y-3">' + _bar("w-1/3", "h-8", "bg-gray-300") + _bar("w-1/2") + "</div>"
+
+
+def _header(extra: str = "") -> str:
+    links = "".join(_bar("w-16") for _ in range(4))
+    return (
+        '<header class="border-b border-gray-100"><nav class="max-w-6xl mx-auto px-6 py-4 flex items-center justify-between">'
+        f'<span class="text-xl font-bold text-gray-900">{_TITLE}</span>'
+        f'<div class="hidden md:flex items-center gap-6">{links}{extra}</div></nav></header>'
+    )
+
+
+def _hero() -> str:
+    return _section("hero", (
+        '<div class="text-center space-y-4 py-8">'
+        + _bar("w-2/3 mx-auto", "h-12", "bg-gray-300")
+        + _bar("w-1/2 mx-auto", "h-5")
+        + '<div class="flex justify-center gap-4 pt-4">' + _bar("w-36", "h-12", "bg-blue-200") + _bar("w-36", "h-12") + "</div>"
+        + "</div>"
+    ), "bg-gray-50")
+
+
+def _contact() -> str:
+    fields = "".join(_bar("w-full", "h-11") for _ in range(3))
+    return _section("contact", _heading() + (
+        f'<div class="max-w-xl space-y-4">{fields}{_bar("w-full", "h-28")}{_bar("w-40", "h-12", "bg-blue-200")}</div>'
+    ))
+
+
+def _footer() -> str:
+    return (
+        '<footer class="border-t border-gray-100 py-10 px-6"><div class="max-w-6xl mx-auto flex flex-col md:flex-row justify-between gap-4">'
+        f'<span class="text-gray-500">&copy; {_TITLE}</span>'
+        '<div class="flex gap-6">' + "".join(_bar("w-16") for _ in range(3)) + "</div></div></footer>"
+    )
+
+
+def _chips(count: int) -> str:
+    return '<div class="flex flex-wrap gap-3">' + "".join(_bar("w-24", "h-9", "bg-gray-100 rounded-full") for _ in range(count)) + "</div>"
+
+
+_SECTIONS = {
+    "landing_page": lambda: [
+        _header(),
+        "<main>",
+        _hero(),
+        _section("features", _heading() + _grid(3, "md:grid-cols-3", media="h-12 w-12")),
+        _section("cta", '<div class="text-center space-y-4">' + _bar("w-1/2 mx-auto", "h-8", "bg-gray-300") + _bar("w-40 mx-auto", "h-12", "bg-blue-200") + "</div>", "bg-gray-50"),
+        _contact(),
+        "</main>",
+        _footer(),
+    ],
+    "portfolio": lambda: [
+        _header(),
+        "<main>",
+        _section("about", (
+            '<div class="flex flex-col md:flex-row items-center gap-10">'
+            '<div class="h-40 w-40 rounded-full bg-gray-200 shrink-0"></div>'
+            '<div class="flex-1 space-y-4">' + _bar("w-2/3", "h-10", "bg-gray-300") + _bar("w-full") + _bar("w-5/6") + "</div></div>"
+        ), "bg-gray-50"),
+        _section("projects", _heading() + _grid(6, "sm:grid-cols-2 lg:grid-cols-3")),
+        _section("skills", _heading() + _chips(10), "bg-gray-50"),
+        _contact(),
+        "</main>",
+        _footer(),
+    ],
+    "blog": lambda: [
+        _header(_bar("w-48", "h-9", "bg-gray-100")),
+        "<main>",
+        _section("categories", _bar("w-full", "h-11", "bg-gray-100") + _chips(6), "bg-gray-50"),
+        _section("posts", _heading() + '<div class="space-y-6">' + "".join(
+            '<article class="flex flex-col md:flex-row gap-6"><div class="h-32 md:w-48 bg-gray-200 rounded-lg shrink-0"></div>'
+            '<div class="flex-1 space-y-3">' + _bar("w-2/3", "h-6", "bg-gray-300") + _bar("w-full") + _bar("w-4/5") + _bar("w-24", "h-3") + "</div></article>"
+            for _ in range(4)
+        ) + "</div>"),
+        _section("article", '<article class="max-w-3xl mx-auto space-y-4">' + _bar("w-3/4", "h-10", "bg-gray-300") + _bar("w-full", "h-64") + "".join(_bar(w) for w in ("w-full", "w-11/12", "w-full", "w-4/5")) + "</article>", "bg-gray-50"),
+        "</main>",
+        _footer(),
+    ],
+    "ecommerce": lambda: [
+        _header('<div class="h-9 w-9 rounded-full bg-gray-200"></div>'),
+        "<main>",
+        _hero(),
+        _section("products", _heading() + (
+            '<div class="flex flex-col lg:flex-row gap-8">'
+            '<aside class="lg:w-56 space-y-4 shrink-0">' + "".join(_bar(w) for w in ("w-24", "w-full", "w-5/6", "w-full", "w-2/3", "w-24", "w-full")) + "</aside>"
+            '<div class="flex-1">' + _grid(8, "sm:grid-cols-2 xl:grid-cols-4", lines=3) + "</div></div>"
+        )),
+        _section("cart", _heading() + (
+            '<div class="flex flex-col md:flex-row gap-8"><div class="flex-1 space-y-4">' + "".join(_bar("w-full", "h-16") for _ in range(3)) + "</div>"
+            '<div class="md:w-80 space-y-3 rounded-xl border border-gray-100 p-6">' + _bar("w-1/2") + _bar("w-full") + _bar("w-full") + _bar("w-full", "h-12", "bg-blue-200") + "</div></div>"
+        ), "bg-gray-50"),
+        "</main>",
+        _footer(),
+    ],
+}
+
+
+def _page(website_type: str) -> str:
+    description = WEBSITE_DESCRIPTIONS[website_type]
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+        '<meta charset="UTF-8">\n<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        f"<title>{_TITLE}</title>\n"
+        '<script src="https://cdn.tailwindcss.com"></script>\n</head>\n'
+        '<body class="bg-white text-gray-900">\n'
+        '<div class="bg-blue-600 text-white text-sm text-center py-2 px-4" role="status">'
+        f"Building {html_lib.escape(description)}&hellip;</div>\n"
+        '<div class="animate-pulse">\n' + "\n".join(_SECTIONS[website_type]()) + "\n</div>\n"
+        "</body>\n</html>"
+    )
+
+
+SKELETONS: Dict[str, str] = {website_type: _page(website_type) for website_type in _SECTIONS}
+
+
+def skeleton_for(website_type: str, title: str) -> dict:
+    """
+    Skeleton page for a website type, in generated-code shape
+
+    Args:
+        website_type: WebsiteType value
+        title: Project title shown in the header, footer and <title>
+
+    Returns:
+        dict with 'html', 'css', 'js' keys
+    """
+    page = SKELETONS.get(website_type, SKELETONS["landing_page"])
+    return {
+        "html": page.replace(_TITLE, html_lib.escape(title)),
+        "css": "<style>/* Skeleton: Tailwind utilities only */</style>",
+        "js": "",
+    }
@@ -0,0 +1,131 @@
+"""
+Startup Report Service
+Cold-start phase timings and a `python -X importtime` breakdown
+
+Phases are perf_counter marks taken while the process starts:
+    import         app package import -> app.main fully imported
+    startup        app.main imported  -> startup hook finished
+    first_request  startup finished   -> first response completed
+
+The import breakdown runs `python -X importtime -c "import <app>.main"` in a
+fresh subprocess on demand, so measuring it costs nothing at startup.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from .. import IMPORT_STARTED
+
+_marks: Dict[str, float] = {}
+_breakdown: Optional[dict] = None
+_breakdown_lock = threading.Lock()
+
+
+def mark(name: str) -> None:
+    """Record the first time a startup milestone is reached"""
+    if name not in _marks:
+        _marks[name] = time.perf_counter()
+
+
+def mark_first_request() -> None:
+    """Record completion of the first request (cheap no-op afterwards)"""
+    if "first_request" not in _marks:
+        _marks["first_request"] = time.perf_counter()
+
+
+def _process_age_at_import() -> Optional[float]:
+    """Seconds between process start and app import (Linux /proc only)"""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        age_now = uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+        return max(age_now - (time.perf_counter() - IMPORT_STARTED), 0.0)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def phases() -> dict:
+    """Startup phase durations in milliseconds"""
+    points = [("import", "app_imported"), ("startup", "startup_complete"), ("first_request", "first_request")]
+    result = {}
+    previous = IMPORT_STARTED
+    for phase, milestone in points:
+        reached = _marks.get(milestone)
+        if reached is None:
+            break
+        result[phase] = round((reached - previous) * 1000, 1)
+        previous = reached
+
+    interpreter = _process_age_at_import()
+    report = {
+        "phases_ms": result,
+        "interpreter_and_site_ms": round(interpreter * 1000, 1) if interpreter is not None else None,
+    }
+    if "first_request" in _marks:
+        total = _marks["first_request"] - IMPORT_STARTED + (interpreter or 0.0)
+        report["time_to_first_request_ms"] = round(total * 1000, 1)
+    return report
+
+
+def _without_depth(row: dict) -> dict:
+    return {key: value for key, value in row.items() if key != "depth"}
+
+
+def _parse_importtime(stderr: str, top: int) -> dict:
+    """Parse `-X importtime` output into direct imports and slowest modules"""
+    rows: List[dict] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        # Nesting is shown as two spaces per level after the separator's own space
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip(" ")) - 1) // 2,
+            "self_ms": round(int(self_us) / 1000, 2),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+        })
+    total = max((row["cumulative_ms"] for row in rows if row["depth"] == 0), default=0.0)
+    direct = sorted((row for row in rows if row["depth"] == 1), key=lambda row: -row["cumulative_ms"])
+    slowest = sorted(rows, key=lambda row: -row["self_ms"])
+    return {
+        "total_ms": total,
+        "direct_imports": [_without_depth(row) for row in direct[:top]],
+        "slowest_modules": [_without_depth(row) for row in slowest[:top]],
+    }
+
+
+def import_time_breakdown(top: int = 20, refresh: bool = False) -> dict:
+    """
+    Measure a cold import of the app in a subprocess (cached per process)
+
+    Args:
+        top: Number of modules to return per list
+        refresh: Re-run the measurement instead of using the cached result
+    """
+    global _breakdown
+    with _breakdown_lock:
+        if _breakdown is None or refresh:
+            package = __package__.rsplit(".", 1)[0]
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+            completed = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {package}.main"],
+                capture_output=True,
+                text=True,
+                timeout=120,
+                env=env,
+            )
+            _breakdown = {"module": f"{package}.main", "stderr": completed.stderr, "returncode": completed.returncode}
+        cached = _breakdown
+    result = _parse_importtime(cached["stderr"], top)
+    result["module"] = cached["module"]
+    if cached["returncode"] != 0:
+        result["error"] = cached["stderr"].strip().splitlines()[-1:] or ["import failed"]
+    return result
@@ -0,0 +1,593 @@
+"""
+Template Engine
+Deterministic, offline site assembler used as a zero-latency generation tier
+
+A keyword/slot extractor reads the user prompt (business name, kind of
+business, palette, requested sections, contact details) and a component
+library per WebsiteType assembles a complete page from those slots:
+
+    hero, features, about, gallery, pricing, testimonials,
+    product grid, cart, blog list, contact form
+
+AIService serves simple prompts straight from here (no LLM call) and uses
+it in place of the static fallback page when both providers fail. Output
+is plain string assembly, so a page takes well under a millisecond.
+"""
+import html as html_lib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Content per kind of business
+# ---------------------------------------------------------------------------
+
+# keyword -> (kind, noun used in copy)
+KIND_KEYWORDS: Dict[str, Tuple[str, str]] = {
+    "bakery": ("food", "bakery"), "bakeries": ("food", "bakery"), "cafe": ("food", "cafe"),
+    "café": ("food", "cafe"), "coffee": ("food", "coffee shop"), "restaurant": ("food", "restaurant"),
+    "pizzeria": ("food", "pizzeria"), "catering": ("food", "catering company"), "food": ("food", "kitchen"),
+    "photographer": ("creative", "photography studio"), "photography": ("creative", "photography studio"),
+    "artist": ("creative", "studio"), "designer": ("creative", "design studio"), "design": ("creative", "design studio"),
+    "illustrator": ("creative", "studio"), "musician": ("creative", "music project"), "band": ("creative", "band"),
+    "developer": ("tech", "development studio"), "engineer": ("tech", "engineering practice"),
+    "software": ("tech", "software company"), "startup": ("tech", "startup"), "saas": ("tech", "platform"),
+    "app": ("tech", "app"), "tech": ("tech", "tech company"), "agency": ("tech", "agency"),
+    "gym": ("fitness", "gym"), "fitness": ("fitness", "fitness studio"), "yoga": ("fitness", "yoga studio"),
+    "trainer": ("fitness", "training studio"), "coach": ("fitness", "coaching practice"),
+    "law": ("professional", "law firm"), "lawyer": ("professional", "law firm"), "consulting": ("professional", "consultancy"),
+    "consultant": ("professional", "consultancy"), "accounting": ("professional", "accounting firm"),
+    "finance": ("professional", "financial advisory"), "realtor": ("professional", "real estate agency"),
+    "clothing": ("fashion", "boutique"), "fashion": ("fashion", "fashion label"), "boutique": ("fashion", "boutique"),
+    "jewelry": ("fashion", "jewelry store"), "shoes": ("fashion", "shoe store"), "apparel": ("fashion", "apparel brand"),
+    "travel": ("travel", "travel company"), "hotel": ("travel", "hotel"), "tours": ("travel", "tour company"),
+}
+
+# kind -> default Tailwind palette
+KIND_PALETTES = {
+    "food": "amber", "creative": "rose", "tech": "indigo", "fitness": "emerald",
+    "professional": "blue", "fashion": "pink", "travel": "sky", "generic": "blue",
+}
+
+PALETTE_WORDS = {
+    "red": "red", "orange": "orange", "amber": "amber", "yellow": "yellow", "gold": "amber",
+    "green": "green", "emerald": "emerald", "teal": "teal", "cyan": "cyan", "blue": "blue",
+    "navy": "blue", "indigo": "indigo", "purple": "purple", "violet": "violet", "pink": "pink",
+    "rose": "rose", "gray": "slate", "grey": "slate", "black": "slate", "monochrome": "slate",
+}
+
+CONTENT = {
+    "food": {
+        "tagline": "Made fresh, every single day",
+        "intro": "Seasonal ingredients, time-honoured recipes and a warm welcome at {name}.",
+        "features": [("Baked at dawn", "Everything on the counter is made on site each morning."),
+                     ("Local ingredients", "Flour, dairy and fruit from farms close to home."),
+                     ("Order ahead", "Reserve your favourites and skip the queue.")],
+        "products": [("Sourdough Loaf", "6.50"), ("Butter Croissant", "3.20"), ("Seasonal Fruit Tart", "4.80"), ("Cinnamon Roll", "3.60")],
+        "posts": ["Our sourdough starter turns ten", "Five pastries to try this season", "Behind the counter at 4am"],
+    },
+    "creative": {
+        "tagline": "Ideas, crafted with care",
+        "intro": "{name} turns stories into images, identities and experiences people remember.",
+        "features": [("Concept to delivery", "One point of contact from first sketch to final files."),
+                     ("Collaborative process", "Regular check-ins so the work always feels like yours."),
+                     ("Print and screen", "Assets prepared for every format you need.")],
+        "products": [("Signed Print", "45.00"), ("Photo Session", "180.00"), ("Brand Starter Kit", "350.00"), ("Gift Card", "50.00")],
+        "posts": ["How we approach a new brief", "Light, colour and composition", "A year of favourite projects"],
+    },
+    "tech": {
+        "tagline": "Software that just works",
+        "intro": "{name} builds reliable, fast and thoughtfully designed digital products.",
+        "features": [("Fast by default", "Performance budgets on every page and every release."),
+                     ("Secure and reliable", "Best-practice security and monitoring from day one."),
+                     ("Built to scale", "Architecture that grows with your users.")],
+        "products": [("Starter Plan", "19.00"), ("Team Plan", "49.00"), ("Business Plan", "99.00"), ("Support Add-on", "29.00")],
+        "posts": ["Shipping faster with smaller releases", "What we learned scaling to a million requests", "Designing APIs people enjoy"],
+    },
+    "fitness": {
+        "tagline": "Stronger every week",
+        "intro": "Coaching, classes and a community that keeps you moving at {name}.",
+        "features": [("Expert coaching", "Certified trainers who build plans around you."),
+                     ("Classes for all levels", "From first session to competition prep."),
+                     ("Track your progress", "Regular check-ins and clear, measurable goals.")],
+        "products": [("Drop-in Class", "15.00"), ("Monthly Membership", "59.00"), ("Personal Training", "45.00"), ("Starter Pack", "99.00")],
+        "posts": ["Building a routine you can keep", "Mobility work in ten minutes a day", "Fuel for training: the basics"],
+    },
+    "professional": {
+        "tagline": "Clear advice you can act on",
+        "intro": "{name} helps clients make confident decisions with experienced, practical guidance.",
+        "features": [("Experienced team", "Decades of combined experience across industries."),
+                     ("Transparent pricing", "Clear scopes and fees agreed up front."),
+                     ("Responsive service", "Answers within one business day.")],
+        "products": [("Initial Consultation", "0.00"), ("Strategy Session", "250.00"), ("Monthly Retainer", "1200.00"), ("Document Review", "300.00")],
+        "posts": ["Five questions to ask before you sign", "Planning ahead for the new tax year", "How to choose the right advisor"],
+    },
+    "fashion": {
+        "tagline": "Style that feels like you",
+        "intro": "Thoughtfully made pieces and timeless essentials from {name}.",
+        "features": [("Considered materials", "Natural fabrics and responsible sourcing."),
+                     ("Free returns", "Thirty days to decide, no questions asked."),
+                     ("Small batches", "Limited runs for pieces that stay special.")],
+        "products": [("Linen Shirt", "68.00"), ("Everyday Tote", "42.00"), ("Wool Scarf", "55.00"), ("Classic Sneakers", "95.00")],
+        "posts": ["Building a capsule wardrobe", "Caring for natural fabrics", "Behind the scenes of our new collection"],
+    },
+    "travel": {
+        "tagline": "Journeys worth remembering",
+        "intro": "{name} plans trips with local knowledge and attention to every detail.",
+        "features": [("Local experts", "Guides who know every hidden corner."),
+                     ("Flexible booking", "Change plans easily when life happens."),
+                     ("Small groups", "Personal, unhurried experiences.")],
+        "products": [("City Walking Tour", "35.00"), ("Weekend Escape", "420.00"), ("Food Tasting Tour", "65.00"), ("Private Guide (day)", "250.00")],
+        "posts": ["Ten days in the mountains", "Packing light: our checklist", "Where to travel this autumn"],
+    },
+    "generic": {
+        "tagline": "Quality you can count on",
+        "intro": "{name} is built around what matters most: you.",
+        "features": [("Thoughtful quality", "Every detail considered, nothing left to chance."),
+                     ("Friendly support", "Real people, ready to help."),
+                     ("Simple and clear", "No jargon, no surprises.")],
+        "products": [("Essential", "19.00"), ("Plus", "39.00"), ("Premium", "79.00"), ("Gift Card", "25.00")],
+        "posts": ["Welcome to our new website", "What we're working on next", "Three tips from our team"],
+    },
+}
+
+DEFAULT_NAMES = {"landing_page": "Your Business", "portfolio": "My Portfolio", "blog": "The Journal", "ecommerce": "The Shop"}
+
+# website type -> components when the prompt doesn't ask for specific ones
+DEFAULT_SECTIONS = {
+    "landing_page": ["hero", "features", "testimonials", "contact"],
+    "portfolio": ["hero", "about", "gallery", "contact"],
+    "blog": ["hero", "blog_list", "about"],
+    "ecommerce": ["hero", "product_grid", "cart", "contact"],
+}
+
+# keyword (prefix) -> component
+SECTION_KEYWORDS = {
+    "contact": "contact", "email": "contact", "form": "contact", "enquir": "contact", "inquir": "contact",
+    "gallery": "gallery", "photo": "gallery", "portfolio": "gallery", "project": "gallery", "showcase": "gallery", "work": "gallery",
+    "pricing": "pricing", "price": "pricing", "plan": "pricing", "package": "pricing", "menu": "pricing",
+    "testimonial": "testimonials", "review": "testimonials",
+    "product": "product_grid", "shop": "product_grid", "store": "product_grid", "catalog": "product_grid", "sell": "product_grid",
+    "cart": "cart", "checkout": "cart", "basket": "cart",
+    "blog": "blog_list", "post": "blog_list", "article": "blog_list", "news": "blog_list",
+    "about": "about", "story": "about", "bio": "about", "team": "about",
+    "feature": "features", "service": "features", "benefit": "features",
+}
+
+# Render order of components
+SECTION_ORDER = ["hero", "features", "about", "gallery", "product_grid", "cart", "pricing", "blog_list", "testimonials", "contact"]
+
+# Requests the component library can't satisfy; these go to the LLM
+COMPLEX_MARKERS = re.compile(
+    r"\b(?:log ?ins?|sign ?ups?|user accounts?|dashboards?|admin\w*|databases?|apis?|integrat\w*|payments?|stripe|paypal"
+    r"|bookings?|reservations?|calendars?|schedul\w*|chat\w*|animat\w*|3d|games?|maps?|charts?|graphs?|quiz\w*"
+    r"|calculators?|multi-?page|multiple pages|react|vue|angular|parallax|carousels?|sliders?|videos?|music player)\b"
+)
+
+MAX_SIMPLE_WORDS = 25
+
+_WORD = re.compile(r"[a-zà-ÿ0-9']+")
+_QUOTED = re.compile(r"[\"“']([^\"“”']{2,40})[\"”']")
+_CALLED = re.compile(r"\b(?:called|named)\s+([A-Z0-9][\w'&.-]*(?:\s+[A-Z0-9][\w'&.-]*){0,3})")
+_FOR_NAME = re.compile(r"\bfor\s+([A-Z][\w'&.-]*(?:\s+(?:[A-Z][\w'&.-]*|&|of|and))*)")
+_POSSESSIVE = re.compile(r"\b([A-Z][a-z]+)'s\b")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_TRAILING_STOP = re.compile(r"\s+(?:and|of|&)$")
+
+
+@dataclass
+class Slots:
+    """Everything the assembler needs, extracted from one prompt"""
+    website_type: str
+    name: str
+    kind: str = "generic"
+    noun: str = "business"
+    palette: str = "blue"
+    dark: bool = False
+    sections: List[str] = field(default_factory=list)
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    simple: bool = False
+
+
+def extract_slots(user_prompt: str, website_type: str, title: Optional[str] = None, max_simple_words: int = MAX_SIMPLE_WORDS) -> Slots:
+    """
+    Read business name, kind, palette, sections and contact details from a prompt
+
+    Args:
+        user_prompt: Raw user requirements
+        website_type: WebsiteType value
+        title: Explicit project title (used as the site name when given)
+        max_simple_words: Longest prompt still considered simple
+
+    Returns:
+        Slots; slots.simple is True when the component library covers the request
+    """
+    website_type = website_type if website_type in DEFAULT_SECTIONS else "landing_page"
+    lowered = user_prompt.lower()
+    words = _WORD.findall(lowered)
+
+    kind, noun = "generic", "business"
+    palette = None
+    for word in words:
+        if kind == "generic" and word in KIND_KEYWORDS:
+            kind, noun = KIND_KEYWORDS[word]
+        if palette is None and word in PALETTE_WORDS:
+            palette = PALETTE_WORDS[word]
+
+    sections = []
+    for word in words:
+        for keyword, component in SECTION_KEYWORDS.items():
+            if word.startswith(keyword) and component not in sections:
+                sections.append(component)
+                break
+    for component in DEFAULT_SECTIONS[website_type]:
+        if component not in sections:
+            sections.append(component)
+    if "cart" in sections and "product_grid" not in sections:
+        sections.append("product_grid")
+    sections.sort(key=SECTION_ORDER.index)
+
+    email = _EMAIL.search(user_prompt)
+    phone = _PHONE.search(user_prompt)
+    return Slots(
+        website_type=website_type,
+        name=(title or "").strip() or _extract_name(user_prompt, noun, kind, website_type),
+        kind=kind,
+        noun=noun,
+        palette=palette or KIND_PALETTES[kind],
+        dark="dark" in words,
+        sections=sections,
+        email=email.group(0) if email else None,
+        phone=phone.group(0).strip() if phone else None,
+        simple=len(words) <= max_simple_words and not COMPLEX_MARKERS.search(lowered),
+    )
+
+
+def _extract_name(user_prompt: str, noun: str, kind: str, website_type: str) -> str:
+    for pattern in (_QUOTED, _CALLED, _FOR_NAME):
+        match = pattern.search(user_prompt)
+        if match:
+            name = _TRAILING_STOP.sub("", match.group(1).strip(" .,!"))
+            # "for Maria's bakery" reads better as "Maria's Bakery" (below)
+            if name and not name.endswith("'s") and name.lower() not in ("my", "our", "a", "an", "the"):
+                return name
+    match = _POSSESSIVE.search(user_prompt)
+    if match:
+        return f"{match.group(1)}'s {noun.title()}" if kind != "generic" else match.group(0)
+    if kind != "generic":
+        return f"The {noun.title()}"
+    return DEFAULT_NAMES[website_type]
+
+
+# ---------------------------------------------------------------------------
+# Components
+# ---------------------------------------------------------------------------
+
+class _Page:
+    """Per-render values shared by the components"""
+
+    def __init__(self, slots: Slots):
+        self.slots = slots
+        self.name = html_lib.escape(slots.name)
+        self.content = CONTENT[slots.kind]
+        self.p = slots.palette
+        self.dark = slots.dark
+        self.bg = "bg-slate-900" if slots.dark else "bg-white"
+        self.alt_bg = "bg-slate-800" if slots.dark else "bg-gray-50"
+        self.text = "text-white" if slots.dark else "text-gray-900"
+        self.muted = "text-slate-300" if slots.dark else "text-gray-600"
+        self.card = "bg-slate-800 border-slate-700" if slots.dark else "bg-white border-gray-100"
+
+    def heading(self, title: str, subtitle: str) -> str:
+        return (
+            f'<div class="text-center max-w-2xl mx-auto mb-12"><h2 class="text-3xl md:text-4xl font-bold {self.text}">{title}</h2>'
+            f'<p class="mt-4 text-lg {self.muted}">{subtitle}</p></div>'
+        )
+
+    def section(self, section_id: str, inner: str, alt: bool = False) -> str:
+        return (
+            f'<section id="{section_id}" class="py-16 md:py-24 px-6 {self.alt_bg if alt else self.bg}">'
+            f'<div class="max-w-6xl mx-auto">{inner}</div></section>'
+        )
+
+
+_NAV_LABELS = {
+    "features": "Features", "about": "About", "gallery": "Work", "product_grid": "Shop", "cart": "Cart",
+    "pricing": "Pricing", "blog_list": "Blog", "testimonials": "Reviews", "contact": "Contact",
+}
+
+
+def _nav(page: _Page) -> str:
+    links = [(section, _NAV_LABELS[section]) for section in page.slots.sections if section in _NAV_LABELS][:5]
+    items = "".join(f'<a href="#{section}" class="{page.muted} hover:text-{page.p}-600 transition">{label}</a>' for section, label in links)
+    mobile = "".join(f'<a href="#{section}" class="block py-2 {page.muted}">{label}</a>' for section, label in links)
+    border = "border-slate-800" if page.dark else "border-gray-100"
+    return (
+        f'<header class="sticky top-0 z-50 {page.bg} bg-opacity-95 backdrop-blur border-b {border}">'
+        '<nav class="max-w-6xl mx-auto px-6 py-4 flex items-center justify-between">'
+        f'<a href="#hero" class="text-xl font-bold text-{page.p}-600">{page.name}</a>'
+        f'<div class="hidden md:flex items-center gap-8">{items}</div>'
+        f'<button id="menu-toggle" class="md:hidden {page.text}" aria-label="Open menu" aria-expanded="false">&#9776;</button>'
+        f'</nav><div id="mobile-menu" class="hidden md:hidden px-6 pb-4">{mobile}</div></header>'
+    )
+
+
+def _hero(page: _Page) -> str:
+    content = page.content
+    intro = html_lib.escape(content["intro"].format(name=page.slots.name))
+    cta_target = "product_grid" if "product_grid" in page.slots.sections else "contact" if "contact" in page.slots.sections else page.slots.sections[-1]
+    cta_label = "Shop now" if cta_target == "product_grid" else "Get in touch" if cta_target == "contact" else "Explore"
+    gradient = "from-slate-900 to-slate-800" if page.dark else f"from-{page.p}-50 to-white"
+    return (
+        f'<section id="hero" class="py-24 md:py-32 px-6 bg-gradient-to-br {gradient}">'
+        '<div class="max-w-4xl mx-auto text-center">'
+        f'<p class="text-sm font-semibold uppercase tracking-widest text-{page.p}-600">{html_lib.escape(content["tagline"])}</p>'
+        f'<h1 class="mt-4 text-4xl md:text-6xl font-extrabold {page.text}">{page.name}</h1>'
+        f'<p class="mt-6 text-lg md:text-xl {page.muted}">{intro}</p>'
+        '<div class="mt-10 flex flex-col sm:flex-row justify-center gap-4">'
+        f'<a href="#{cta_target}" class="px-8 py-3 rounded-lg bg-{page.p}-600 text-white font-semibold hover:bg-{page.p}-700 transition">{cta_label}</a>'
+        f'<a href="#{page.slots.sections[1] if len(page.slots.sections) > 1 else "hero"}" class="px-8 py-3 rounded-lg border border-{page.p}-200 text-{page.p}-700 font-semibold hover:bg-{page.p}-50 transition">Learn more</a>'
+        '</div></div></section>'
+    )
+
+
+def _features(page: _Page) -> str:
+    cards = "".join(
+        f'<div class="rounded-2xl border {page.card} p-8 shadow-sm hover:shadow-md transition">'
+        f'<div class="h-12 w-12 rounded-xl bg-{page.p}-100 text-{page.p}-600 flex items-center justify-center text-xl font-bold">{i}</div>'
+        f'<h3 class="mt-6 text-xl font-semibold {page.text}">{html_lib.escape(title)}</h3>'
+        f'<p class="mt-2 {page.muted}">{html_lib.escape(body)}</p></div>'
+        for i, (title, body) in enumerate(page.content["features"], 1)
+    )
+    return page.section("features", page.heading("Why choose us", f"What makes {page.name} different.") + f'<div class="grid gap-8 md:grid-cols-3">{cards}</div>')
+
+
+def _about(page: _Page) -> str:
+    return page.section("about", (
+        '<div class="grid gap-12 md:grid-cols-2 items-center">'
+        f'<div class="aspect-square rounded-3xl bg-gradient-to-br from-{page.p}-200 to-{page.p}-400"></div>'
+        f'<div><h2 class="text-3xl md:text-4xl font-bold {page.text}">About {page.name}</h2>'
+        f'<p class="mt-6 text-lg {page.muted}">{html_lib.escape(page.content["intro"].format(name=page.slots.name))}</p>'
+        f'<p class="mt-4 {page.muted}">Every {html_lib.escape(page.slots.noun)} has a story. Ours is about care, craft and the people we work with.</p>'
+        '</div></div>'
+    ), alt=True)
+
+
+def _gallery(page: _Page) -> str:
+    shades = (100, 200, 300, 200, 300, 100)
+    tiles = "".join(
+        f'<figure class="group rounded-2xl overflow-hidden border {page.card}">'
+        f'<div class="aspect-video bg-{page.p}-{shade} group-hover:scale-105 transition duration-300"></div>'
+        f'<figcaption class="p-4 {page.text} font-medium">Project {i}</figcaption></figure>'
+        for i, shade in enumerate(shades, 1)
+    )
+    return page.section("gallery", page.heading("Selected work", "A few recent projects.") + f'<div class="grid gap-6 sm:grid-cols-2 lg:grid-cols-3">{tiles}</div>', alt=True)
+
+
+def _product_grid(page: _Page) -> str:
+    cards = "".join(
+        f'<article class="rounded-2xl border {page.card} overflow-hidden shadow-sm hover:shadow-md transition">'
+        f'<div class="aspect-square bg-{page.p}-{100 * (i % 3 + 1)}"></div>'
+        f'<div class="p-5"><h3 class="font-semibold {page.text}">{html_lib.escape(name)}</h3>'
+        f'<p class="mt-1 text-{page.p}-600 font-bold">${price}</p>'
+        f'<button type="button" class="mt-4 w-full py-2 rounded-lg bg-{page.p}-600 text-white font-medium hover:bg-{page.p}-700 transition" '
+        f'data-add-to-cart data-name="{html_lib.escape(name)}" data-price="{price}">Add to cart</button></div></article>'
+        for i, (name, price) in enumerate(page.content["products"])
+    )
+    return page.section("product_grid", page.heading("Shop", "Our most popular picks.") + f'<div class="grid gap-6 sm:grid-cols-2 lg:grid-cols-4">{cards}</div>')
+
+
+def _cart(page: _Page) -> str:
+    return page.section("cart", (
+        page.heading("Your cart", "Review your items before checkout.")
+        + f'<div class="max-w-2xl mx-auto rounded-2xl border {page.card} p-6">'
+        f'<ul id="cart-items" class="divide-y divide-gray-100 {page.muted}"><li class="py-3">Your cart is empty.</li></ul>'
+        f'<div class="mt-6 flex items-center justify-between text-lg font-semibold {page.text}"><span>Total</span><span id="cart-total">$0.00</span></div>'
+        f'<button id="checkout" type="button" class="mt-6 w-full py-3 rounded-lg bg-{page.p}-600 text-white font-semibold hover:bg-{page.p}-700 transition">Checkout</button>'
+        '<p id="checkout-message" class="hidden mt-4 text-center text-green-600">Thanks! Your order has been placed.</p></div>'
+    ), alt=True)
+
+
+def _pricing(page: _Page) -> str:
+    cards = "".join(
+        f'<div class="rounded-2xl border {page.card} p-8 text-center{" ring-2 ring-" + page.p + "-500" if i == 1 else ""}">'
+        f'<h3 class="text-lg font-semibold {page.text}">{html_lib.escape(name)}</h3>'
+        f'<p class="mt-4 text-4xl font-extrabold text-{page.p}-600">${price}</p>'
+        f'<a href="#contact" class="mt-8 inline-block px-6 py-2 rounded-lg bg-{page.p}-600 text-white hover:bg-{page.p}-700 transition">Choose</a></div>'
+        for i, (name, price) in enumerate(page.content["products"][:3])
+    )
+    return page.section("pricing", page.heading("Pricing", "Simple, transparent prices.") + f'<div class="grid gap-8 md:grid-cols-3">{cards}</div>')
+
+
+def _blog_list(page: _Page) -> str:
+    posts = "".join(
+        f'<article class="post rounded-2xl border {page.card} p-6 hover:shadow-md transition" data-title="{html_lib.escape(title.lower())}">'
+        f'<p class="text-sm text-{page.p}-600 font-medium">{5 * i + 3} min read</p>'
+        f'<h3 class="mt-2 text-xl font-semibold {page.text}">{html_lib.escape(title)}</h3>'
+        f'<p class="mt-2 {page.muted}">Notes and ideas from the {html_lib.escape(page.slots.noun)}.</p>'
+        f'<a href="#blog_list" class="mt-4 inline-block text-{page.p}-600 font-medium hover:underline">Read more &rarr;</a></article>'
+        for i, title in enumerate(page.content["posts"])
+    )
+    search = (
+        f'<input id="post-search" type="search" placeholder="Search posts" aria-label="Search posts" '
+        f'class="w-full md:w-80 mb-8 px-4 py-2 rounded-lg border border-gray-300 focus:outline-none focus:ring-2 focus:ring-{page.p}-500">'
+    )
+    return page.section("blog_list", page.heading("Latest posts", "Stories, updates and ideas.") + search + f'<div class="grid gap-6 md:grid-cols-3">{posts}</div>')
+
+
+def _testimonials(page: _Page) -> str:
+    quotes = (("Alex P.", "Absolutely wonderful, exceeded every expectation."),
+              ("Sam R.", "Friendly, professional and a joy to work with."),
+              ("Jordan K.", "I recommend them to everyone I know."))
+    cards = "".join(
+        f'<figure class="rounded-2xl border {page.card} p-8"><blockquote class="{page.muted}">&ldquo;{quote}&rdquo;</blockquote>'
+        f'<figcaption class="mt-4 font-semibold {page.text}">{who}</figcaption></figure>'
+        for who, quote in quotes
+    )
+    return page.section("testimonials", page.heading("What people say", f"Kind words about {page.name}.") + f'<div class="grid gap-8 md:grid-cols-3">{cards}</div>', alt=True)
+
+
+def _contact(page: _Page) -> str:
+    slots = page.slots
+    details = ""
+    if slots.email:
+        email = html_lib.escape(slots.email)
+        details += f'<p class="{page.muted}">Email: <a class="text-{page.p}-600 hover:underline" href="mailto:{email}">{email}</a></p>'
+    if slots.phone:
+        details += f'<p class="{page.muted}">Phone: {html_lib.escape(slots.phone)}</p>'
+    field_class = f"w-full px-4 py-3 rounded-lg border border-gray-300 focus:outline-none focus:ring-2 focus:ring-{page.p}-500"
+    return page.section("contact", (
+        page.heading("Get in touch", "We'd love to hear from you.")
+        + f'<div class="max-w-xl mx-auto space-y-2 text-center mb-8">{details}</div>'
+        '<form id="contact-form" class="max-w-xl mx-auto space-y-4" novalidate>'
+        f'<input name="name" type="text" required placeholder="Your name" aria-label="Your name" class="{field_class}">'
+        f'<input name="email" type="email" required placeholder="Your email" aria-label="Your email" class="{field_class}">'
+        f'<textarea name="message" rows="5" required placeholder="Your message" aria-label="Your message" class="{field_class}"></textarea>'
+        '<p id="form-error" class="hidden text-red-600 text-sm"></p>'
+        f'<button type="submit" class="w-full py-3 rounded-lg bg-{page.p}-600 text-white font-semibold hover:bg-{page.p}-700 transition">Send message</button>'
+        '<p id="form-success" class="hidden text-green-600 text-center">Thanks! We\'ll be in touch soon.</p>'
+        '</form>'
+    ))
+
+
+def _footer(page: _Page) -> str:
+    border = "border-slate-800" if page.dark else "border-gray-100"
+    return (
+        f'<footer class="py-10 px-6 border-t {border} {page.bg}"><div class="max-w-6xl mx-auto flex flex-col md:flex-row justify-between items-center gap-4">'
+        f'<p class="{page.muted}">&copy; <span id="year">2024</span> {page.name}. All rights reserved.</p>'
+        f'<a href="#hero" class="text-{page.p}-600 hover:underline">Back to top</a></div></footer>'
+    )
+
+
+COMPONENTS = {
+    "hero": _hero, "features": _features, "about": _about, "gallery": _gallery, "product_grid": _product_grid,
+    "cart": _cart, "pricing": _pricing, "blog_list": _blog_list, "testimonials": _testimonials, "contact": _contact,
+}
+
+# ---------------------------------------------------------------------------
+# Behaviour (only the parts the page uses are included)
+# ---------------------------------------------------------------------------
+
+_JS_BASE = """
+  const year = document.getElementById('year');
+  if (year) year.textContent = new Date().getFullYear();
+  const toggle = document.getElementById('menu-toggle');
+  const menu = document.getElementById('mobile-menu');
+  toggle.addEventListener('click', () => {
+    const open = menu.classList.toggle('hidden') === false;
+    toggle.setAttribute('aria-expanded', String(open));
+  });
+  menu.querySelectorAll('a').forEach((link) => link.addEventListener('click', () => menu.classList.add('hidden')));
+"""
+
+_JS_CONTACT = """
+  const form = document.getElementById('contact-form');
+  form.addEventListener('submit', (event) => {
+    event.preventDefault();
+    const error = document.getElementById('form-error');
+    const data = new FormData(form);
+    const email = String(data.get('email') || '').trim();
+    let problem = '';
+    if (!String(data.get('name') || '').trim()) problem = 'Please enter your name.';
+    else if (!/^[^\\s@]+@[^\\s@]+\\.[^\\s@]+$/.test(email)) problem = 'Please enter a valid email address.';
+    else if (String(data.get('message') || '').trim().length < 10) problem = 'Please write a message of at least 10 characters.';
+    error.textContent = problem;
+    error.classList.toggle('hidden', !problem);
+    if (!problem) {
+      form.reset();
+      document.getElementById('form-success').classList.remove('hidden');
+    }
+  });
+"""
+
+_JS_CART = """
+  const cart = [];
+  const items = document.getElementById('cart-items');
+  const total = document.getElementById('cart-total');
+  const renderCart = () => {
+    items.innerHTML = '';
+    if (!cart.length) {
+      items.innerHTML = '<li class="py-3">Your cart is empty.</li>';
+    }
+    cart.forEach((item) => {
+      const row = document.createElement('li');
+      row.className = 'py-3 flex justify-between';
+      row.textContent = item.name;
+      const price = document.createElement('span');
+      price.textContent = '$' + item.price.toFixed(2);
+      row.appendChild(price);
+      items.appendChild(row);
+    });
+    total.textContent = '$' + cart.reduce((sum, item) => sum + item.price, 0).toFixed(2);
+  };
+  document.querySelectorAll('[data-add-to-cart]').forEach((button) => {
+    button.addEventListener('click', () => {
+      cart.push({ name: button.dataset.name, price: Number(button.dataset.price) });
+      renderCart();
+      button.textContent = 'Added!';
+      setTimeout(() => { button.textContent = 'Add to cart'; }, 1200);
+    });
+  });
+  document.getElementById('checkout').addEventListener('click', () => {
+    if (!cart.length) return;
+    cart.length = 0;
+    renderCart();
+    document.getElementById('checkout-message').classList.remove('hidden');
+  });
+"""
+
+_JS_SEARCH = """
+  const search = document.getElementById('post-search');
+  search.addEventListener('input', () => {
+    const query = search.value.trim().toLowerCase();
+    document.querySelectorAll('.post').forEach((post) => {
+      post.classList.toggle('hidden', Boolean(query) && !post.dataset.title.includes(query));
+    });
+  });
+"""
+
+_CSS = """<style>
+  html { scroll-behavior: smooth; }
+  section { scroll-margin-top: 4rem; }
+  @media (prefers-reduced-motion: reduce) { html { scroll-behavior: auto; } * { transition: none !important; } }
+</style>"""
+
+
+def render(slots: Slots) -> dict:
+    """
+    Assemble a complete site from extracted slots
+
+    Returns:
+        dict with 'html', 'css', 'js' keys (same shape as AI output)
+    """
+    page = _Page(slots)
+    body = "".join(COMPONENTS[section](page) for section in slots.sections)
+    scripts = [_JS_BASE]
+    if "contact" in slots.sections:
+        scripts.append(_JS_CONTACT)
+    if "cart" in slots.sections:
+        scripts.append(_JS_CART)
+    if "blog_list" in slots.sections:
+        scripts.append(_JS_SEARCH)
+    html = (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        f"<title>{page.name}</title>\n"
+        '<script src="https://cdn.tailwindcss.com"></script>\n'
+        f"{_CSS}\n</head>\n"
+        f'<body class="{page.bg} {page.text} antialiased">\n'
+        f"{_nav(page)}\n<main>{body}</main>\n{_footer(page)}\n"
+        "</body>\n</html>"
+    )
+    return {
+        "html": html,
+        "css": _CSS,
+        "js": "<script>\ndocument.addEventListener('DOMContentLoaded', () => {" + "".join(scripts) + "});\n</script>",
+    }
+
+
+def generate(user_prompt: str, website_type: str, title: Optional[str] = None) -> dict:
+    """Extract slots and render in one call"""
+    return render(extract_slots(user_prompt, website_type, title))
@@ -0,0 +1,107 @@
+"""
+Request Timing Service
+Per-request stage timing for Server-Timing headers and structured logs
+
+A RequestTimer is bound to the current request through a context variable,
+so code anywhere in the call stack (including threadpool workers, which run
+with a copy of the request context) can record stages:
+
+    with timing.stage("gemini"):
+        ...
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+_current_timer: ContextVar[Optional["RequestTimer"]] = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Accumulates stage durations for a single request"""
+
+    def __init__(self, profile: bool = False):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        # When profiling, threads currently inside a stage (ident -> nesting depth)
+        self.profile = profile
+        self.active_threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a stage duration (repeated stages are summed)"""
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def enter_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self.active_threads[ident] = self.active_threads.get(ident, 0) + 1
+
+    def exit_thread(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self.active_threads.get(ident, 0) - 1
+            if depth > 0:
+                self.active_threads[ident] = depth
+            else:
+                self.active_threads.pop(ident, None)
+
+    def active_thread_ids(self) -> list:
+        """Threads currently inside a stage of this request"""
+        with self._lock:
+            return list(self.active_threads)
+
+    def elapsed(self) -> float:
+        """Seconds since the request started"""
+        return time.perf_counter() - self.start
+
+    def stages_ms(self) -> Dict[str, float]:
+        """Stage durations in milliseconds"""
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+
+    def server_timing_header(self) -> str:
+        """Render stages as a Server-Timing header value"""
+        parts = [f"{name};dur={ms}" for name, ms in self.stages_ms().items()]
+        parts.append(f"total;dur={round(self.elapsed() * 1000, 1)}")
+        return ", ".join(parts)
+
+
+def start_request(profile: bool = False) -> RequestTimer:
+    """Bind a new timer to the current context"""
+    timer = RequestTimer(profile=profile)
+    _current_timer.set(timer)
+    return timer
+
+
+def current_timer() -> Optional[RequestTimer]:
+    """Timer for the current request, if any"""
+    return _current_timer.get()
+
+
+@contextmanager
+def stage(name: str, histogram=None):
+    """
+    Time a block as a named stage of the current request
+
+    Args:
+        name: Stage name (a Server-Timing token, e.g. "db_commit")
+        histogram: Optional metrics histogram (or labelled child) to observe as well
+    """
+    timer = _current_timer.get()
+    profiling = timer is not None and timer.profile
+    if profiling:
+        timer.enter_thread()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiling:
+            timer.exit_thread()
+        if timer is not None:
+            timer.record(name, elapsed)
+        if histogram is not None:
+            histogram.observe(elapsed)
@@ -0,0 +1,160 @@
+"""
+Usage Accounting Service
+Token usage and latency per generation, and an aggregate report
+
+A UsageLedger is bound to the current generation through a context
+variable (like timing.RequestTimer), so provider calls anywhere below
+AIService.generate_website can record themselves:
+
+    usage.record_call("gemini", model, "success", seconds, prompt_tokens, output_tokens)
+
+The ledger summary is stored in project_metadata["usage"]; aggregate()
+turns stored metadata into per-tier / per-type figures for tuning.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, List, Optional, Tuple
+from . import metrics
+
+_current_ledger: ContextVar[Optional["UsageLedger"]] = ContextVar("usage_ledger", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for providers that don't report usage (~4 chars per token)"""
+    return (len(text) + 3) // 4
+
+
+class UsageLedger:
+    """Provider calls made for one generation"""
+
+    def __init__(self):
+        self.tier: Optional[str] = None
+        self.model: Optional[str] = None
+        self.complexity: Optional[float] = None
+        self.calls: List[dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, call: dict) -> None:
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> dict:
+        """Compact dict for project_metadata"""
+        with self._lock:
+            calls = list(self.calls)
+        return {
+            "tier": self.tier,
+            "model": self.model,
+            "complexity": self.complexity,
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "output_tokens": sum(call["output_tokens"] for call in calls),
+            "latency_ms": round(sum(call["latency_ms"] for call in calls), 1),
+            "estimated": any(call["estimated"] for call in calls),
+            "calls": calls,
+        }
+
+
+@contextmanager
+def ledger() -> Iterator[UsageLedger]:
+    """Bind a fresh ledger to the current context for the duration of a generation"""
+    current = UsageLedger()
+    token = _current_ledger.set(current)
+    try:
+        yield current
+    finally:
+        _current_ledger.reset(token)
+
+
+def record_call(
+    provider: str,
+    model: str,
+    outcome: str,
+    seconds: float,
+    prompt_tokens: int,
+    output_tokens: int,
+    estimated: bool = False
+) -> None:
+    """Count a provider call in metrics and in the current ledger, if any"""
+    metrics.AI_TOKENS.labels(provider, model, "prompt").inc(prompt_tokens)
+    metrics.AI_TOKENS.labels(provider, model, "output").inc(output_tokens)
+    current = _current_ledger.get()
+    if current is not None:
+        current.record({
+            "provider": provider,
+            "model": model,
+            "outcome": outcome,
+            "latency_ms": round(seconds * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "estimated": estimated,
+        })
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _summarize(entries: List[Tuple[dict, dict]]) -> dict:
+    latencies = [u["latency_ms"] for u, _ in entries]
+    prompt = [u["prompt_tokens"] for u, _ in entries]
+    output = [u["output_tokens"] for u, _ in entries]
+    scores = [m["quality_score"] for _, m in entries if m.get("quality_score") is not None]
+    count = len(entries)
+    return {
+        "count": count,
+        "latency_ms": {
+            "avg": round(sum(latencies) / count, 1),
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+        },
+        "tokens": {
+            "prompt_avg": round(sum(prompt) / count, 1),
+            "output_avg": round(sum(output) / count, 1),
+            "prompt_total": sum(prompt),
+            "output_total": sum(output),
+        },
+        "quality_avg": round(sum(scores) / len(scores), 1) if scores else None,
+        "retries": sum(max(sum(1 for c in u["calls"] if c["provider"] == "gemini") - 1, 0) for u, _ in entries),
+        "provider_fallbacks": sum(1 for _, m in entries if m.get("source") not in ("gemini", "template")),
+    }
+
+
+def aggregate(rows: Iterable[Tuple[str, dict]]) -> dict:
+    """
+    Aggregate stored usage by model tier and by website type
+
+    Args:
+        rows: (website_type, project_metadata dict) pairs
+
+    Returns:
+        dict with totals, by_tier and by_website_type summaries
+    """
+    entries: List[Tuple[str, dict, dict]] = []
+    for website_type, metadata in rows:
+        usage_summary = metadata.get("usage") if metadata else None
+        if usage_summary:
+            entries.append((website_type, usage_summary, metadata))
+    if not entries:
+        return {"projects": 0, "by_tier": {}, "by_website_type": {}}
+
+    by_tier: dict = {}
+    by_type: dict = {}
+    for website_type, usage_summary, metadata in entries:
+        tier_key = f"{usage_summary['tier']}:{usage_summary['model']}"
+        by_tier.setdefault(tier_key, []).append((usage_summary, metadata))
+        by_type.setdefault(website_type, []).append((usage_summary, metadata))
+    for website_type, group in by_type.items():
+        tiers: dict = {}
+        for usage_summary, _ in group:
+            tiers[usage_summary["tier"]] = tiers.get(usage_summary["tier"], 0) + 1
+        by_type[website_type] = dict(_summarize(group), tiers=tiers)
+    return {
+        "projects": len(entries),
+        "totals": _summarize([(u, m) for _, u, m in entries]),
+        "by_tier": {key: _summarize(group) for key, group in sorted(by_tier.items())},
+        "by_website_type": dict(sorted(by_type.items())),
+    }
@@ -0,0 +1,369 @@
+"""
+Output Validator
+Single-pass structural validation and linting of generated websites
+
+One html.parser pass over the page (and over the css/js fields) checks:
+    - well-formedness: unclosed, mismatched and stray tags
+    - required structure: doctype, <head>, <title>, viewport, <body> and the
+      semantic tags the system prompt asks for
+    - forbidden external assets (anything but the Tailwind CDN) in attributes
+      that load a resource; hyperlinks and form actions may point anywhere
+    - inline event handlers and javascript: URLs
+    - JS syntax sanity: balanced brackets, terminated strings, template
+      literals, comments and regex literals
+
+Every issue costs points from 100; repeats of the same issue are capped so
+one bad pattern can't zero the score alone. This module only uses the
+standard library so process-pool workers start quickly (see quality_service).
+"""
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+ALLOWED_EXTERNAL_HOSTS = ("cdn.tailwindcss.com",)
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# End tags HTML lets authors omit; closing their parent closes them too
+OPTIONAL_END_TAGS = {
+    "p", "li", "dt", "dd", "option", "optgroup", "tr", "td", "th",
+    "thead", "tbody", "tfoot", "colgroup", "rt", "rp",
+}
+
+SEMANTIC_TAGS = ("header", "main", "footer")
+
+# code -> (severity, points per occurrence)
+PENALTIES: Dict[str, Tuple[str, int]] = {
+    "missing_body": ("error", 30),
+    "missing_head": ("error", 15),
+    "js_syntax": ("error", 15),
+    "external_asset": ("error", 10),
+    "unclosed_tag": ("error", 8),
+    "mismatched_tag": ("error", 8),
+    "inline_handler": ("warning", 5),
+    "javascript_url": ("warning", 5),
+    "stray_end_tag": ("warning", 3),
+    "missing_doctype": ("warning", 5),
+    "missing_title": ("warning", 5),
+    "missing_viewport": ("warning", 5),
+    "missing_tailwind": ("warning", 5),
+    "missing_semantic_tag": ("warning", 4),
+    "no_content_sections": ("warning", 4),
+    "console_log": ("info", 1),
+}
+MAX_REPEATS = 3
+
+# Attributes holding a URL (javascript: URLs are flagged on any of them)
+_URL_ATTRS = {"src", "href", "data", "poster", "srcset", "action"}
+# Attributes that make the browser load a resource, per tag; hyperlinks and
+# form actions only navigate, so they may point anywhere
+_LOADING_ATTRS = {
+    "script": {"src"},
+    "img": {"src", "srcset"},
+    "iframe": {"src"},
+    "video": {"src", "poster"},
+    "audio": {"src"},
+    "source": {"src", "srcset"},
+    "embed": {"src"},
+    "object": {"data"},
+}
+# <link rel> values whose href is fetched
+_LOADING_LINK_RELS = {"stylesheet", "preload", "modulepreload", "icon", "apple-touch-icon"}
+_EXTERNAL_URL = re.compile(r"^\s*(?:https?:)?//([^/\s\"']+)", re.IGNORECASE)
+_CSS_EXTERNAL = re.compile(r"""(?:@import\s+(?:url\()?|url\()\s*["']?\s*((?:https?:)?//[^"')\s;]+)""", re.IGNORECASE)
+
+
+class _Report:
+    """Collects issues, grouped by code"""
+
+    def __init__(self):
+        self.issues: Dict[str, dict] = {}
+
+    def add(self, code: str, message: str) -> None:
+        issue = self.issues.get(code)
+        if issue is None:
+            severity = PENALTIES[code][0]
+            self.issues[code] = {"code": code, "severity": severity, "message": message, "count": 1}
+        else:
+            issue["count"] += 1
+
+    def score(self) -> int:
+        lost = sum(PENALTIES[code][1] * min(issue["count"], MAX_REPEATS) for code, issue in self.issues.items())
+        return max(100 - lost, 0)
+
+
+def _external_host(url: str) -> Optional[str]:
+    match = _EXTERNAL_URL.match(url)
+    if not match:
+        return None
+    host = match.group(1).lower()
+    return None if host in ALLOWED_EXTERNAL_HOSTS else host
+
+
+def _loads_resource(tag: str, name: str, values: dict) -> bool:
+    """Whether attribute `name` of `tag` makes the browser fetch its URL"""
+    if tag == "link":
+        return name == "href" and bool(_LOADING_LINK_RELS & set((values.get("rel") or "").lower().split()))
+    return name in _LOADING_ATTRS.get(tag, ())
+
+
+class _Linter(HTMLParser):
+    """One pass over a document or fragment, feeding a shared _Report"""
+
+    def __init__(self, report: _Report):
+        super().__init__(convert_charrefs=True)
+        self.report = report
+        self.stack: List[str] = []
+        self.seen: set = set()
+        self.doctype = False
+        self.viewport = False
+        self.tailwind = False
+        self.scripts: List[str] = []
+        self.styles: List[str] = []
+
+    def handle_decl(self, decl):
+        if decl.lower().startswith("doctype"):
+            self.doctype = True
+
+    def handle_starttag(self, tag, attrs):
+        self._check_attrs(tag, attrs)
+        if tag in VOID_TAGS:
+            return
+        if tag in OPTIONAL_END_TAGS and self.stack and self.stack[-1] == tag:
+            self.stack.pop()  # <li>a<li>b
+        self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._check_attrs(tag, attrs)
+
+    def _check_attrs(self, tag, attrs):
+        self.seen.add(tag)
+        values = dict(attrs)
+        if tag == "meta" and (values.get("name") or "").lower() == "viewport":
+            self.viewport = True
+        for name, value in attrs:
+            name = name.lower()
+            if name.startswith("on") and len(name) > 2:
+                self.report.add("inline_handler", f"<{tag} {name}=...> inline event handler (use addEventListener)")
+            if not value or name not in _URL_ATTRS:
+                continue
+            if value.strip().lower().startswith("javascript:"):
+                self.report.add("javascript_url", f"<{tag} {name}=\"javascript:...\">")
+            if "cdn.tailwindcss.com" in value:
+                self.tailwind = True
+            if not _loads_resource(tag, name, values):
+                continue
+            # srcset candidates are "url [descriptor]"
+            for url in (candidate.split()[0] for candidate in value.split(",") if candidate.strip()) if name == "srcset" else (value,):
+                host = _external_host(url.strip())
+                if host:
+                    self.report.add("external_asset", f"<{tag} {name}> loads from {host}")
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if tag not in self.stack:
+            self.report.add("stray_end_tag", f"</{tag}> without a matching start tag")
+            return
+        while self.stack:
+            popped = self.stack.pop()
+            if popped == tag:
+                break
+            if popped not in OPTIONAL_END_TAGS:
+                self.report.add("mismatched_tag", f"<{popped}> closed by </{tag}>")
+
+    def handle_data(self, data):
+        if not self.stack:
+            return
+        if self.stack[-1] == "script":
+            self.scripts.append(data)
+        elif self.stack[-1] == "style":
+            self.styles.append(data)
+
+    def finish(self) -> None:
+        self.close()
+        for tag in self.stack:
+            if tag not in OPTIONAL_END_TAGS:
+                self.report.add("unclosed_tag", f"<{tag}> is never closed")
+        self.stack = []
+
+
+def _check_css(css: str, report: _Report) -> None:
+    for url in _CSS_EXTERNAL.findall(css):
+        host = _external_host(url)
+        if host:
+            report.add("external_asset", f"stylesheet loads from {host}")
+
+
+# Characters after which "/" starts a regex literal rather than division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await"}
+_CLOSERS = {")": "(", "]": "[", "}": "{"}
+
+
+def check_js(code: str) -> Optional[str]:
+    """
+    Cheap JS syntax sanity check (not a parser)
+
+    Returns:
+        Description of the first problem found, or None
+    """
+    stack: List[str] = []  # open brackets, plus "${" for template substitutions
+    i, n = 0, len(code)
+    last = ""  # last significant character
+    word = ""  # last identifier/keyword
+    while i < n:
+        c = code[i]
+        if c in " \t\r\n":
+            i += 1
+            continue
+        if c == "/" and code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if c == "/" and code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            if end == -1:
+                return "unterminated /* comment"
+            i = end + 2
+            continue
+        if c in "\"'":
+            i += 1
+            while i < n and code[i] != c:
+                if code[i] == "\\":
+                    i += 1
+                elif code[i] == "\n":
+                    return f"unterminated string literal at offset {i}"
+                i += 1
+            if i >= n:
+                return "unterminated string literal"
+            i += 1
+            last, word = c, ""
+            continue
+        if c == "`" or (c == "}" and stack and stack[-1] == "${"):
+            if c == "}":
+                stack.pop()
+            i += 1
+            while i < n and code[i] != "`":
+                if code[i] == "\\":
+                    i += 1
+                elif code.startswith("${", i):
+                    stack.append("${")
+                    i += 2
+                    last, word = "{", ""
+                    break
+                i += 1
+            else:
+                if i >= n:
+                    return "unterminated template literal"
+                i += 1
+                last, word = "`", ""
+            continue
+        if c == "/" and (last == "" or last in _REGEX_PRECEDERS or word in _REGEX_KEYWORDS):
+            i += 1
+            in_class = False
+            while i < n:
+                ch = code[i]
+                if ch == "\\":
+                    i += 2
+                    continue
+                if ch == "\n":
+                    return f"unterminated regex literal at offset {i}"
+                if ch == "[":
+                    in_class = True
+                elif ch == "]":
+                    in_class = False
+                elif ch == "/" and not in_class:
+                    break
+                i += 1
+            if i >= n:
+                return "unterminated regex literal"
+            i += 1
+            last, word = "/", ""
+            continue
+        if c.isalnum() or c in "_$":
+            start = i
+            while i < n and (code[i].isalnum() or code[i] in "_$"):
+                i += 1
+            word, last = code[start:i], "a"
+            continue
+        if c in "([{":
+            stack.append(c)
+        elif c in _CLOSERS:
+            if not stack or stack[-1] != _CLOSERS[c]:
+                return f"unexpected '{c}' at offset {i}"
+            stack.pop()
+        last, word = c, ""
+        i += 1
+    if stack:
+        opener = stack[-1]
+        return "unterminated template literal" if opener == "${" else f"unclosed '{opener}'"
+    return None
+
+
+def validate(html: str, css: str = "", js: str = "") -> dict:
+    """
+    Validate and score one generated website
+
+    Args:
+        html: Full HTML document
+        css: CSS field (usually a <style> block)
+        js: JS field (usually a <script> block)
+
+    Returns:
+        dict with score (0-100) and issues (code, severity, message, count),
+        worst first
+    """
+    report = _Report()
+
+    page = _Linter(report)
+    page.feed(html or "")
+    page.finish()
+
+    if not page.doctype:
+        report.add("missing_doctype", "no <!DOCTYPE html>")
+    if "head" not in page.seen:
+        report.add("missing_head", "no <head> element")
+    if "body" not in page.seen:
+        report.add("missing_body", "no <body> element")
+    if "title" not in page.seen:
+        report.add("missing_title", "no <title> element")
+    if not page.viewport:
+        report.add("missing_viewport", "no <meta name=\"viewport\">")
+    if not page.tailwind:
+        report.add("missing_tailwind", "Tailwind CDN script not included")
+    for tag in SEMANTIC_TAGS:
+        if tag not in page.seen:
+            report.add("missing_semantic_tag", f"no <{tag}> element")
+    if not page.seen & {"section", "article"}:
+        report.add("no_content_sections", "no <section> or <article> elements")
+
+    scripts = list(page.scripts)
+    styles = list(page.styles)
+    for extra, sources in ((css, styles), (js, scripts)):
+        if extra and extra.strip():
+            # A bare field without its wrapper tag is CSS or JS source
+            if not extra.lstrip().startswith("<"):
+                sources.append(extra)
+                continue
+            fragment = _Linter(report)
+            fragment.feed(extra)
+            fragment.finish()
+            scripts.extend(fragment.scripts)
+            styles.extend(fragment.styles)
+
+    for style in styles:
+        _check_css(style, report)
+    for script in scripts:
+        problem = check_js(script)
+        if problem:
+            report.add("js_syntax", problem)
+        if "console.log" in script:
+            report.add("console_log", "console.log left in production JS")
+
+    severity_rank = {"error": 0, "warning": 1, "info": 2}
+    issues = sorted(report.issues.values(), key=lambda issue: (severity_rank[issue["severity"]], -PENALTIES[issue["code"]][1]))
+    return {"score": report.score(), "issues": issues}
@@ -2,9 +2,14 @@
 Website Generator Service
 Uses Gemini AI with HuggingFace fallback
 """
+import json
 import logging
-from .ai_service import ai_service
-from ..schemas.project import WebsiteType
+from typing import Optional
+from . import timing
+from .ai_service import get_ai_service
+from .project_service import ProjectService
+from ..database import SessionLocal
+from ..schemas.project import ProjectStatus, WebsiteType
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +19,13 @@ class WebsiteGeneratorService:
     
     def __init__(self):
         """Initialize website generator"""
-        self.ai_service = ai_service
+        self.ai_service = get_ai_service()
     
     def generate_website(
         self,
         user_prompt: str,
         website_type: str = "landing_page",
-        title: str = "My Website"
+        title: Optional[str] = None
     ) -> dict:
         """
         Generate a complete website from user description
@@ -28,7 +33,7 @@ class WebsiteGeneratorService:
         Args:
             user_prompt: Natural language description of desired website
             website_type: Type of website (landing_page, portfolio, blog, ecommerce)
-            title: Website title
+            title: Website title (None: taken from the prompt or a default)
         
         Returns:
             dict with keys:
@@ -40,11 +45,11 @@ class WebsiteGeneratorService:
         Raises:
             Exception: If AI generation fails
         """
-        logger.info(f"📄 Generating {website_type} website: {title}")
+        logger.info(f"📄 Generating {website_type} website: {title or 'untitled'}")
         
         # Enhance prompt with context
         enhanced_prompt = f"""
-Website Title: {title}
+Website Title: {title or "My Website"}
 Website Type: {website_type.replace('_', ' ').title()}
 
 User Description:
@@ -58,14 +63,16 @@ Make it modern, responsive, and visually appealing.
             # Call AI service (uses Gemini with HF fallback)
             result = self.ai_service.generate_website(
                 prompt=enhanced_prompt,
-                website_type=website_type
+                website_type=website_type,
+                user_prompt=user_prompt,
+                title=title
             )
             
             # Add metadata
             result["title"] = title
             result["website_type"] = website_type
             
-            logger.info(f"✅ Successfully generated website for: {title}")
+            logger.info(f"✅ Successfully generated website for: {title or 'untitled'}")
             return result
         
         except Exception as e:
@@ -73,5 +80,64 @@ Make it modern, responsive, and visually appealing.
             raise Exception(f"Website generation failed: {str(e)}")
 
 
-# Create singleton instance
-website_generator = WebsiteGeneratorService()
+    @staticmethod
+    def metadata_for(generated_code: dict) -> dict:
+        """Project metadata for generated output: provider, validation results and usage"""
+        metadata = {'source': generated_code.get('provider', 'gemini_api_with_hf_fallback')}
+        quality = generated_code.get('quality')
+        if quality is not None:
+            metadata.update(
+                quality_score=quality['score'],
+                validation_ms=quality['validation_ms'],
+                quality_issues=[issue['code'] for issue in quality['issues']],
+            )
+        if generated_code.get('usage'):
+            metadata['usage'] = generated_code['usage']
+        return metadata
+    
+    def personalize_project(
+        self,
+        project_id: int,
+        user_prompt: str,
+        website_type: str,
+        title: Optional[str] = None
+    ) -> None:
+        """
+        Generate the real site for a project saved with a skeleton page
+        
+        Runs as a background task after the skeleton response is sent, and
+        swaps the generated code into the same project (status "ready", or
+        "failed" if only the static fallback page could be produced).
+        
+        Args:
+            project_id: Project created in skeleton mode
+            user_prompt: Original user requirements
+            website_type: Type of website
+            title: Title given by the user, if any
+        """
+        # Own timer, so provider stages don't land on the finished request's timing
+        timer = timing.start_request(profile=False)
+        result: Optional[dict] = None
+        try:
+            result = self.generate_website(user_prompt, website_type, title)
+        except Exception as e:
+            logger.error(f"❌ Background generation failed for project {project_id}: {str(e)}")
+        
+        fields = {"status": ProjectStatus.FAILED.value}
+        if result is not None:
+            fields.update(
+                html=result["html"],
+                css=result["css"],
+                javascript=result.get("js", ""),
+                project_metadata=json.dumps(self.metadata_for(result)),
+            )
+            if result.get("provider") != "fallback":
+                fields["status"] = ProjectStatus.READY.value
+        
+        db = SessionLocal()
+        try:
+            ProjectService.update_project(db, project_id, **fields)
+        finally:
+            db.close()
+        icon = "✅" if fields["status"] == ProjectStatus.READY.value else "⚠️"
+        logger.info(f"{icon} Project {project_id} personalized in {timer.elapsed():.1f}s (status: {fields['status']})")
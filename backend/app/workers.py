@@ -0,0 +1,29 @@
+"""
+Process hooks for multi-worker deployments (see gunicorn.conf.py)
+
+With preload_app the application is imported once in the gunicorn master and
+workers are forked from it. The master initializes the schema exactly once
+before forking; each worker then drops inherited connection pools and builds
+its own provider clients on first use.
+"""
+import logging
+from . import database
+from .services import ai_service, quality_service, shared_state
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_master() -> None:
+    """Run once in the master before any worker is forked"""
+    database.init_db()
+    # Don't hand pooled connections to the children
+    database.engine.dispose()
+    logger.info("✅ Schema initialized in master process")
+
+
+def post_fork() -> None:
+    """Run in each worker right after fork"""
+    database.reset_after_fork()
+    ai_service.reset_ai_service()
+    quality_service.reset_after_fork()
+    shared_state.reset_after_fork()
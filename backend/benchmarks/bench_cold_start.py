@@ -0,0 +1,70 @@
+"""
+Cold-start benchmark: process launch -> first successful response
+
+Starts `uvicorn app.main:app` against a fresh SQLite database (first run
+creates the schema; later runs reuse it, like a restarted Render instance),
+polls GET /api/health and reports the time to the first 200.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --app-dir /path/to/other/checkout/backend
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_request(app_dir: str, database_url: str, timeout: float = 30.0) -> float:
+    """Seconds from spawning the server to the first 200 from /api/health"""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", ""),
+               HF_API_TOKEN=os.environ.get("HF_API_TOKEN", ""))
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError("server did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="backend directory containing the app package")
+    args = parser.parse_args()
+
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-cold-'), 'cold.db')}"
+    first = time_to_first_request(args.app_dir, database_url)
+    warm_db = [time_to_first_request(args.app_dir, database_url) for _ in range(args.runs)]
+    print(f"first boot (schema created): {first * 1000:.0f} ms")
+    print(f"restart (schema exists):     median {statistics.median(warm_db) * 1000:.0f} ms "
+          f"(min {min(warm_db) * 1000:.0f}, max {max(warm_db) * 1000:.0f}, n={len(warm_db)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Published preview transfer benchmark
+
+Seeds projects the way the generators produce them (template-engine pages,
+the same interaction script on every site, plus a per-site style sheet),
+publishes each one through the real routes and reports, per preview visit:
+  - inline:  the whole document, as every visit transfers it today
+  - first:   published HTML plus the assets the browser doesn't have yet
+             (visiting the projects one after another, sharing one cache)
+  - repeat:  published HTML only (assets are immutable and cached)
+and how many asset bytes are stored versus extracted.
+
+Usage (from backend/):
+    python -m benchmarks.bench_publishing --projects 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="bench_publishing_")
+# The app modules read Settings at import; point them at a scratch database
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ.setdefault("HF_API_TOKEN", "")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["SCHEMA_LOCK_PATH"] = os.path.join(_workdir, "schema.lock")
+os.environ["SHARED_STATE_PATH"] = os.path.join(_workdir, "shared.db")
+os.environ["SQLITE_BATCH_WRITES"] = "false"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.asset import StaticAsset  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.routers import assets as assets_router  # noqa: E402
+from app.routers import projects as projects_router  # noqa: E402
+from app.services import template_engine  # noqa: E402
+
+PROMPTS = ["a bakery with a menu", "a photographer portfolio", "a tech blog", "a coffee shop landing page", "an online plant store"]
+TYPES = ["landing_page", "portfolio", "blog", "landing_page", "ecommerce"]
+SHARED_SCRIPT = "<script>\n" + "".join(
+    f"document.querySelectorAll('[data-step=\"{i}\"]').forEach(el => el.addEventListener('click', () => el.classList.toggle('active')));\n"
+    for i in range(40)
+) + "</script>"
+
+
+def _seed(count: int) -> list:
+    rng = random.Random(1)
+    db = SessionLocal()
+    try:
+        projects = []
+        for i in range(count):
+            kind = rng.randrange(len(PROMPTS))
+            page = template_engine.generate(f"{PROMPTS[kind]} number {i}", TYPES[kind])
+            palette = rng.choice(["#2563eb", "#16a34a", "#db2777", "#ea580c"])
+            css = "<style>\n" + "".join(f".accent-{j} {{ color: {palette}; border-color: {palette}; }}\n" for j in range(30)) + "</style>"
+            projects.append(Project(
+                title=f"Project {i}", website_type=TYPES[kind], user_prompt=PROMPTS[kind],
+                html=page["html"], css=css, javascript=SHARED_SCRIPT if i % 4 else page["js"],
+            ))
+        db.add_all(projects)
+        db.commit()
+        return [project.id for project in projects]
+    finally:
+        db.close()
+
+
+async def main_async(args):
+    init_db()
+    ids = _seed(args.projects)
+    app = FastAPI()
+    app.include_router(projects_router.router)
+    app.include_router(assets_router.router)
+
+    inline = first = repeat = extracted = 0
+    browser_cache = set()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for project_id in ids:
+            published = (await client.post(f"/api/projects/{project_id}/publish")).json()
+            inline += published["source_bytes"]
+            repeat += published["html_bytes"]
+            first += published["html_bytes"]
+            for asset in published["assets"]:
+                extracted += asset["size"]
+                if asset["url"] not in browser_cache:
+                    browser_cache.add(asset["url"])
+                    first += len((await client.get(asset["url"])).content)
+            page = await client.get(f"/api/projects/{project_id}/preview")
+            assert not set(re.findall(r'(?:href|src)="(/api/assets/[^"]+)"', page.text)) - browser_cache
+
+    db = SessionLocal()
+    try:
+        stored_count, stored_bytes = db.execute(select(func.count(), func.coalesce(func.sum(StaticAsset.size), 0))).one()
+    finally:
+        db.close()
+
+    n = len(ids)
+    print(f"{n} projects")
+    print(f"{'per visit':<10} {'avg bytes':>10} {'vs inline':>10}")
+    for name, total in (("inline", inline), ("first", first), ("repeat", repeat)):
+        print(f"{name:<10} {total / n:>10,.0f} {total / inline:>9.0%}")
+    print(f"assets: {stored_count} stored, {stored_bytes:,} bytes for {extracted:,} extracted "
+          f"({1 - stored_bytes / max(extracted, 1):.0%} deduplicated)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Read-replica routing benchmark / local test harness
+
+Uses file-based SQLite copies as replicas: the primary is copied to
+--replicas files with the sqlite3 backup API, and a refresher thread
+re-copies it every --lag-ms to simulate replication lag. Then, through the
+real routers (in-process ASGI, no network):
+  - readers hammer GET /api/projects and GET /api/projects/{id}
+  - a writer creates projects (template tier) and immediately reads each
+    one back, counting 404s (read-your-writes violations)
+and the run reports reads/sec, where reads were routed and the violations.
+Compare --read-your-writes 2 (default) with 0 to see the window at work.
+
+Usage (from backend/):
+    python -m benchmarks.bench_read_replicas --replicas 2 --seconds 10 --lag-ms 500
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+_parser.add_argument("--replicas", type=int, default=2)
+_parser.add_argument("--seconds", type=float, default=10.0)
+_parser.add_argument("--readers", type=int, default=8)
+_parser.add_argument("--projects", type=int, default=200)
+_parser.add_argument("--lag-ms", type=int, default=500)
+_parser.add_argument("--read-your-writes", type=float, default=2.0)
+ARGS = _parser.parse_args() if __name__ == "__main__" else _parser.parse_args([])
+
+_workdir = tempfile.mkdtemp(prefix="bench_read_replicas_")
+PRIMARY = os.path.join(_workdir, "primary.db")
+REPLICAS = [os.path.join(_workdir, f"replica{i}.db") for i in range(ARGS.replicas)]
+# The app modules read Settings at import; point them at the scratch databases
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ.setdefault("HF_API_TOKEN", "")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY}"
+os.environ["DB_REPLICA_URLS"] = ",".join(f"sqlite:///{path}" for path in REPLICAS)
+os.environ["DB_READ_YOUR_WRITES_S"] = str(ARGS.read_your_writes)
+os.environ["SCHEMA_LOCK_PATH"] = os.path.join(_workdir, "schema.lock")
+os.environ["SHARED_STATE_PATH"] = os.path.join(_workdir, "shared.db")
+os.environ["SQLITE_BATCH_WRITES"] = "false"
+os.environ["MAX_CONCURRENT_GENERATIONS"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from app.database import SessionLocal, get_replica_set, init_db  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.routers import projects as projects_router  # noqa: E402
+from app.services import metrics  # noqa: E402
+
+
+def copy_database(source: str, target: str) -> None:
+    """Consistent snapshot of a live SQLite database (what a replica refresh does)"""
+    src, dst = sqlite3.connect(source), sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _refresh(stop: threading.Event, lag_s: float) -> None:
+    while not stop.wait(lag_s):
+        for path in REPLICAS:
+            copy_database(PRIMARY, path)
+
+
+def _seed(count: int) -> None:
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Project(title=f"Project {i}", website_type="blog", user_prompt="seed", html="<p>seed</p>" * 200, css="", javascript="")
+            for i in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _reader(client: httpx.AsyncClient, deadline: float, counts: dict) -> None:
+    i = 0
+    while time.monotonic() < deadline:
+        path = "/api/projects?limit=20" if i % 2 else f"/api/projects/{1 + i % ARGS.projects}"
+        (await client.get(path)).raise_for_status()
+        counts["reads"] += 1
+        i += 1
+
+
+async def _writer(client: httpx.AsyncClient, deadline: float, counts: dict) -> None:
+    body = {"user_prompt": "A small bakery with a menu and opening hours", "website_type": "landing_page"}
+    while time.monotonic() < deadline:
+        project_id = (await client.post("/api/generate-website", json=body)).json()["id"]
+        counts["writes"] += 1
+        if (await client.get(f"/api/projects/{project_id}")).status_code == 404:
+            counts["read_your_writes_violations"] += 1
+        await asyncio.sleep(0.05)
+
+
+async def main_async():
+    init_db()
+    _seed(ARGS.projects)
+    for path in REPLICAS:
+        copy_database(PRIMARY, path)
+    get_replica_set().start()
+    stop = threading.Event()
+    threading.Thread(target=_refresh, args=(stop, ARGS.lag_ms / 1000.0), daemon=True).start()
+
+    app = FastAPI()
+    app.include_router(projects_router.router)
+    counts = {"reads": 0, "writes": 0, "read_your_writes_violations": 0}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        deadline = time.monotonic() + ARGS.seconds
+        start = time.perf_counter()
+        await asyncio.gather(_writer(client, deadline, counts), *(_reader(client, deadline, counts) for _ in range(ARGS.readers)))
+        elapsed = time.perf_counter() - start
+    stop.set()
+    get_replica_set().stop()
+
+    print(f"{ARGS.replicas} replicas (refreshed every {ARGS.lag_ms} ms), read-your-writes window {ARGS.read_your_writes}s")
+    print(f"reads/sec: {counts['reads'] / elapsed:,.0f}   writes: {counts['writes']}   "
+          f"read-your-writes violations: {counts['read_your_writes_violations']}")
+    for line in metrics.REGISTRY.render().splitlines():
+        if line.startswith("db_read_routes_total"):
+            print("  " + line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
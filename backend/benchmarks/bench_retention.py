@@ -0,0 +1,108 @@
+"""
+Retention benchmark
+
+Simulates a growing projects table on a file-backed SQLite database:
+each round inserts --per-round generated-size projects (10% of them
+static-fallback results), then applies services.retention with
+max_per_type = --keep. Per round it reports:
+  - rows kept, database file size (after incremental vacuum + checkpoint)
+  - list-projects latency (newest page of one website type, avg of 50)
+  - retention run time and batches
+
+Run with --no-retention to see the same workload without clean-up.
+
+Usage (from backend/):
+    python -m benchmarks.bench_retention --rounds 8 --per-round 2000 --keep 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="bench_retention_")
+# The app modules read Settings at import; point them at a scratch database
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ.setdefault("HF_API_TOKEN", "")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["SCHEMA_LOCK_PATH"] = os.path.join(_workdir, "schema.lock")
+os.environ["SHARED_STATE_PATH"] = os.path.join(_workdir, "shared.db")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import get_settings  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.schemas.project import WebsiteType  # noqa: E402
+from app.services import retention  # noqa: E402
+from app.services.project_service import ProjectService  # noqa: E402
+
+TYPES = [website_type.value for website_type in WebsiteType]
+
+
+def _insert(count: int, rng: random.Random) -> None:
+    db = SessionLocal()
+    try:
+        for start in range(0, count, 500):
+            db.add_all([
+                Project(
+                    title=f"Project {rng.randrange(10**6)}",
+                    website_type=rng.choice(TYPES),
+                    user_prompt="A modern site for a small business with contact form",
+                    html="<section>" + "".join(rng.choice("abcdefgh ") for _ in range(20000)) + "</section>",
+                    css="<style>/* bench */</style>",
+                    javascript="",
+                    project_metadata=json.dumps({"source": "fallback" if rng.random() < 0.1 else "gemini"}),
+                )
+                for _ in range(min(500, count - start))
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+def _list_latency_ms(samples: int = 50) -> float:
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for i in range(samples):
+            ProjectService.list_projects(db, skip=0, limit=20, website_type=TYPES[i % len(TYPES)])
+        return (time.perf_counter() - start) / samples * 1000
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=8)
+    parser.add_argument("--per-round", type=int, default=2000)
+    parser.add_argument("--keep", type=int, default=1000, help="retention_max_per_type")
+    parser.add_argument("--no-retention", action="store_true")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.retention_max_per_type = args.keep
+    settings.retention_fallback_grace_minutes = -1  # fallback rows are already old enough
+    settings.retention_batch_pause_ms = 0
+    init_db()
+    rng = random.Random(7)
+
+    print(f"{'round':>5} {'rows':>7} {'file MB':>8} {'list ms':>8} {'gc ms':>8} {'batches':>8}")
+    for round_number in range(1, args.rounds + 1):
+        _insert(args.per_round, rng)
+        report = {"elapsed_ms": 0.0, "batches": 0}
+        if not args.no_retention:
+            report = retention.run()
+        # Same reclaim either way, so file sizes compare like for like
+        retention.reclaim_space()
+        stats = retention.storage_stats()
+        db = SessionLocal()
+        rows = db.query(Project).count()
+        db.close()
+        print(f"{round_number:>5} {rows:>7} {stats['size_bytes'] / 2**20:>8.1f} {_list_latency_ms():>8.2f} "
+              f"{report['elapsed_ms']:>8.0f} {report['batches']:>8}")
+
+
+if __name__ == "__main__":
+    main()
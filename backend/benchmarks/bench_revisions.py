@@ -0,0 +1,144 @@
+"""
+Project revision history benchmark
+
+Builds 100-revision histories of a generated-size page with realistic edits
+(one section rewritten per revision, sections occasionally added or removed,
+small CSS tweaks) and reports, per snapshot interval:
+  - storage: stored payload bytes vs. full uncompressed copies per revision
+  - reconstruction latency of every revision (avg / p99 / max)
+
+Interval 1 stores a compressed full snapshot per revision, for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.bench_revisions --revisions 100 --intervals 1 5 10 25
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# The app modules read Settings at import; give them harmless defaults
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ.setdefault("HF_API_TOKEN", "")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.database import Base, apply_sqlite_pragmas, sqlite_pragmas  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.services.revision_service import TRACKED_FIELDS, RevisionService  # noqa: E402
+
+WORDS = "fast modern clean bold studio design product launch team build grow simple trusted premium".split()
+
+
+def _section(rng: random.Random, n: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(60))
+    return (
+        f'<section id="s{n}" class="py-16 px-6 bg-white">\n'
+        f'  <div class="max-w-6xl mx-auto">\n'
+        f'    <h2 class="text-3xl font-bold text-gray-900">{rng.choice(WORDS).title()} {n}</h2>\n'
+        f'    <p class="mt-4 text-lg text-gray-600">{text}</p>\n'
+        f'  </div>\n'
+        f'</section>\n'
+    )
+
+
+def _page(sections: list) -> str:
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="UTF-8">\n'
+        '<script src="https://cdn.tailwindcss.com"></script>\n</head>\n<body>\n'
+        + "".join(sections)
+        + "</body>\n</html>\n"
+    )
+
+
+def _edits(revisions: int, seed: int) -> list:
+    """Field values of each revision of one project"""
+    rng = random.Random(seed)
+    sections = [_section(rng, n) for n in range(40)]
+    css = "<style>\n" + "".join(f".c{n} {{ color: #{n:06x}; }}\n" for n in range(50)) + "</style>"
+    versions = []
+    for rev in range(revisions):
+        versions.append({"title": f"Site r{rev}", "html": _page(sections), "css": css, "javascript": ""})
+        roll = rng.random()
+        if roll < 0.1 and len(sections) > 10:
+            sections.pop(rng.randrange(len(sections)))
+        elif roll < 0.2:
+            sections.insert(rng.randrange(len(sections)), _section(rng, 100 + rev))
+        else:
+            i = rng.randrange(len(sections))
+            sections[i] = _section(rng, i)
+        if rng.random() < 0.2:
+            css = css.replace(f"#{rng.randrange(50):06x}", f"#{rng.randrange(1 << 24):06x}", 1)
+    return versions
+
+
+def run(interval: int, versions: list) -> dict:
+    """Record one history with the given snapshot interval and rebuild every revision"""
+    workdir = tempfile.mkdtemp(prefix="bench-revisions-")
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    project = Project(website_type="landing_page", user_prompt="benchmark", **versions[0])
+    session.add(project)
+    session.commit()
+
+    record_seconds = 0.0
+    for old, new in zip(versions, versions[1:]):
+        start = time.perf_counter()
+        RevisionService.record(session, project.id, old, new, snapshot_interval=interval)
+        for field in TRACKED_FIELDS:
+            setattr(project, field, new[field])
+        session.commit()
+        record_seconds += time.perf_counter() - start
+
+    stored = sum(r.size for r in RevisionService.list_revisions(session, project.id))
+    session.expunge_all()
+
+    latencies = []
+    for rev in range(1, len(versions) + 1):
+        start = time.perf_counter()
+        content = RevisionService.reconstruct(session, project.id, rev)
+        latencies.append((time.perf_counter() - start) * 1000)
+        expected = versions[rev - 1]
+        assert all(content[field] == expected[field] for field in TRACKED_FIELDS), f"revision {rev} mismatch"
+    session.close()
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        "interval": interval,
+        "stored_bytes": stored,
+        "record_ms_avg": record_seconds * 1000 / (len(versions) - 1),
+        "rebuild_ms_avg": sum(latencies) / len(latencies),
+        "rebuild_ms_p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "rebuild_ms_max": latencies[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revisions", type=int, default=100)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    versions = _edits(args.revisions, args.seed)
+    full_copies = sum(len(v[field].encode("utf-8")) for v in versions for field in TRACKED_FIELDS)
+    print(f"{args.revisions} revisions, {len(versions[-1]['html']) // 1024} KB html, full copies: {full_copies / 1024:.0f} KB")
+    print(f"{'interval':>8} {'stored KB':>10} {'vs full':>8} {'record ms':>10} {'avg ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for interval in args.intervals:
+        r = run(interval, versions)
+        print(
+            f"{r['interval']:>8} {r['stored_bytes'] / 1024:>10.1f} {r['stored_bytes'] / full_copies:>7.1%} "
+            f"{r['record_ms_avg']:>10.2f} {r['rebuild_ms_avg']:>7.2f} {r['rebuild_ms_p99']:>7.2f} {r['rebuild_ms_max']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Project read-path serialization benchmark
+
+Serves the same SQLite database through two in-process ASGI apps:
+  - before: ORM load + ProjectResponse/ProjectListResponse.from_orm, encoded
+            by FastAPI's response_model validation and JSONResponse
+  - after:  the real projects router (column query -> dict -> orjson,
+            encoded incrementally above response_stream_threshold)
+
+and reports requests/sec (single client, no network) on
+GET /api/projects/{id}, GET /api/projects?limit=N and a very large project.
+Both apps' response bodies are checked to decode to the same JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --requests 2000 --html-kb 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="bench_serialization_")
+# The app modules read Settings at import; point them at a scratch database
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ.setdefault("HF_API_TOKEN", "")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["SCHEMA_LOCK_PATH"] = os.path.join(_workdir, "schema.lock")
+os.environ["SHARED_STATE_PATH"] = os.path.join(_workdir, "shared.db")
+os.environ["SQLITE_BATCH_WRITES"] = "false"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException, Query  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+from app.database import SessionLocal, get_async_db, init_db  # noqa: E402
+from app.models.project import Project  # noqa: E402
+from app.routers import projects as projects_router  # noqa: E402
+from app.schemas.project import ProjectListResponse, ProjectResponse  # noqa: E402
+from app.services import serialization  # noqa: E402
+from app.services.project_service import ProjectService  # noqa: E402
+
+WORDS = "fast modern clean bold studio design product launch team build grow simple trusted premium café \"quoted\"".split()
+
+
+def _before_app() -> FastAPI:
+    """The read routes as they were: ORM objects re-validated through Pydantic"""
+    app = FastAPI()
+
+    @app.get("/api/projects/{project_id}", response_model=ProjectResponse)
+    async def get_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+        project = await ProjectService.get_project_async(db, project_id)
+        if not project:
+            raise HTTPException(status_code=404)
+        return ProjectResponse.from_orm(project)
+
+    @app.get("/api/projects", response_model=list[ProjectListResponse])
+    async def list_projects(skip: int = Query(0), limit: int = Query(10), db: AsyncSession = Depends(get_async_db)):
+        projects = await ProjectService.list_projects_async(db, skip=skip, limit=limit)
+        return [ProjectListResponse.from_orm(p) for p in projects]
+
+    return app
+
+
+def _after_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(projects_router.router)
+    return app
+
+
+def _page(rng: random.Random, kb: int) -> str:
+    sections = []
+    while sum(len(section) for section in sections) < kb * 1024:
+        text = " ".join(rng.choice(WORDS) for _ in range(80))
+        sections.append(f'<section class="py-16 px-6">\n  <h2 class="text-3xl">Title</h2>\n  <p class="mt-4">{text}</p>\n</section>\n')
+    return "<!DOCTYPE html>\n<html><body>\n" + "".join(sections) + "</body></html>"
+
+
+def _seed(count: int, html_kb: int, large_kb: int) -> int:
+    rng = random.Random(1)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Project(
+                title=f"Project {i}",
+                website_type=rng.choice(["portfolio", "blog", "ecommerce", "landing_page"]),
+                user_prompt="A modern site for a small business with a contact form and testimonials",
+                html=_page(rng, html_kb),
+                css="<style>" + ".card{border-radius:12px;box-shadow:0 1px 2px rgba(0,0,0,.1)}\n" * 80 + "</style>",
+                javascript="<script>" + "document.querySelectorAll('a').forEach(a => a.addEventListener('click', e => {}));\n" * 30 + "</script>",
+            )
+            for i in range(count)
+        ])
+        large = Project(title="Large", website_type="ecommerce", user_prompt="large", html=_page(rng, large_kb), css="", javascript="")
+        db.add(large)
+        db.commit()
+        return large.id
+    finally:
+        db.close()
+
+
+async def _rate(client: httpx.AsyncClient, paths: list, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        response = await client.get(paths[i % len(paths)])
+        response.raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    init_db()
+    large_id = _seed(args.projects, args.html_kb, args.large_kb)
+    detail_paths = [f"/api/projects/{i}" for i in range(1, args.projects + 1)]
+    list_paths = [f"/api/projects?limit={args.list_limit}"]
+
+    before = httpx.AsyncClient(transport=httpx.ASGITransport(app=_before_app()), base_url="http://bench")
+    after = httpx.AsyncClient(transport=httpx.ASGITransport(app=_after_app()), base_url="http://bench")
+    async with before, after:
+        for path in (detail_paths[0], list_paths[0], f"/api/projects/{large_id}"):
+            old, new = (await before.get(path)).json(), (await after.get(path)).json()
+            assert old == new, f"responses differ for {path}"
+
+        print(f"orjson: {'yes' if serialization.orjson is not None else 'no (stdlib json)'}; "
+              f"{args.projects} projects, ~{args.html_kb} KB html each")
+        print(f"{'endpoint':<36} {'before req/s':>13} {'after req/s':>12} {'speed-up':>9}")
+        cases = [
+            ("GET /api/projects/{id}", detail_paths, args.requests),
+            (f"GET /api/projects?limit={args.list_limit}", list_paths, args.requests),
+            (f"GET /api/projects/{{id}} ({args.large_kb} KB)", [f"/api/projects/{large_id}"], max(args.requests // 10, 20)),
+        ]
+        for name, paths, requests in cases:
+            await _rate(before, paths, 20)
+            await _rate(after, paths, 20)
+            old_rate = await _rate(before, paths, requests)
+            new_rate = await _rate(after, paths, requests)
+            print(f"{name:<36} {old_rate:>13,.0f} {new_rate:>12,.0f} {new_rate / old_rate:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--html-kb", type=int, default=30)
+    parser.add_argument("--large-kb", type=int, default=2048)
+    parser.add_argument("--list-limit", type=int, default=50)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Template engine throughput benchmark
+
+Runs slot extraction + page assembly (template_engine.generate) on a mixed
+corpus of prompts across all website types, single-threaded, and reports:
+  - generations per second on one core, p50 / p99 latency
+  - share of prompts classified as simple (served without an LLM)
+  - validator scores of the generated pages (min / avg)
+
+Usage (from backend/):
+    python -m benchmarks.bench_template_engine --iterations 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import template_engine, validator  # noqa: E402
+
+PROMPTS = [
+    ("landing page for my bakery with contact form", "landing_page"),
+    ("A landing page for Sunrise Yoga studio, green and calm", "landing_page"),
+    ("Website for my law firm with pricing and testimonials", "landing_page"),
+    ("Portfolio for Jane Doe, a photographer. Dark theme with a gallery", "portfolio"),
+    ("portfolio for a freelance software developer, show my projects and contact", "portfolio"),
+    ("A blog called Tech Notes about software, green colours", "blog"),
+    ("travel blog with posts about hiking and a search box", "blog"),
+    ("Online store for Maria's clothing boutique with cart and checkout", "ecommerce"),
+    ("shop selling handmade jewelry, purple, with a cart", "ecommerce"),
+    ("coffee shop site with menu and opening hours, email hello@beans.cafe", "landing_page"),
+    ("A SaaS dashboard with login, charts and Stripe payments integration", "landing_page"),
+    ("Fitness coach landing page with booking calendar and video testimonials", "landing_page"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    scores = []
+    simple = 0
+    for prompt, website_type in PROMPTS:
+        slots = template_engine.extract_slots(prompt, website_type)
+        simple += slots.simple
+        page = template_engine.render(slots)
+        scores.append(validator.validate(page["html"], page["css"], page["js"])["score"])
+
+    # Warm up, then time every call
+    for prompt, website_type in PROMPTS:
+        template_engine.generate(prompt, website_type)
+    latencies = []
+    total_bytes = 0
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        prompt, website_type = PROMPTS[i % len(PROMPTS)]
+        t0 = time.perf_counter()
+        page = template_engine.generate(prompt, website_type)
+        latencies.append(time.perf_counter() - t0)
+        total_bytes += len(page["html"])
+    elapsed = time.perf_counter() - start
+
+    extract_start = time.perf_counter()
+    for i in range(args.iterations):
+        prompt, website_type = PROMPTS[i % len(PROMPTS)]
+        template_engine.extract_slots(prompt, website_type)
+    extract_us = (time.perf_counter() - extract_start) / args.iterations * 1e6
+
+    latencies.sort()
+    print(f"{len(PROMPTS)} prompts, {simple} simple (served without an LLM)")
+    print(f"validator score: min {min(scores)}, avg {sum(scores) / len(scores):.1f}")
+    print(f"{args.iterations} generations in {elapsed:.2f}s on one core: {args.iterations / elapsed:,.0f} pages/s")
+    print(f"latency p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us "
+          f"(slot extraction {extract_us:.0f} us), avg page {total_bytes / args.iterations / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for multi-worker deployments
+
+Usage (from the repository root):
+    gunicorn backend.app.main:app -c backend/gunicorn.conf.py
+
+WEB_CONCURRENCY sets the worker count (default 1). The app is preloaded in
+the master so the schema is initialized once and code pages are shared
+copy-on-write; database pools and AI provider clients are created per worker
+after fork (app/workers.py).
+"""
+import importlib
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = 30
+
+
+def _app_workers_module(server):
+    """Import <package>.workers for the configured app (e.g. backend.app.workers)"""
+    module_path = server.app.app_uri.split(":", 1)[0]
+    package = module_path.rsplit(".", 1)[0]
+    return importlib.import_module(f"{package}.workers")
+
+
+def on_starting(server):
+    _app_workers_module(server).prepare_master()
+
+
+def post_fork(server, worker):
+    _app_workers_module(server).post_fork()
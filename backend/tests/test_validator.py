@@ -0,0 +1,55 @@
+"""
+Output validator scoring cases
+"""
+from app.services import validator
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Portfolio</title>
+<script src="https://cdn.tailwindcss.com"></script>
+</head>
+<body>
+<header><h1>Jane Doe</h1></header>
+<main>
+<section id="contact">
+<form action="https://formspree.io/f/abc" method="post"><input name="email"><button>Send</button></form>
+</section>
+</main>
+<footer>
+<a href="https://github.com/jane">GitHub</a>
+<a href="https://twitter.com/jane">Twitter</a>
+<a href="https://www.linkedin.com/in/jane">LinkedIn</a>
+</footer>
+</body>
+</html>"""
+
+
+def _codes(report: dict) -> set:
+    return {issue["code"] for issue in report["issues"]}
+
+
+def test_external_links_and_form_actions_score_clean():
+    report = validator.validate(PAGE)
+    assert "external_asset" not in _codes(report)
+    assert report["score"] == 100
+
+
+def test_external_resources_are_flagged():
+    for tag in (
+        '<img src="https://example.com/a.png">',
+        '<img srcset="/a.png 1x, https://example.com/a@2x.png 2x">',
+        '<link rel="stylesheet" href="https://fonts.example.com/a.css">',
+        '<link rel="icon" href="//example.com/favicon.ico">',
+        '<script src="https://example.com/app.js"></script>',
+        '<video poster="https://example.com/p.jpg"></video>',
+        '<object data="https://example.com/a.swf"></object>',
+    ):
+        assert "external_asset" in _codes(validator.validate(PAGE.replace("</main>", tag + "</main>"))), tag
+
+
+def test_javascript_url_on_hyperlink_still_flagged():
+    report = validator.validate(PAGE.replace('href="https://github.com/jane"', 'href="javascript:void(0)"'))
+    assert "javascript_url" in _codes(report)
@@ -2,6 +2,7 @@
 
 import React, { useEffect } from 'react';
 import { useGeneratorStore } from '../lib/store';
+import { apiClient } from '../lib/api-client';
 import JSZip from 'jszip';
 
 export function PreviewPanel() {
@@ -41,8 +42,15 @@ export function PreviewPanel() {
     }
   };
 
+  // Saved projects preview from the backend's published page; the static fallback (id 0) renders inline
+  const previewUrl = website && Number(website.id) > 0 ? apiClient.previewUrl(website.id) : null;
+
   const handleOpenInNewTab = () => {
     if (!website) return;
+    if (previewUrl) {
+      window.open(previewUrl, '_blank');
+      return;
+    }
 
     const htmlContent = `
       <!DOCTYPE html>
@@ -113,7 +121,8 @@ export function PreviewPanel() {
           key={iframeKey}
           title="Website Preview"
           className="w-full h-full border-none"
-          srcDoc={`
+          src={previewUrl ?? undefined}
+          srcDoc={previewUrl ? undefined : `
             <!DOCTYPE html>
             <html lang="en">
             <head>
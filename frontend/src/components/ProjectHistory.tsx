@@ -2,21 +2,71 @@
 
 import React, { useEffect } from 'react';
 import { useGeneratorStore } from '../lib/store';
-import { apiClient } from '../lib/api-client';
+import { apiClient, Project, ProjectChanges } from '../lib/api-client';
 import { Trash2, Eye } from 'lucide-react';
 
+const HISTORY_SIZE = 20;
+const LONG_POLL_SECONDS = 25;
+
+// Merge a change-feed page into the newest-first history list
+function applyChanges(projects: Project[], changes: ProjectChanges): Project[] {
+  const deleted = new Set(changes.deleted.map(String));
+  const changed = new Map(changes.changed.map((p) => [String(p.id), p]));
+  const merged = projects
+    .filter((p) => !deleted.has(String(p.id)))
+    .map((p) => {
+      const update = changed.get(String(p.id));
+      changed.delete(String(p.id));
+      return update ? { ...p, ...update } : p;
+    });
+  const added = Array.from(changed.values()) as Project[];
+  return [...added, ...merged]
+    .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
+    .slice(0, HISTORY_SIZE);
+}
+
 export function ProjectHistory() {
   const store = useGeneratorStore();
   const [isLoading, setIsLoading] = React.useState(false);
+  const tokenRef = React.useRef<string | null>(null);
 
   useEffect(() => {
-    loadProjects();
+    let active = true;
+
+    // Long-poll the change feed instead of re-fetching the list
+    const sync = async () => {
+      await loadProjects();
+      while (active) {
+        try {
+          const changes = await apiClient.getProjectChanges(tokenRef.current ?? undefined, LONG_POLL_SECONDS);
+          if (!active) break;
+          if (changes.reset) {
+            await loadProjects();
+            continue;
+          }
+          tokenRef.current = changes.token;
+          if (changes.changed.length || changes.deleted.length) {
+            store.setProjects(applyChanges(useGeneratorStore.getState().projects, changes));
+          }
+        } catch (error) {
+          console.error('Project sync failed, retrying:', error);
+          await new Promise((resolve) => setTimeout(resolve, 5000));
+        }
+      }
+    };
+    sync();
+
+    return () => {
+      active = false;
+    };
   }, []);
 
   const loadProjects = async () => {
     try {
       setIsLoading(true);
-      const projects = await apiClient.listProjects(0, 20);
+      // Take the feed position first so nothing committed during the list load is missed
+      tokenRef.current = (await apiClient.getProjectChanges()).token;
+      const projects = await apiClient.listProjects(0, HISTORY_SIZE);
       store.setProjects(projects);
     } catch (error) {
       console.error('Failed to load projects:', error);
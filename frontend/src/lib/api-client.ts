@@ -30,8 +30,28 @@ export interface Project {
   updated_at: string;
 }
 
+export interface ProjectSummary {
+  id: string;
+  title: string;
+  website_type: string;
+  status: string;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface ProjectChanges {
+  changed: ProjectSummary[];
+  deleted: string[];
+  token: string;
+  has_more: boolean;
+  reset: boolean;
+}
+
 class APIClient {
   private client: AxiosInstance;
+  // Idempotency-Key of the last generate request that didn't get a response,
+  // reused when the same request is retried so the backend replays instead of regenerating
+  private pendingGeneration: { body: string; key: string } | null = null;
 
   constructor() {
     this.client = axios.create({
@@ -43,7 +63,14 @@ class APIClient {
   }
 
   async generateWebsite(request: GenerateWebsiteRequest): Promise<GeneratedWebsite> {
-    const response = await this.client.post('/generate-website', request);
+    const body = JSON.stringify(request);
+    if (this.pendingGeneration?.body !== body) {
+      this.pendingGeneration = { body, key: crypto.randomUUID() };
+    }
+    const response = await this.client.post('/generate-website', request, {
+      headers: { 'Idempotency-Key': this.pendingGeneration.key },
+    });
+    this.pendingGeneration = null;
     return response.data;
   }
 
@@ -59,6 +86,19 @@ class APIClient {
     return response.data;
   }
 
+  async getProjectChanges(since?: string, wait = 0, limit = 100): Promise<ProjectChanges> {
+    const params: any = { wait, limit };
+    if (since) params.since = since;
+    const response = await this.client.get('/projects/changes', { params });
+    return response.data;
+  }
+
+  // Published page: styles and scripts load as immutable, content-addressed assets,
+  // so repeat visits only revalidate the HTML
+  previewUrl(id: string): string {
+    return `${API_BASE_URL}/projects/${id}/preview`;
+  }
+
   async deleteProject(id: string): Promise<void> {
     await this.client.delete(`/projects/${id}`);
   }